@@ -1,7 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import sqlite3
-import json
 from datetime import datetime
 import os
 import shutil
@@ -10,6 +9,9 @@ import psutil
 import subprocess
 import time
 import logging
+from cart import Cart
+from cart_journal import open_cart_terminals, replay_open_cart
+from schema import migrate
 
 # Configure logging to console and file for persistent crash records
 logging.basicConfig(
@@ -68,42 +70,7 @@ class BackOfficeApp:
     def init_db(self):
         """Initialize database tables."""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS recovery_cart (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    cart_data TEXT,
-                    user TEXT,
-                    timestamp DATETIME
-                )
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS inventory (
-                    item_id TEXT PRIMARY KEY,
-                    name TEXT,
-                    quantity INTEGER,
-                    retail_price REAL
-                )
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS daily_sales (
-                    sale_date TEXT PRIMARY KEY,
-                    total_sales REAL,
-                    unit_sales INTEGER,
-                    net_profit REAL,
-                    user TEXT
-                )
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS transaction_log (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    action TEXT,
-                    details TEXT,
-                    timestamp DATETIME,
-                    user TEXT
-                )
-            """)
-            self.conn.commit()
+            migrate(self.conn)
             logging.info("Database tables initialized successfully")
         except Exception as e:
             logging.error(f"Failed to initialize database: {str(e)}")
@@ -178,20 +145,34 @@ class BackOfficeApp:
         ).pack(pady=10)
 
     def recover_cart(self):
-        """Recover the last saved cart from the database."""
+        """Show the unfinished sales found in the POS cart journal."""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT cart_data, user, timestamp FROM recovery_cart ORDER BY timestamp DESC LIMIT 1")
-            row = cursor.fetchone()
-            if row:
-                cart_data, user, ts = row
-                cart = json.loads(cart_data)
-                messagebox.showinfo(
-                    "Recovery",
-                    f"Recovered cart for {user} at {ts}\n\nItems:\n{json.dumps(cart, indent=2)}"
+            terminals = open_cart_terminals(self.conn)
+            if not terminals:
+                messagebox.showwarning("No Data", "No recovery data found.")
+                return
+            reports = []
+            for terminal in terminals:
+                cart = Cart()
+                info = replay_open_cart(self.conn, cart, terminal)
+                if not cart:
+                    continue
+                lines = "\n".join(
+                    f"  {line.name} x{line.quantity} @ {line.retail_price:.2f}"
+                    + (" (20% OFF)" if line.discount_applied else "")
+                    for line in cart
                 )
-            else:
+                reports.append(
+                    f"Terminal {terminal}, {info['user'] or 'unknown user'} at {info['timestamp']}\n"
+                    f"Customer: {info['customer_id'] or 'None'}\n{lines}\nTotal: {cart.total:.2f}"
+                )
+            if not reports:
                 messagebox.showwarning("No Data", "No recovery data found.")
+                return
+            messagebox.showinfo(
+                "Recovery",
+                "\n\n".join(reports) + "\n\nThe POS restores these carts automatically on its next start."
+            )
         except Exception as e:
             logging.error(f"Failed to recover cart: {str(e)}")
             messagebox.showerror("Error", f"Failed to recover cart: {str(e)}")
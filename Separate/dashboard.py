@@ -9,6 +9,13 @@ import datetime
 from PIL import Image, ImageTk
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from inventory_search import search_inventory
+from checkout import commit_sale
+from schema import LOW_STOCK_SQL, migrate
+from sequences import next_transaction_id
 
 logging.basicConfig(level=logging.DEBUG)
 
@@ -37,6 +44,7 @@ class Dashboard:
         try:
             self.conn = sqlite3.connect(self.db_path)
             self.conn.execute("PRAGMA foreign_keys = ON")
+            migrate(self.conn)
         except sqlite3.OperationalError as e:
             print(f"Failed to connect to database at {self.db_path}: {e}")
             messagebox.showerror("Database Error", f"Cannot access database: {e}", parent=self.root)
@@ -593,12 +601,8 @@ class Dashboard:
         if query:
             try:
                 with self.conn:
-                    cursor = self.conn.cursor()
-                    cursor.execute(
-                        "SELECT name, retail_price, quantity, supplier FROM inventory WHERE name LIKE ?",
-                        (f"%{query}%",)
-                    )
-                    suggestions = cursor.fetchall()
+                    suggestions = [(name, retail_price, quantity, supplier)
+                                   for _, name, _, retail_price, quantity, supplier in search_inventory(self.conn, query)]
                     if suggestions:
                         self.suggestion_listbox.selection_clear(0, tk.END)
                         self.suggestion_listbox.selection_set(0)
@@ -937,66 +941,18 @@ class Dashboard:
                 return
 
             now = datetime.datetime.now()
-            prefix = now.strftime("%m-%Y")
-            with self.conn:
-                cursor = self.conn.cursor()
-                cursor.execute(
-                    "SELECT COUNT(*) FROM transactions WHERE strftime('%m-%Y', timestamp) = ?",
-                    (prefix,)
-                )
-                count = cursor.fetchone()[0] or 0
-                sequence = str(count + 1).zfill(5)
-            transaction_id = f"{prefix}-{sequence}"
+            transaction_id = next_transaction_id(self.conn)
 
-            items = ";".join([f"{item['id']}:{item['quantity']}" for item in self.cart])
             change = cash_paid - final_total
             timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
-            sale_date = now.strftime("%Y-%m-%d")
             payment_method = getattr(self, 'current_payment_method', 'Cash')
             customer_id = getattr(self, 'current_customer_id', None)
 
-            unit_sales = sum(item["quantity"] for item in self.cart)
-            net_profit = 0.0
-            with self.conn:
-                cursor = self.conn.cursor()
-                for item in self.cart:
-                    cursor.execute("SELECT retail_price, unit_price, quantity FROM inventory WHERE item_id = ?", (item["id"],))
-                    result = cursor.fetchone()
-                    if not result:
-                        raise ValueError(f"Item {item['id']} not found in inventory")
-                    retail_price, unit_price, current_quantity = result
-                    if current_quantity < item["quantity"]:
-                        raise ValueError(f"Insufficient stock for item {item['id']}: {current_quantity} available")
-                    net_profit += (retail_price - unit_price) * item["quantity"]
-                    cursor.execute("UPDATE inventory SET quantity = quantity - ? WHERE item_id = ?", (item["quantity"], item["id"]))
-
-                cursor.execute('''
-                    INSERT INTO transactions (transaction_id, items, total_amount, cash_paid, change_amount, timestamp, status, payment_method, customer_id)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (transaction_id, items, final_total, cash_paid, change, timestamp, "Completed", payment_method, customer_id))
-
-                cursor.execute("SELECT total_sales, unit_sales, net_profit FROM daily_sales WHERE sale_date = ?", (sale_date,))
-                existing_sale = cursor.fetchone()
-                if existing_sale:
-                    new_total_sales = existing_sale[0] + final_total
-                    new_unit_sales = existing_sale[1] + unit_sales
-                    new_net_profit = existing_sale[2] + net_profit
-                    cursor.execute(
-                        "UPDATE daily_sales SET total_sales = ?, unit_sales = ?, net_profit = ?, user = ? WHERE sale_date = ?",
-                        (new_total_sales, new_unit_sales, new_net_profit, self.current_user, sale_date)
-                    )
-                else:
-                    cursor.execute(
-                        "INSERT INTO daily_sales (sale_date, total_sales, unit_sales, net_profit, user) VALUES (?, ?, ?, ?, ?)",
-                        (sale_date, final_total, unit_sales, net_profit, self.current_user)
-                    )
-
-                cursor.execute('''
-                    INSERT INTO transaction_log (log_id, action, details, timestamp, user)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (str(uuid.uuid4()), "Checkout", f"Completed transaction {transaction_id}", timestamp, self.current_user))
-
-                self.conn.commit()
+            # One transaction: bulk stock check, guarded bulk decrement, daily_sales upsert
+            commit_sale(
+                self.conn, transaction_id, [(item["id"], item["quantity"]) for item in self.cart],
+                final_total, cash_paid, change, timestamp, payment_method, customer_id, self.current_user
+            )
 
             # ✅ Make snapshot before clearing the cart for receipt
             cart_snapshot = [item.copy() for item in self.cart]
@@ -1126,10 +1082,9 @@ class Dashboard:
 
     def check_low_inventory(self) -> None:
         try:
-            threshold = 10
             with self.conn:
                 cursor = self.conn.cursor()
-                cursor.execute("SELECT item_id, name, quantity FROM inventory WHERE quantity <= ?", (threshold,))
+                cursor.execute(LOW_STOCK_SQL)
                 low_items = cursor.fetchall()
                 
                 if low_items:
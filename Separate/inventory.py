@@ -9,6 +9,11 @@ from datetime import datetime
 from typing import Optional
 import ctypes
 from ctypes import wintypes
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from inventory_search import search_inventory
+from schema import LOW_STOCK_SQL, migrate
 
 class InventoryManager:
     def __init__(self, root, current_user, user_role, db_path, back_callback=None):
@@ -24,6 +29,7 @@ class InventoryManager:
         # ✅ Use the database path passed from ManagerDashboard instead of creating a new one
         self.db_path = db_path
         self.conn = sqlite3.connect(self.db_path)
+        migrate(self.conn)
 
         # --- UI setup ---
         self.inventory_search_entry = None
@@ -817,10 +823,9 @@ class InventoryManager:
 
     def check_low_inventory(self):
         try:
-            threshold = 10
             with self.conn:
                 cursor = self.conn.cursor()
-                cursor.execute("SELECT item_id, name, quantity FROM inventory WHERE quantity <= ?", (threshold,))
+                cursor.execute(LOW_STOCK_SQL)
                 low_items = cursor.fetchall()
                 if low_items:
                     message = "The following items are low in stock:\n\n" + "\n".join(
@@ -842,27 +847,12 @@ class InventoryManager:
         self.inventory_table.tag_configure('low_stock', background='#DC3545', foreground='#FFFFFF')
 
         with self.conn:
-            cursor = self.conn.cursor()
             query = self.inventory_search_entry.get().strip()
             type_filter = self.type_filter_var.get()
-            sql = "SELECT item_id, name, type, retail_price, quantity, supplier FROM inventory"
-            params = []
-            conditions = []
-
-            if query:
-                conditions.append("(name LIKE ?)")
-                params.append(f"%{query}%")
-            if type_filter not in ["All", "Other"]:
-                conditions.append("type = ?")
-                params.append(type_filter)
-            if conditions:
-                sql += " WHERE " + " AND ".join(conditions)
-
-            # ✅ Add sorting by name (A → Z)
-            sql += " ORDER BY LOWER(name) ASC"
-
-            cursor.execute(sql, params)
-            for item in cursor.fetchall():
+            # Ranked by relevance when searching, A → Z otherwise
+            rows = search_inventory(self.conn, query,
+                                    type_filter=None if type_filter in ["All", "Other"] else type_filter)
+            for item in rows:
                 item_id, name, item_type, retail_price, quantity, supplier = item
                 quantity = int(float(quantity)) if quantity is not None else 0
                 tags = ('low_stock',) if quantity <= 5 else ()
@@ -7,6 +7,8 @@ import sys
 import traceback
 import shutil
 import datetime
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schema import migrate
 
 # Optional: Pillow for icon handling
 try:
@@ -129,86 +131,11 @@ class LoginApp:
         """Create and initialize all required tables."""
         try:
             self.conn = sqlite3.connect(self.db_path)
-            cursor = self.conn.cursor()
-
-            tables = [
-                """CREATE TABLE IF NOT EXISTS users (
-                    username TEXT PRIMARY KEY,
-                    password TEXT,
-                    role TEXT,
-                    status TEXT DEFAULT 'Online'
-                )""",
-                """CREATE TABLE IF NOT EXISTS inventory (
-                    item_id TEXT PRIMARY KEY,
-                    name TEXT,
-                    type TEXT,
-                    retail_price REAL DEFAULT 0.0,
-                    unit_price REAL DEFAULT 0.0,
-                    quantity INTEGER DEFAULT 0,
-                    supplier TEXT
-                )""",
-                """CREATE TABLE IF NOT EXISTS transactions (
-                    transaction_id TEXT PRIMARY KEY,
-                    items TEXT,
-                    total_amount REAL DEFAULT 0.0,
-                    cash_paid REAL DEFAULT 0.0,
-                    change_amount REAL DEFAULT 0.0,
-                    timestamp TEXT,
-                    status TEXT,
-                    payment_method TEXT,
-                    customer_id TEXT
-                )""",
-                """CREATE TABLE IF NOT EXISTS funds (
-                    fund_id TEXT PRIMARY KEY,
-                    type TEXT,
-                    amount REAL DEFAULT 0.0,
-                    timestamp TEXT,
-                    user TEXT
-                )""",
-                """CREATE TABLE IF NOT EXISTS customers (
-                    customer_id TEXT PRIMARY KEY,
-                    name TEXT,
-                    contact TEXT,
-                    address TEXT
-                )""",
-                """CREATE TABLE IF NOT EXISTS likes (
-                    like_id TEXT PRIMARY KEY,
-                    transaction_id TEXT,
-                    customer_id TEXT,
-                    timestamp TEXT,
-                    user TEXT,
-                    FOREIGN KEY (transaction_id) REFERENCES transactions(transaction_id),
-                    FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
-                )""",
-                """CREATE TABLE IF NOT EXISTS transaction_log (
-                    log_id TEXT PRIMARY KEY,
-                    action TEXT,
-                    details TEXT,
-                    timestamp TEXT,
-                    user TEXT
-                )""",
-                """CREATE TABLE IF NOT EXISTS daily_sales (
-                    sale_date TEXT PRIMARY KEY,
-                    total_sales REAL DEFAULT 0.0,
-                    unit_sales INTEGER DEFAULT 0,
-                    net_profit REAL DEFAULT 0.0,
-                    user TEXT
-                )""",
-            ]
-            for sql in tables:
-                cursor.execute(sql)
-
-            # Default users
-            cursor.executemany(
-                "INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?)",
-                [
-                    ("yamato", "ycb-0001", "Drug Lord", "Online"),
-                    ("kongo", "kcb-0001", "User", "Online"),
-                    ("manager", "mcb-0001", "Manager", "Online"),
-                ],
-            )
-
-            self.conn.commit()
+            migrate(self.conn)
+            with self.conn:
+                # The manager dashboard's account; the main POS has no manager role
+                self.conn.execute("INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?)",
+                                  ("manager", "mcb-0001", "Manager", "Online"))
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", f"Database setup failed:\n{e}")
             self.root.destroy()
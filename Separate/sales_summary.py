@@ -10,6 +10,10 @@ from reportlab.lib.styles import getSampleStyleSheet
 import webbrowser
 import ctypes
 from ctypes import wintypes
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from transaction_pages import COMPLETED_COST_SQL, COMPLETED_SALES_SQL, month_bounds
 
 class SalesSummary:
     def __init__(self, root, current_user, user_role, db_path):
@@ -252,16 +256,11 @@ class SalesSummary:
                 cursor.execute('''
                     SELECT strftime('%m', sale_date) AS month,
                            SUM(total_sales) AS total_sales,
-                           SUM((
-                               SELECT SUM(CAST(SUBSTR(t2.items, instr(t2.items, ':') + 1) AS INTEGER) * i.unit_price)
-                               FROM transactions t2
-                               JOIN inventory i ON instr(t2.items, i.item_id) > 0
-                               WHERE strftime('%Y-%m-%d', t2.timestamp) = d.sale_date
-                           )) AS total_unit_cost
-                    FROM daily_sales d
-                    WHERE strftime('%Y', sale_date) = ? AND strftime('%m', sale_date) = ?
+                           SUM(unit_cost) AS total_unit_cost
+                    FROM daily_sales
+                    WHERE sale_date >= ? AND sale_date < ?
                     GROUP BY strftime('%m', sale_date)
-                ''', (year, month.zfill(2)))
+                ''', month_bounds(int(year), int(month)))
                 monthly_data = cursor.fetchall()
                 print(f"Debug: Monthly data for {year}-{month.zfill(2)}: {monthly_data}")
                 month_names = {str(i).zfill(2): name for i, name in enumerate(
@@ -298,16 +297,11 @@ class SalesSummary:
                 cursor.execute('''
                     SELECT sale_date,
                            total_sales,
-                           (
-                               SELECT SUM(CAST(SUBSTR(t2.items, instr(t2.items, ':') + 1) AS INTEGER) * i.unit_price)
-                               FROM transactions t2
-                               JOIN inventory i ON instr(t2.items, i.item_id) > 0
-                               WHERE strftime('%Y-%m-%d', t2.timestamp) = d.sale_date
-                           ) AS total_unit_cost
-                    FROM daily_sales d
-                    WHERE strftime('%Y', sale_date) = ? AND strftime('%m', sale_date) = ?
+                           unit_cost AS total_unit_cost
+                    FROM daily_sales
+                    WHERE sale_date >= ? AND sale_date < ?
                     ORDER BY sale_date DESC
-                ''', (year, month.zfill(2)))
+                ''', month_bounds(int(year), int(month)))
                 daily_data = cursor.fetchall()
                 print(f"Debug: Daily data for {year}-{month.zfill(2)}: {daily_data}")
                 for row in daily_data:
@@ -345,8 +339,8 @@ class SalesSummary:
                 cursor.execute('''
                     SELECT sale_date, total_sales
                     FROM daily_sales
-                    WHERE strftime('%Y', sale_date) = ? AND strftime('%m', sale_date) = ?
-                ''', (str(year), str(month).zfill(2)))
+                    WHERE sale_date >= ? AND sale_date < ?
+                ''', month_bounds(year, month))
                 daily_data = cursor.fetchall()
                 for sale_date, total_sales in daily_data:
                     try:
@@ -402,10 +396,7 @@ class SalesSummary:
             messagebox.showerror("Error", "Invalid month or year selected.", parent=self.root)
             return
 
-        start_date = f"{year}-{month:02d}-01"
-        next_month = month + 1 if month < 12 else 1
-        next_year = year if month < 12 else year + 1
-        end_date = f"{next_year}-{next_month:02d}-01"
+        start_date, end_date = month_bounds(year, month)
 
         try:
             self.conn = sqlite3.connect(self.db_path)
@@ -422,14 +413,10 @@ class SalesSummary:
                         SUM(total_amount) AS total_sales
                     FROM transactions
                     WHERE status = 'Completed'
-                    AND (
-                            substr(timestamp, 1, 4) = ?
-                        OR strftime('%Y', timestamp) = ?
-                    )
-                    AND CAST(substr(timestamp, 6, 2) AS INTEGER) <= ?
+                    AND timestamp >= ? AND timestamp < ?
                     GROUP BY substr(timestamp, 1, 7)
                     ORDER BY month ASC
-                """, (str(year), str(year), month))
+                """, (month_bounds(year, 1)[0], end_date))
                 monthly_data = cursor.fetchall()
 
                 # Convert to dict for easy lookup
@@ -445,23 +432,8 @@ class SalesSummary:
 
                     # Calculate unit cost (if there were transactions)
                     if total_sales > 0:
-                        cursor.execute("""
-                            SELECT items FROM transactions
-                            WHERE status = 'Completed'
-                            AND (substr(timestamp, 1, 7) = ? OR strftime('%Y-%m', timestamp) = ?)
-                        """, (month_key, month_key))
-                        for (items,) in cursor.fetchall():
-                            for item_data in items.split(";"):
-                                if item_data:
-                                    try:
-                                        item_id, qty = item_data.split(":")
-                                        qty = int(qty)
-                                        cursor.execute("SELECT unit_price FROM inventory WHERE item_id = ?", (item_id,))
-                                        item = cursor.fetchone()
-                                        if item:
-                                            total_unit_cost += item[0] * qty
-                                    except (ValueError, IndexError):
-                                        continue
+                        cursor.execute(COMPLETED_COST_SQL, month_bounds(year, m_num))
+                        total_unit_cost = cursor.fetchone()[0]
 
                     monthly_sales[month_key] = {
                         "grand_sales": total_sales,
@@ -472,29 +444,12 @@ class SalesSummary:
                     grand_total_net_profit += (total_sales - total_unit_cost)
 
                 # 🟦 DAILY SALES (only selected month)
-                cursor.execute("""
-                    SELECT strftime('%Y-%m-%d', timestamp) AS date, items, total_amount
-                    FROM transactions
-                    WHERE status = 'Completed'
-                    AND (timestamp >= ? AND timestamp < ?)
-                """, (start_date, end_date))
+                cursor.execute(COMPLETED_SALES_SQL, (start_date, end_date))
 
                 total_unit_sales = total_grand_sales = 0.0
-                for date, items, total_amount in cursor.fetchall():
+                for date, total_amount, unit_sales in cursor.fetchall():
                     if date not in daily_sales:
                         daily_sales[date] = {"unit_sales": 0.0, "grand_sales": 0.0}
-                    unit_sales = 0.0
-                    for item_data in items.split(";"):
-                        if item_data:
-                            try:
-                                item_id, qty = item_data.split(":")
-                                qty = int(qty)
-                                cursor.execute("SELECT unit_price FROM inventory WHERE item_id = ?", (item_id,))
-                                item = cursor.fetchone()
-                                if item:
-                                    unit_sales += item[0] * qty
-                            except (ValueError, IndexError):
-                                continue
                     daily_sales[date]["grand_sales"] += total_amount
                     daily_sales[date]["unit_sales"] += unit_sales
                     total_unit_sales += unit_sales
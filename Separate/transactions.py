@@ -17,6 +17,31 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 import ctypes
 from ctypes import wintypes
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from checkout import restate_daily_sales
+from receipts import load_receipt_by_id
+from schema import LOW_STOCK_SQL
+from transaction_items import (delete_transaction_items, load_editable_items, load_transaction_items,
+                               set_transaction_item_quantities)
+from transaction_pages import id_prefix_condition
+
+
+# One row per transaction with its item summary, read from the sold lines in the same query
+TRANSACTION_LIST_SQL = """
+    SELECT t.transaction_id,
+        GROUP_CONCAT(COALESCE(ti.name, ti.item_id) || ' (' || ti.qty || CASE WHEN ti.qty = 1 THEN ' pc)' ELSE ' pcs)' END, ', '),
+        t.total_amount, t.cash_paid, t.change_amount,
+        t.timestamp, t.status, t.payment_method,
+        COALESCE(c.name, 'N/A') AS customer_name
+    FROM transactions t
+    LEFT JOIN customers c ON t.customer_id = c.customer_id
+    LEFT JOIN transaction_items ti ON ti.transaction_id = t.transaction_id
+    {where}
+    GROUP BY t.transaction_id
+    ORDER BY t.timestamp DESC
+"""
 
 
 class TransactionManager:
@@ -173,10 +198,9 @@ class TransactionManager:
     def check_low_inventory(self):
         try:
             self.conn = sqlite3.connect(self.db_path)
-            threshold = 10
             with self.conn:
                 cursor = self.conn.cursor()
-                cursor.execute("SELECT item_id, name, quantity FROM inventory WHERE quantity <= ?", (threshold,))
+                cursor.execute(LOW_STOCK_SQL)
                 low_items = cursor.fetchall()
                 if low_items:
                     message = "The following items are low in stock:\n\n" + "\n".join(
@@ -228,7 +252,7 @@ class TransactionManager:
         # Search frame with tighter spacing
         search_frame = tk.Frame(content_frame, bg="#FFFFFF", relief="raised", bd=1, highlightbackground="#DEE2E6", highlightthickness=1)
         search_frame.pack(fill="x", pady=self.scale_size(5))
-        tk.Label(search_frame, text="Search by Transaction ID:", font=("Helvetica", self.scale_size(16)),
+        tk.Label(search_frame, text="Transaction ID starts with:", font=("Helvetica", self.scale_size(16)),
                  bg="#FFFFFF", fg="#212529").pack(side="left", padx=self.scale_size(5), pady=self.scale_size(5))
         self.search_entry = tk.Entry(search_frame, font=("Helvetica", self.scale_size(16)), bg="#FFFFFF", fg="#212529")
         self.search_entry.pack(side="left", fill="x", expand=True, padx=self.scale_size(5), pady=self.scale_size(5))
@@ -422,43 +446,16 @@ class TransactionManager:
             with self.conn:
                 cursor = self.conn.cursor()
                 if search_term:
-                    cursor.execute("""
-                        SELECT t.transaction_id, t.items, t.total_amount, t.cash_paid, t.change_amount,
-                            t.timestamp, t.status, t.payment_method,
-                            COALESCE(c.name, 'N/A') AS customer_name
-                        FROM transactions t
-                        LEFT JOIN customers c ON t.customer_id = c.customer_id
-                        WHERE UPPER(t.transaction_id) LIKE UPPER(?)
-                        ORDER BY t.timestamp DESC
-                    """, (f"%{search_term}%",))
+                    condition, params = id_prefix_condition(search_term, "t.transaction_id")
+                    cursor.execute(TRANSACTION_LIST_SQL.format(where="WHERE " + condition), params)
                 else:
-                    cursor.execute("""
-                        SELECT t.transaction_id, t.items, t.total_amount, t.cash_paid, t.change_amount,
-                            t.timestamp, t.status, t.payment_method,
-                            COALESCE(c.name, 'N/A') AS customer_name
-                        FROM transactions t
-                        LEFT JOIN customers c ON t.customer_id = c.customer_id
-                        ORDER BY t.timestamp DESC
-                    """)
+                    cursor.execute(TRANSACTION_LIST_SQL.format(where=""))
                 transactions = cursor.fetchall()
 
 
                 for transaction in transactions:
-                    items_str = transaction[1]
-                    item_names = []
-                    for item_data in items_str.split(";"):
-                        if item_data:
-                            try:
-                                item_id, qty = item_data.split(":")
-                                cursor.execute("SELECT name FROM inventory WHERE item_id = ?", (item_id,))
-                                name = cursor.fetchone()
-                                if name:
-                                    unit = "pc" if int(qty) == 1 else "pcs"
-                                    item_names.append(f"{name[0]} ({qty} {unit})")
-                            except ValueError:
-                                continue
-                    if item_names:
-                        items_display = ", ".join(item_names)
+                    items_display = transaction[1]
+                    if items_display:
                         if len(items_display) > 200:
                             items_display = items_display[:200] + "..."
                     else:
@@ -467,6 +464,7 @@ class TransactionManager:
                     self.transactions_table.insert(
                         "",
                         "end",
+                        iid=transaction[0],
                         values=(
                             transaction[0],
                             items_display,
@@ -520,6 +518,8 @@ class TransactionManager:
                         window.destroy()
                         messagebox.showerror("Error", "Cannot delete unpaid transactions from this view. Use Unpaid Transactions view.", parent=self.root)
                         return
+                    restate_daily_sales(self.conn, transaction_id, self.current_user)
+                    delete_transaction_items(self.conn, transaction_id)
                     cursor.execute("DELETE FROM transactions WHERE transaction_id = ?", (transaction_id,))
                     log_id = f"{datetime.now().strftime('%m-%Y')}-{str(uuid.uuid4())[:6]}"
                     cursor.execute("INSERT INTO transaction_log (log_id, action, details, timestamp, user) VALUES (?, ?, ?, ?, ?)",
@@ -600,18 +600,9 @@ class TransactionManager:
                     messagebox.showerror("Error", "Cannot edit a returned transaction", parent=self.root)
                     return
 
-                items = transaction[0].split(";")
                 edit_items = []
-                for item_data in items:
-                    if item_data:
-                        try:
-                            item_id, qty = item_data.split(":")
-                            cursor.execute("SELECT name, retail_price, quantity FROM inventory WHERE item_id = ?", (item_id,))
-                            item = cursor.fetchone()
-                            if item:
-                                edit_items.append({"id": item_id, "name": item[0], "price": float(item[1]), "original_quantity": int(qty), "current_quantity": int(qty), "inventory_quantity": int(item[2])})
-                        except ValueError:
-                            continue
+                for item_id, name, price, qty, inventory_quantity in load_editable_items(self.conn, transaction_id):
+                    edit_items.append({"id": item_id, "name": name, "price": float(price or 0), "original_quantity": int(qty), "current_quantity": int(qty), "inventory_quantity": int(inventory_quantity or 0)})
 
                 if not edit_items:
                     messagebox.showerror("Error", "No valid items to edit", parent=self.root)
@@ -714,6 +705,9 @@ class TransactionManager:
                     return
 
                 change_amount = new_cash_paid - total_amount if new_cash_paid >= total_amount else 0.0
+                restate_daily_sales(self.conn, transaction_id, self.current_user, items_str, total_amount)
+                set_transaction_item_quantities(self.conn, transaction_id, {
+                    item["id"]: item["current_quantity"] for item in edit_items})
 
                 cursor.execute("""
                     UPDATE transactions SET items = ?, total_amount = ?, cash_paid = ?, change_amount = ?
@@ -758,19 +752,10 @@ class TransactionManager:
 
                 items_str, total_amount, cash_paid, change, timestamp, status, payment_method, customer_id = transaction
 
-                # Parse items
                 item_lines = []
-                for item_data in items_str.split(";"):
-                    if item_data:
-                        try:
-                            item_id, qty = item_data.split(":")
-                            cursor.execute("SELECT name FROM inventory WHERE item_id = ?", (item_id,))
-                            name = cursor.fetchone()
-                            if name:
-                                unit = "pc" if int(qty) == 1 else "pcs"
-                                item_lines.append(f"{name[0]} ({qty} {unit})")
-                        except ValueError:
-                            continue
+                for item_id, name, qty, _, _, _ in load_transaction_items(self.conn, transaction_id):
+                    unit = "pc" if qty == 1 else "pcs"
+                    item_lines.append(f"{name or item_id} ({qty} {unit})")
 
             # Create detail window
             window = tk.Toplevel(self.root)
@@ -829,41 +814,19 @@ class TransactionManager:
             messagebox.showerror("Error", "No transaction selected", parent=self.root)
             return
 
-        transaction_values = self.transactions_table.item(selected_item)["values"]
-        transaction_id = transaction_values[0]
-        timestamp = transaction_values[5]
-        payment_method = transaction_values[7]
-        customer_name = transaction_values[8]
-        total_amount = float(transaction_values[2])
-        cash_paid = float(transaction_values[3])
-        change = float(transaction_values[4])
+        transaction_id = selected_item[0]
 
         try:
             self.conn = sqlite3.connect(self.db_path)
-            with self.conn:
-                cursor = self.conn.cursor()
-                cursor.execute("SELECT items FROM transactions WHERE transaction_id = ?", (transaction_id,))
-                result = cursor.fetchone()
-                if not result:
-                    messagebox.showerror("Error", "Transaction not found.", parent=self.root)
-                    return
-                items_str = result[0]
-
-                # Parse items
-                items = []
-                for item_data in items_str.split(";"):
-                    if item_data:
-                        try:
-                            item_id, qty = item_data.split(":")
-                            qty = int(qty)
-                            cursor.execute("SELECT name, retail_price FROM inventory WHERE item_id = ?", (item_id,))
-                            item_info = cursor.fetchone()
-                            if item_info:
-                                name, price = item_info
-                                subtotal = price * qty
-                                items.append((name, qty, price, subtotal))
-                        except ValueError:
-                            continue
+            receipt = load_receipt_by_id(self.conn, transaction_id)
+            if receipt is None:
+                messagebox.showerror("Error", "Transaction not found.", parent=self.root)
+                return
+            timestamp = receipt.timestamp
+            payment_method = receipt.payment_method
+            customer_name = receipt.customer_name
+            total_amount, cash_paid, change = receipt.total_amount, receipt.cash_paid, receipt.change
+            items = receipt.items
 
             # --- Detect Active Printers ---
             printers = [p[2] for p in win32print.EnumPrinters(
@@ -1070,6 +1033,7 @@ class TransactionManager:
                         except ValueError:
                             continue
 
+                restate_daily_sales(self.conn, transaction_id, self.current_user)
                 cursor.execute("UPDATE transactions SET status = 'Returned' WHERE transaction_id = ?", (transaction_id,))
                 cursor.execute("INSERT INTO transaction_log (log_id, action, details, timestamp, user) VALUES (?, ?, ?, ?, ?)",
                               (f"{datetime.now().strftime('%m-%Y')}-{str(uuid.uuid4())[:6]}",
@@ -7,19 +7,50 @@ import sqlite3
 from datetime import datetime
 import uuid
 from PIL import Image, ImageTk
-from typing import Optional, List, Dict, Callable
+from typing import Optional, List, Dict, Callable, Iterable, Tuple
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 import os
+import queue
+import threading
 from pathlib import Path
 import webbrowser
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from tkcalendar import DateEntry
 import csv
 from tkinter import filedialog
 import logging
+from inventory_index import InventoryIndex
+from inventory_search import search_inventory
+from search_pipeline import SearchPipeline
+from barcode_scanner import BarcodeScanDetector
+from cart import Cart, CartLine
+from stock_cache import StockCache
+from cart_journal import CartJournal
+from checkout import PriceChangedError, commit_sale, restate_daily_sales
+from customers import search_customers
+from schema import LOW_STOCK_SQL, LOW_STOCK_THRESHOLD, TRANSACTION_LOG_SQL, migrate
+from sequences import next_customer_id, next_transaction_id
+from post_checkout import JobNotRemovedError, PostCheckoutWorker
+from receipts import (export_receipts_pdf, load_receipt, load_receipt_by_id, pdf_archive_enabled, receipt_paper_mm,
+                      receipt_printer, reprint_table_style, write_escpos, write_receipt_pdf)
+from transaction_pages import (COMPLETED_SALES_SQL, HELD_TRANSACTIONS_SQL, PAGE_SIZE, TransactionFilter,
+                               fetch_transaction_page, month_bounds, year_bounds)
+from transaction_items import (delete_transaction_items, load_editable_items, load_transaction_items,
+                               priced_lines, set_transaction_item_quantities, write_transaction_items)
 
 class PharmacyPOS:
+    # Keystroke coalescing windows for the search boxes (milliseconds)
+    SEARCH_DEBOUNCE_MS = 150
+    SUGGESTION_DEBOUNCE_MS = 60
+    # Rows shown in the suggestion Listbox
+    SUGGESTION_LIMIT = 8
+    # Most transaction rows kept in the Treeview at once; pages past this are dropped from the far end
+    TRANSACTION_WINDOW_ROWS = 5 * PAGE_SIZE
+    PAYMENT_METHODS = ["Cash", "Credit Card", "Debit Card", "Mobile Payment"]
+    EXPORT_POLL_MS = 200
+    TRANSACTION_STATUSES = ["Completed", "Held", "Returned"]
+
     def __init__(self, root: tk.Tk):
         self.root = root
         self.root.title("Shinano POS")
@@ -52,18 +83,39 @@ class PharmacyPOS:
             return
 
         self.current_user: Optional[str] = None
-        self.cart: List[Dict] = []
-        self.selected_item_index: Optional[int] = None
+        self.cart = Cart()
+        self.selected_item_id: Optional[str] = None
         self.discount_authenticated: bool = False
         self.discount_var = tk.BooleanVar()
         self.sidebar_visible: bool = True
         self.suggestion_window: Optional[tk.Toplevel] = None
         self.suggestion_listbox: Optional[tk.Listbox] = None
+        self.suggestion_item_ids: List[str] = []
+        self.scan_detector = BarcodeScanDetector()
+        self.cart_refresh_ids: set = set()
+        self.cart_row_values: Dict[str, tuple] = {}  # last values rendered per cart_table iid
         self.customer_table: Optional[ttk.Treeview] = None
+        self.inventory_index = InventoryIndex()
+        self.search_pipeline = SearchPipeline(self.root, self.db_path, delay_ms=self.SEARCH_DEBOUNCE_MS)
 
         self.style_config()
         self.create_database()
-        self.initialize_inventory_with_receipt()
+        self.inventory_index.load(self.conn)
+        self.inventory_index.load_velocity(self.conn)
+        self.stock_cache = StockCache(self.conn, self.inventory_index)
+        self.cart_journal = CartJournal(self.root, self.conn)
+        # Rebuild a sale interrupted by a crash before any new mutation is journaled
+        self.recovered_cart_lines, recovered_customer = self.cart_journal.recover(self.cart)
+        if recovered_customer:
+            self.current_customer_id = recovered_customer
+        self.cart_journal.attach(self.cart)
+        # Receipts and stock alerts run after the sale commits, off the Tk thread
+        self.post_checkout = PostCheckoutWorker(
+            self.root, self.db_path,
+            {"receipt": self.receipt_job, "low_stock": self.low_stock_job},
+            self.on_post_checkout_done, self.on_post_checkout_error
+        )
+        self.post_checkout.start()
         self.setup_gui()
         self.root.bind("<F11>", self.toggle_fullscreen)
         self.root.bind("<Escape>", lambda e: self.root.attributes('-fullscreen', False))
@@ -128,6 +180,12 @@ class PharmacyPOS:
         return db_path
 
     def __del__(self):
+        if hasattr(self, 'search_pipeline'):
+            self.search_pipeline.shutdown()
+        if hasattr(self, 'cart_journal'):
+            self.cart_journal.flush()
+        if hasattr(self, 'post_checkout'):
+            self.post_checkout.shutdown()
         if hasattr(self, 'conn'):
             self.conn.close()
 
@@ -158,133 +216,12 @@ class PharmacyPOS:
 
     def create_database(self) -> None:
         try:
-            with self.conn:
-                cursor = self.conn.cursor()
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS users (
-                        username TEXT PRIMARY KEY,
-                        password TEXT,
-                        role TEXT,
-                        status TEXT DEFAULT 'Online'
-                    )
-                ''')
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS inventory (
-                        item_id TEXT PRIMARY KEY,
-                        name TEXT,
-                        type TEXT,
-                        retail_price REAL DEFAULT 0.0,
-                        unit_price REAL DEFAULT 0.0,
-                        quantity INTEGER DEFAULT 0,
-                        supplier TEXT
-                    )
-                ''')
-                # Check if columns exist and add/rename if missing
-                cursor.execute("PRAGMA table_info(inventory)")
-                columns = [col[1] for col in cursor.fetchall()]
-                if 'retail_price' not in columns and 'price' in columns:
-                    cursor.execute("ALTER TABLE inventory RENAME COLUMN price TO retail_price")
-                    print("Renamed price to retail_price in inventory table.")
-                if 'unit_price' not in columns:
-                    cursor.execute("ALTER TABLE inventory ADD COLUMN unit_price REAL DEFAULT 0.0")
-                    print("Added unit_price column to inventory table.")
-                if 'supplier' not in columns:
-                    cursor.execute("ALTER TABLE inventory ADD COLUMN supplier TEXT")
-                    print("Added supplier column to inventory table.")
-                
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS transactions (
-                        transaction_id TEXT PRIMARY KEY,
-                        items TEXT,
-                        total_amount REAL DEFAULT 0.0,
-                        cash_paid REAL DEFAULT 0.0,
-                        change_amount REAL DEFAULT 0.0,
-                        timestamp TEXT,
-                        status TEXT,
-                        payment_method TEXT,
-                        customer_id TEXT
-                    )
-                ''')
-                cursor.execute("PRAGMA table_info(transactions)")
-                columns = [col[1] for col in cursor.fetchall()]
-                if 'payment_method' not in columns:
-                    cursor.execute("ALTER TABLE transactions ADD COLUMN payment_method TEXT")
-                if 'customer_id' not in columns:
-                    cursor.execute("ALTER TABLE transactions ADD COLUMN customer_id TEXT")
-                
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS funds (
-                        fund_id TEXT PRIMARY KEY,
-                        type TEXT,
-                        amount REAL DEFAULT 0.0,
-                        timestamp TEXT,
-                        user TEXT
-                    )
-                ''')
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS customers (
-                        customer_id TEXT PRIMARY KEY,
-                        name TEXT,
-                        contact TEXT,
-                        address TEXT
-                    )
-                ''')
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS likes (
-                        like_id TEXT PRIMARY KEY,
-                        transaction_id TEXT,
-                        customer_id TEXT,
-                        timestamp TEXT,
-                        user TEXT,
-                        FOREIGN KEY (transaction_id) REFERENCES transactions(transaction_id),
-                        FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
-                    )
-                ''')
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS transaction_log (
-                        log_id TEXT PRIMARY KEY,
-                        action TEXT,
-                        details TEXT,
-                        timestamp TEXT,
-                        user TEXT
-                    )
-                ''')
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS daily_sales (
-                        sale_date TEXT PRIMARY KEY,
-                        total_sales REAL DEFAULT 0.0,
-                        unit_sales INTEGER DEFAULT 0,
-                        net_profit REAL DEFAULT 0.0,
-                        user TEXT
-                    )
-                ''')
-                cursor.execute("INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?)", 
-                            ("yamato", "ycb-0001", "Drug Lord", "Online"))
-                cursor.execute("INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?)", 
-                            ("kongo", "kcb-0001", "User", "Online"))
-                self.conn.commit()
+            migrate(self.conn)
         except sqlite3.OperationalError as e:
             print(f"SQLite error in create_database: {e}, Database path: {self.db_path}")
             messagebox.showerror("Database Error", f"Failed to create database: {e}", parent=self.root)
             raise
 
-    def initialize_inventory_with_receipt(self):
-        sample_items = [
-            ("MED001", "Pain Reliever", "Medicine", 10.00, 8.00, 100, "PharmaCorp"),
-            ("SUP001", "Vitamin C", "Supplement", 5.00, 4.00, 200, "HealthSupplies Inc"),
-            ("DEV001", "Thermometer", "Medical Device", 15.00, 12.00, 50, "MediTech Ltd"),
-        ]
-        with self.conn:
-            cursor = self.conn.cursor()
-            for item_id, name, item_type, retail_price, unit_price, quantity, supplier in sample_items:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO inventory 
-                    (item_id, name, type, retail_price, unit_price, quantity, supplier) 
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (item_id, name, item_type, retail_price, unit_price, quantity, supplier))
-            self.conn.commit()
-
-
     def setup_gui(self) -> None:
         self.main_frame = tk.Frame(self.root, bg="#F4E1C1")  # Sandy Beige
         self.main_frame.pack(fill="both", expand=True)
@@ -325,6 +262,8 @@ class PharmacyPOS:
                 messagebox.showerror("Error", "Cart is empty.", parent=self.root)
 
     def clear_frame(self) -> None:
+        # Results still in flight belong to widgets that are about to be destroyed
+        self.search_pipeline.cancel_all()
         for widget in self.main_frame.winfo_children():
             widget.destroy()
         self.main_frame.pack(fill="both", expand=True)
@@ -457,7 +396,7 @@ class PharmacyPOS:
                                "Are you sure you want to log out? Any unsaved cart items will be cleared.",
                                parent=self.root):
             self.cart.clear()
-            self.selected_item_index = None
+            self.selected_item_id = None
             self.discount_var.set(False)
             self.discount_authenticated = False
             self.current_user = None
@@ -508,10 +447,16 @@ class PharmacyPOS:
             user = cursor.fetchone()
             if user:
                 self.current_user = username
+                self.cart_journal.user = username
                 if self.get_user_role() == "Drug Lord":
                     self.show_account_management()
                 else:
                     self.show_dashboard()
+                    if self.recovered_cart_lines:
+                        messagebox.showinfo("Cart Recovered",
+                                            f"Restored {self.recovered_cart_lines} item(s) from the sale in progress before the last shutdown.",
+                                            parent=self.root)
+                        self.recovered_cart_lines = 0
             else:
                 messagebox.showerror("Error", "Invalid credentials", parent=self.root)
 
@@ -545,6 +490,7 @@ class PharmacyPOS:
 
         self.search_entry = tk.Entry(entry_frame, font=("Helvetica", self.scale_size(18)), bg="#F4E1C1", fg="#2C3E50", bd=0, highlightthickness=0)  # Sandy Beige, Dark Slate
         self.search_entry.pack(side="left", fill="x", expand=True, ipady=self.scale_size(5))
+        self.search_entry.bind("<KeyPress>", self.scan_detector.feed)
         self.search_entry.bind("<KeyRelease>", self.update_suggestions)
         self.search_entry.bind("<FocusOut>", self.on_entry_focus_out)
 
@@ -554,7 +500,7 @@ class PharmacyPOS:
 
         self.search_entry.bind("<Down>", self.move_selection_down)
         self.search_entry.bind("<Up>", self.move_selection_up)
-        self.search_entry.bind("<Return>", self.select_suggestion)
+        self.search_entry.bind("<Return>", self.handle_search_return)
 
         self.clear_btn = tk.Button(entry_frame, text="✕", command=self.clear_search,
                                 bg="#F4E1C1", fg="#2C3E50", font=("Helvetica", self.scale_size(12)),  # Sandy Beige, Dark Slate
@@ -673,7 +619,11 @@ class PharmacyPOS:
         # 🚫 Ignore arrow keys and Enter, so the listbox doesn't reset/vanish
         if event and event.keysym in ("Up", "Down", "Return"):
             return
+        self.search_pipeline.debounce("suggestions", self.refresh_suggestions, delay_ms=self.SUGGESTION_DEBOUNCE_MS)
 
+    def refresh_suggestions(self) -> None:
+        if not self.search_entry.winfo_exists():
+            return
         query = self.search_entry.get().strip()
         if not self.suggestion_window or not self.suggestion_window.winfo_exists():
             self.suggestion_window = tk.Toplevel(self.root)
@@ -701,36 +651,33 @@ class PharmacyPOS:
             self.suggestion_listbox.bind("<FocusOut>", lambda e: self.hide_suggestion_window())
 
         self.suggestion_listbox.delete(0, tk.END)
+        self.suggestion_item_ids = []
         if query:
-            with self.conn:
-                cursor = self.conn.cursor()
-                cursor.execute(
-                    "SELECT name, retail_price, quantity, supplier FROM inventory WHERE name LIKE ?",
-                    (f"%{query}%",)
+            # Served from the in-memory index; best matches first, typos tolerated
+            suggestions = self.inventory_index.rank(query, self.SUGGESTION_LIMIT)
+
+            if suggestions:
+                for item in suggestions:
+                    display_text = f"{item.name} - ₱{item.retail_price:.2f} (Stock: {item.quantity}, Supplier: {item.supplier or 'Unknown'})"
+                    self.suggestion_listbox.insert(tk.END, display_text)
+                    self.suggestion_item_ids.append(item.item_id)
+
+                # auto-highlight first suggestion
+                self.suggestion_listbox.selection_clear(0, tk.END)
+                self.suggestion_listbox.selection_set(0)
+                self.suggestion_listbox.activate(0)
+                self.suggestion_listbox.see(0)
+
+                search_width = self.search_entry.winfo_width()
+                self.suggestion_window.geometry(
+                    f"{search_width}x{self.suggestion_listbox.winfo_reqheight()}+"
+                    f"{self.search_entry.winfo_rootx()}+{self.search_entry.winfo_rooty() + self.search_entry.winfo_height()}"
                 )
-                suggestions = cursor.fetchall()
-
-                if suggestions:
-                    # auto-highlight first suggestion
-                    self.suggestion_listbox.selection_clear(0, tk.END)
-                    self.suggestion_listbox.selection_set(0)
-                    self.suggestion_listbox.activate(0)
-                    self.suggestion_listbox.see(0)
-
-                    for name, retail_price, quantity, supplier in suggestions:
-                        display_text = f"{name} - ₱{retail_price:.2f} (Stock: {quantity}, Supplier: {supplier or 'Unknown'})"
-                        self.suggestion_listbox.insert(tk.END, display_text)
-
-                    search_width = self.search_entry.winfo_width()
-                    self.suggestion_window.geometry(
-                        f"{search_width}x{self.suggestion_listbox.winfo_reqheight()}+"
-                        f"{self.search_entry.winfo_rootx()}+{self.search_entry.winfo_rooty() + self.search_entry.winfo_height()}"
-                    )
-                    self.suggestion_window.deiconify()
-                    self.clear_btn.pack(side="right", padx=(0, 5))
-                else:
-                    self.hide_suggestion_window()
-                    self.clear_btn.pack_forget()
+                self.suggestion_window.deiconify()
+                self.clear_btn.pack(side="right", padx=(0, 5))
+            else:
+                self.hide_suggestion_window()
+                self.clear_btn.pack_forget()
 
 
     def highlight_on_hover(self, event: tk.Event) -> None:
@@ -748,6 +695,7 @@ class PharmacyPOS:
             self.clear_btn.pack_forget()
 
     def move_selection_up(self, event: tk.Event) -> None:
+        self.search_pipeline.flush("suggestions")
         if self.suggestion_window and self.suggestion_window.winfo_exists():
             current_selection = self.suggestion_listbox.curselection()
             if current_selection:
@@ -762,6 +710,7 @@ class PharmacyPOS:
                 self.suggestion_listbox.see(0)
 
     def move_selection_down(self, event: tk.Event) -> None:
+        self.search_pipeline.flush("suggestions")
         if self.suggestion_window and self.suggestion_window.winfo_exists():
             current_selection = self.suggestion_listbox.curselection()
             if current_selection:
@@ -775,42 +724,67 @@ class PharmacyPOS:
                 self.suggestion_listbox.selection_set(0)
                 self.suggestion_listbox.see(0)
 
+    def handle_search_return(self, event: tk.Event) -> str:
+        code = self.scan_detector.take_scan(event)
+        if code is None:
+            self.select_suggestion(event)
+            return "break"
+        # Scanner burst: skip the suggestion list and add by item_id directly
+        self.search_pipeline.cancel("suggestions")
+        self.search_entry.delete(0, tk.END)
+        self.hide_suggestion_window()
+        self.clear_btn.pack_forget()
+        self.add_scanned_item(code)
+        return "break"
+
+    def add_scanned_item(self, item_id: str) -> None:
+        item = self.inventory_index.get(item_id)
+        if item is None:
+            # Possibly added from another terminal since the index was loaded
+            self.inventory_index.reload_items(self.conn, [item_id])
+            item = self.inventory_index.get(item_id)
+        if item is None:
+            messagebox.showerror("Error", f"No item with barcode {item_id}", parent=self.root)
+            return
+        if self.add_to_cart(item.item_id, item.name, item.retail_price):
+            self.schedule_cart_refresh(item.item_id)
+
+    def schedule_cart_refresh(self, item_id: str) -> None:
+        """Redraw changed cart rows once per idle cycle so back-to-back scans don't each repaint."""
+        if not self.cart_refresh_ids:
+            self.root.after_idle(self.flush_cart_refresh)
+        self.cart_refresh_ids.add(item_id)
+
+    def flush_cart_refresh(self) -> None:
+        changed, self.cart_refresh_ids = self.cart_refresh_ids, set()
+        self.update_cart_table(changed)
+
+    def add_to_cart(self, item_id: str, name: str, retail_price: float) -> bool:
+        """Add one unit of an item to the cart, enforcing stock; returns False if refused."""
+        stock = self.stock_cache.available(item_id) or 0
+        if stock <= 0:  # Check if stock is zero
+            messagebox.showerror("Error", f"Cannot add {name} to cart: Out of stock", parent=self.root)
+            return False
+        line = self.cart.get(item_id)
+        if line is not None and line.quantity + 1 > stock:
+            messagebox.showerror("Error", f"Cannot add more {name}: Only {stock} in stock", parent=self.root)
+            return False
+        self.cart.add(item_id, name, retail_price)
+        return True
+
     def select_suggestion(self, event: Optional[tk.Event] = None) -> None:
+        # Enter right after typing must act on the list for the full query
+        self.search_pipeline.flush("suggestions")
         if self.suggestion_window and self.suggestion_window.winfo_exists():
             selection = self.suggestion_listbox.curselection()
-            if selection:
-                selected_text = self.suggestion_listbox.get(selection[0])
-                item_name = selected_text.split(" - ")[0]
-                with self.conn:
-                    cursor = self.conn.cursor()
-                    cursor.execute("SELECT item_id, name, retail_price, quantity FROM inventory WHERE name = ?", (item_name,))
-                    item = cursor.fetchone()
-                    if item:
-                        if item[3] <= 0:  # Check if stock is zero
-                            messagebox.showerror("Error", f"Cannot add {item[1]} to cart: Out of stock", parent=self.root)
-                            return
-                        for cart_item in self.cart:
-                            if cart_item["id"] == item[0]:
-                                if cart_item["quantity"] + 1 > item[3]:
-                                    messagebox.showerror("Error", f"Cannot add more {item[1]}: Only {item[3]} in stock", parent=self.root)
-                                    return
-                                cart_item["quantity"] += 1
-                                cart_item["subtotal"] = (cart_item["retail_price"] * cart_item["quantity"]) - \
-                                                        (cart_item["retail_price"] * cart_item["quantity"] * 0.2 if cart_item.get('discount_applied', False) else 0)
-                                break
-                        else:
-                            self.cart.append({
-                                "id": item[0],
-                                "name": item[1],
-                                "retail_price": item[2],
-                                "quantity": 1,
-                                "subtotal": item[2],
-                                "discount_applied": False
-                            })
-                        self.update_cart_table()
-                        self.search_entry.delete(0, tk.END)
-                        self.hide_suggestion_window()
-                        self.clear_btn.pack_forget()
+            if selection and selection[0] < len(self.suggestion_item_ids):
+                # Resolve by item_id, not display name, so duplicate names pick the right row
+                item = self.inventory_index.get(self.suggestion_item_ids[selection[0]])
+                if item and self.add_to_cart(item.item_id, item.name, item.retail_price):
+                    self.update_cart_table([item.item_id])
+                    self.search_entry.delete(0, tk.END)
+                    self.hide_suggestion_window()
+                    self.clear_btn.pack_forget()
 
     def update_change(self, event: Optional[tk.Event] = None) -> None:
         try:
@@ -831,35 +805,35 @@ class PharmacyPOS:
         if not self.cart:
             messagebox.showerror("Error", "Cart is empty. Cannot apply discount.", parent=self.root)
             return
-        if self.selected_item_index is None:
+        line = self.cart.get(self.selected_item_id) if self.selected_item_id is not None else None
+        if line is None:
             messagebox.showerror("Error", "Please select an item to apply discount.", parent=self.root)
             return
-        # Toggle discount for the selected item
-        item = self.cart[self.selected_item_index]
-        item['discount_applied'] = not item.get('discount_applied', False)
-        if item['discount_applied'] and not self.discount_authenticated:
+        # Toggle discount for the selected item; turning it on needs admin approval first
+        if not line.discount_applied and not self.discount_authenticated:
             self.create_password_auth_window(
                 "Authenticate Discount",
-                f"Enter admin password to apply 20% discount to {item['name']}",
+                f"Enter admin password to apply 20% discount to {line.name}",
                 self.validate_discount_auth,
-                item_index=self.selected_item_index
+                item_id=line.item_id
             )
         else:
+            self.cart.set_discount(line.item_id, not line.discount_applied)
             self.discount_authenticated = False
-            self.update_cart_table()
+            self.update_cart_table([line.item_id])
             self.update_discount_status_label()
 
     def update_discount_status_label(self) -> None:
         if hasattr(self, 'discount_status_label') and self.discount_status_label.winfo_exists():
-            discounted_items = [item['name'] for item in self.cart if item.get('discount_applied', False)]
+            discounted_items = self.cart.discounted_names()
             if discounted_items:
                 self.discount_status_label.config(text=f"Discount Applied to: {', '.join(discounted_items)}")
             else:
                 self.discount_status_label.config(text="Discount: Not Applied")
 
     def validate_discount_auth(self, password: str, window: tk.Toplevel, **kwargs) -> None:
-        item_index = kwargs.get('item_index')
-        if item_index is None or not (0 <= item_index < len(self.cart)):
+        item_id = kwargs.get('item_id')
+        if item_id is None or item_id not in self.cart:
             window.destroy()
             messagebox.showerror("Error", "Invalid item selected for discount.", parent=self.root)
             return
@@ -869,67 +843,47 @@ class PharmacyPOS:
             admin_passwords = [row[0] for row in cursor.fetchall()]
             if password in admin_passwords:
                 self.discount_authenticated = True
-                self.cart[item_index]['discount_applied'] = True
-                self.update_cart_table()
+                self.cart.set_discount(item_id, True)
+                self.update_cart_table([item_id])
                 self.update_discount_status_label()
                 window.destroy()
-                messagebox.showinfo("Success", f"Discount applied to {self.cart[item_index]['name']}", parent=self.root)
+                messagebox.showinfo("Success", f"Discount applied to {self.cart.get(item_id).name}", parent=self.root)
             else:
-                self.cart[item_index]['discount_applied'] = False
+                self.cart.set_discount(item_id, False)
                 self.discount_authenticated = False
-                self.update_cart_table()
+                self.update_cart_table([item_id])
                 self.update_discount_status_label()
                 window.destroy()
                 messagebox.showerror("Error", "Invalid admin password", parent=self.root)
 
-    def update_cart_table(self) -> None:
-        # CORRECTED: Removed update_quantity_display call
-        if hasattr(self, 'cart_table') and self.cart_table.winfo_exists():
-            for item in self.cart_table.get_children():
-                self.cart_table.delete(item)
-            for item in self.cart:
-                discount = item['retail_price'] * item['quantity'] * 0.2 if item.get('discount_applied', False) else 0
-                subtotal = (item['retail_price'] * item['quantity']) - discount
-                item['subtotal'] = subtotal
-                display_name = f"{item['name']} (20% OFF)" if item.get('discount_applied', False) else item['name']
-                self.cart_table.insert("", "end", values=(
-                    display_name, f"{item['retail_price']:.2f}", item['quantity'], f"{subtotal:.2f}"
-                ))
-            self.update_cart_totals()
-
-
-
     def on_item_select(self, event: tk.Event) -> None:
         selected_item = self.cart_table.selection()
-        if selected_item:
-            item_index = self.cart_table.index(selected_item[0])
-            if 0 <= item_index < len(self.cart):
-                self.selected_item_index = item_index
-            else:
-                self.selected_item_index = None
+        # Row iids are item_ids, so the selection maps straight onto the cart
+        if selected_item and selected_item[0] in self.cart:
+            self.selected_item_id = selected_item[0]
         else:
-            self.selected_item_index = None
+            self.selected_item_id = None
     
     def edit_quantity_window(self, event: Optional[tk.Event] = None) -> None:
-        if not self.cart or self.selected_item_index is None:
+        item = self.cart.get(self.selected_item_id) if self.selected_item_id is not None else None
+        if item is None:
             messagebox.showerror("Error", "No item selected or cart is empty", parent=self.root)
             return
-        item = self.cart[self.selected_item_index]
         window = tk.Toplevel(self.root)
-        window.title(f"Edit Quantity for {item['name']}")
+        window.title(f"Edit Quantity for {item.name}")
         window.geometry("300x200")
         window.configure(bg="#F5F5DC")
 
         edit_box = tk.Frame(window, bg="#ffffff", padx=20, pady=20, bd=1, relief="flat")
         edit_box.pack(pady=20)
 
-        tk.Label(edit_box, text=f"Edit Quantity for {item['name']}", font=("Helvetica", 18, "bold"),
+        tk.Label(edit_box, text=f"Edit Quantity for {item.name}", font=("Helvetica", 18, "bold"),
                 bg="#ffffff", fg="#8B5A2B").pack(pady=10)
         tk.Label(edit_box, text="Quantity", font=("Helvetica", 12),
                 bg="#ffffff", fg="#8B5A2B").pack()
         quantity_entry = tk.Entry(edit_box, font=("Helvetica", 12), bg="#F5F5DC")
         quantity_entry.pack(pady=5, fill="x")
-        quantity_entry.insert(0, str(item["quantity"]))
+        quantity_entry.insert(0, str(item.quantity))
         quantity_entry.focus_set()
 
 
@@ -939,21 +893,15 @@ class PharmacyPOS:
                 if new_quantity < 0:
                     messagebox.showerror("Error", "Quantity cannot be negative.", parent=window)
                     return
-                with self.conn:
-                    cursor = self.conn.cursor()
-                    cursor.execute("SELECT quantity FROM inventory WHERE item_id = ?", (item["id"],))
-                    inventory_qty = cursor.fetchone()[0]
-                    if new_quantity > inventory_qty:
-                        messagebox.showerror("Error", f"Insufficient stock for {item['name']}. Available: {inventory_qty}", parent=window)
-                        return
-                    item["quantity"] = new_quantity
-                    discount = item['retail_price'] * new_quantity * 0.2 if item.get('discount_applied', False) else 0
-                    item["subtotal"] = (item["retail_price"] * new_quantity) - discount
-                    if new_quantity == 0:
-                        self.cart.pop(self.selected_item_index)
-                    self.selected_item_index = None
-                    self.update_cart_table()
-                    window.destroy()
+                inventory_qty = self.stock_cache.available(item.item_id) or 0
+                if new_quantity > inventory_qty:
+                    messagebox.showerror("Error", f"Insufficient stock for {item.name}. Available: {inventory_qty}", parent=window)
+                    return
+                if item.item_id in self.cart:
+                    self.cart.set_quantity(item.item_id, new_quantity)
+                self.selected_item_id = None
+                self.update_cart_table([item.item_id])
+                window.destroy()
             except ValueError:
                 messagebox.showerror("Error", "Invalid quantity.", parent=window)
 
@@ -964,14 +912,16 @@ class PharmacyPOS:
         quantity_entry.bind("<Return>", lambda e: update_quantity())
 
     def update_quantity_display(self) -> None:
-        if self.selected_item_index is not None and 0 <= self.selected_item_index < len(self.cart):
+        line = self.cart.get(self.selected_item_id) if self.selected_item_id is not None else None
+        if line is not None:
             self.quantity_entry.delete(0, tk.END)
-            self.quantity_entry.insert(0, str(self.cart[self.selected_item_index]["quantity"]))
+            self.quantity_entry.insert(0, str(line.quantity))
         else:
             self.quantity_entry.delete(0, tk.END)
 
     def adjust_quantity(self, event: Optional[tk.Event] = None) -> None:
-        if self.selected_item_index is None or not (0 <= self.selected_item_index < len(self.cart)):
+        item = self.cart.get(self.selected_item_id) if self.selected_item_id is not None else None
+        if item is None:
             return
         try:
             new_quantity = int(self.quantity_entry.get())
@@ -979,46 +929,25 @@ class PharmacyPOS:
                 messagebox.showerror("Error", "Quantity cannot be negative.", parent=self.root)
                 self.update_quantity_display()
                 return
-            item = self.cart[self.selected_item_index]
-            with self.conn:
-                cursor = self.conn.cursor()
-                cursor.execute("SELECT quantity FROM inventory WHERE item_id = ?", (item["id"],))
-                inventory_qty = cursor.fetchone()[0]
-                if new_quantity > inventory_qty:
-                    messagebox.showerror("Error", f"Insufficient stock for {item['name']}. Available: {inventory_qty}", parent=self.root)
-                    self.update_quantity_display()
-                    return
-                item["quantity"] = new_quantity
-                discount = item['retail_price'] * new_quantity * 0.2 if item.get('discount_applied', False) else 0
-                item["subtotal"] = (item["retail_price"] * new_quantity) - discount
-                if new_quantity == 0:
-                    self.cart.pop(self.selected_item_index)
-                self.update_cart_table()
-                self.selected_item_index = None
-                self.quantity_entry.config(state="disabled")
+            inventory_qty = self.stock_cache.available(item.item_id) or 0
+            if new_quantity > inventory_qty:
+                messagebox.showerror("Error", f"Insufficient stock for {item.name}. Available: {inventory_qty}", parent=self.root)
+                self.update_quantity_display()
+                return
+            self.cart.set_quantity(item.item_id, new_quantity)
+            self.update_cart_table([item.item_id])
+            self.selected_item_id = None
+            self.quantity_entry.config(state="disabled")
         except ValueError:
             messagebox.showerror("Error", "Invalid quantity.", parent=self.root)
             self.update_quantity_display()
 
-    def update_cart_totals(self) -> None:
-        final_total = sum(((item['retail_price'] or 0) * (item['quantity'] or 0)) - 
-                 (((item['retail_price'] or 0) * (item['quantity'] or 0) * 0.2) if item.get('discount_applied', False) else 0) 
-                 for item in self.cart)
-
-        if "Final Total " in self.summary_entries and self.summary_entries["Final Total "].winfo_exists():
-            self.summary_entries["Final Total "].config(state="normal")
-            self.summary_entries["Final Total "].delete(0, tk.END)
-            self.summary_entries["Final Total "].insert(0, f"{final_total:.2f}")
-            self.summary_entries["Final Total "].config(state="readonly")
-
-        self.update_change()
-
     def confirm_clear_cart(self) -> None:
         if messagebox.askyesno("Confirm Clear Cart",
                                "Are you sure you want to clear the cart? This action cannot be undone.",
                                parent=self.root):
             self.cart.clear()
-            self.selected_item_index = None
+            self.selected_item_id = None
             self.discount_var.set(False)
             self.discount_authenticated = False
             self.update_cart_table()
@@ -1047,32 +976,8 @@ class PharmacyPOS:
             messagebox.showerror("Error", "Please enter a valid cash amount.", parent=self.root)
 
     def generate_transaction_id(self) -> str:
-   
-        current_time = datetime.now()
-        month_year = current_time.strftime("%m-%Y")  # Format: MM-YYYY
-        
-        with self.conn:
-            cursor = self.conn.cursor()
-            # Query the latest transaction ID for the current month and year
-            cursor.execute("""
-                SELECT transaction_id 
-                FROM transactions 
-                WHERE transaction_id LIKE ? 
-                ORDER BY transaction_id DESC 
-                LIMIT 1
-            """, (f"{month_year}%",))
-            last_transaction = cursor.fetchone()
-            
-            if last_transaction:
-                # Extract the sequential number from the last transaction ID
-                last_seq = int(last_transaction[0][-6:])  # Last 6 digits
-                new_seq = last_seq + 1
-            else:
-                new_seq = 1  # Start at 1 if no transactions exist for this month/year
-            
-            # Format the new transaction ID
-            transaction_id = f"{month_year}-{new_seq:06d}"  # Ensures 6-digit padding
-            return transaction_id
+        """Next MM-YYYY-T<terminal>-NNNNNN id from this terminal's sequence."""
+        return next_transaction_id(self.conn)
 
     def process_checkout(self, cash_paid: float, final_total: float) -> None:
         logging.debug("Starting process_checkout")
@@ -1121,63 +1026,32 @@ class PharmacyPOS:
                 return
 
             transaction_id = self.generate_transaction_id()
-            items = ";".join([f"{item['id']}:{item['quantity']}" for item in self.cart])
             change = float(cash_paid or 0) - float(final_total or 0)
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            sale_date = datetime.now().strftime("%Y-%m-%d")
             payment_method = getattr(self, 'current_payment_method', 'Cash')
             customer_id = getattr(self, 'current_customer_id', None)
 
-            # Calculate unit sales and net profit
-            unit_sales = sum(item["quantity"] for item in self.cart)
-            net_profit = 0.0
-            with self.conn:
-                cursor = self.conn.cursor()
-                # Validate stock and calculate net profit
-                for item in self.cart:
-                    cursor.execute("SELECT retail_price, unit_price, quantity FROM inventory WHERE item_id = ?",
-                                (item["id"],))
-                    result = cursor.fetchone()
-                    if not result:
-                        raise ValueError(f"Item {item['id']} not found in inventory")
-                    retail_price, unit_price, current_quantity = result
-                    if current_quantity < item["quantity"]:
-                        raise ValueError(f"Insufficient stock for item {item['id']}: {current_quantity} available")
-                    net_profit += (retail_price - unit_price) * item["quantity"]
-                    # Decrease inventory quantity
-                    cursor.execute("UPDATE inventory SET quantity = quantity - ? WHERE item_id = ?",
-                                (item["quantity"], item["id"]))
-
-                # Insert transaction
-                cursor.execute('''
-                    INSERT INTO transactions (transaction_id, items, total_amount, cash_paid, change_amount, timestamp, status, payment_method, customer_id)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (transaction_id, items, final_total, cash_paid, change, timestamp, "Completed", payment_method, customer_id))
-
-                # Update daily_sales
-                cursor.execute("SELECT total_sales, unit_sales, net_profit FROM daily_sales WHERE sale_date = ?", (sale_date,))
-                existing_sale = cursor.fetchone()
-                if existing_sale:
-                    new_total_sales = existing_sale[0] + final_total
-                    new_unit_sales = existing_sale[1] + unit_sales
-                    new_net_profit = existing_sale[2] + net_profit
-                    cursor.execute("UPDATE daily_sales SET total_sales = ?, unit_sales = ?, net_profit = ?, user = ? WHERE sale_date = ?",
-                                (new_total_sales, new_unit_sales, new_net_profit, self.current_user, sale_date))
-                else:
-                    cursor.execute("INSERT INTO daily_sales (sale_date, total_sales, unit_sales, net_profit, user) VALUES (?, ?, ?, ?, ?)",
-                                (sale_date, final_total, unit_sales, net_profit, self.current_user))
-
-                # Insert transaction log
-                cursor.execute('''
-                    INSERT INTO transaction_log (log_id, action, details, timestamp, user)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (str(uuid.uuid4()), "Checkout", f"Completed transaction {transaction_id}", timestamp, self.current_user))
-
-                self.conn.commit()
+            jobs = [
+                ("receipt", {"transaction_id": transaction_id, "timestamp": timestamp,
+                             "total_amount": final_total, "cash_paid": cash_paid, "change": change}),
+                ("low_stock", {"item_ids": [line.item_id for line in self.cart], "user": self.current_user}),
+            ]
+            # One transaction: bulk stock check, guarded bulk decrement, daily_sales upsert, outbox jobs
+            result = commit_sale(
+                self.conn, transaction_id, [(line.item_id, line.quantity) for line in self.cart],
+                final_total, cash_paid, change, timestamp, payment_method, customer_id, self.current_user,
+                discounts={line.item_id: line.discount for line in self.cart if line.discount_applied},
+                jobs=jobs,
+                prices={line.item_id: line.retail_price for line in self.cart}
+            )
+            self.post_checkout.notify()
+            self.stock_cache.update_quantities(result.remaining)
+            for item in self.cart:
+                self.inventory_index.record_sale(item.item_id, item.quantity)
 
             # Clear UI elements
             self.cart.clear()
-            self.selected_item_index = None
+            self.selected_item_id = None
             self.update_cart_table()
             self.discount_authenticated = False
             self.discount_var.set(False)
@@ -1188,19 +1062,30 @@ class PharmacyPOS:
                 self.summary_entries["Cash Paid "].delete(0, tk.END)
                 self.summary_entries["Cash Paid "].insert(0, "0.00")
             if "Change " in self.summary_entries and self.summary_entries["Change "].winfo_exists():
+                # Leave this sale's change on screen rather than in a modal, so the next scan isn't blocked
                 self.summary_entries["Change "].config(state="normal")
                 self.summary_entries["Change "].delete(0, tk.END)
-                self.summary_entries["Change "].insert(0, "0.00")
+                self.summary_entries["Change "].insert(0, f"{change:.2f}")
                 self.summary_entries["Change "].config(state="readonly")
 
             if hasattr(self, 'customer_label') and self.customer_label.winfo_exists():
                 self.customer_label.config(text="No Customer Selected")
 
-            messagebox.showinfo("Success", f"Transaction completed. Change: ₱{change:.2f}", parent=self.root)
-
-            self.generate_receipt(transaction_id, timestamp, items, final_total, cash_paid, change)
-            self.check_low_inventory()
-
+            logging.info(f"Transaction {transaction_id} completed. Change: {change:.2f}")
+
+        except PriceChangedError as e:
+            logging.info(f"Checkout stopped, prices changed: {e.prices}")
+            self.inventory_index.reload_items(self.conn, e.prices)
+            for item_id, retail_price in e.prices.items():
+                self.cart.set_price(item_id, retail_price)
+            self.update_cart_table(e.prices)
+            names = ", ".join(self.cart.get(item_id).name for item_id in e.prices)
+            messagebox.showwarning(
+                "Prices Changed",
+                f"The price of {names} was changed on another terminal. The cart has been updated; "
+                f"the new total is {self.cart.total:.2f}. Please confirm the payment again.",
+                parent=self.root
+            )
         except (sqlite3.Error, ValueError) as e:
             logging.error(f"Checkout failed: {e}")
             messagebox.showerror("Error", f"Failed to process transaction: {e}", parent=self.root)
@@ -1209,72 +1094,122 @@ class PharmacyPOS:
             messagebox.showerror("Error", f"An unexpected error occurred: {e}", parent=self.root)
 
 
-    def generate_receipt(self, transaction_id: str, timestamp: str, items: str, total_amount: float, cash_paid: float, change: float) -> None:
-        try:
+    def receipt_job(self, conn: sqlite3.Connection, payload: Dict) -> List[str]:
+        """Post-checkout job: print the thermal receipt, plus a PDF copy if archiving is on.
+
+        Nothing is printed when no printer is configured; pointing
+        SHINANO_RECEIPT_PRINTER at a directory keeps .bin files there instead.
+        Runs on the worker thread.
+        """
+        receipt = load_receipt(conn, payload["transaction_id"], payload["timestamp"],
+                               payload["total_amount"], payload["cash_paid"], payload["change"])
+        written = []
+        printer = receipt_printer()
+        if printer is not None:
+            written.append(write_escpos(receipt, printer, receipt_paper_mm()))
+        if pdf_archive_enabled():
             receipt_dir = os.path.join(os.path.dirname(self.db_path), "receipts")
-            os.makedirs(receipt_dir, exist_ok=True)
-            receipt_path = os.path.join(receipt_dir, f"receipt_{transaction_id}.pdf")
-            
-            c = canvas.Canvas(receipt_path, pagesize=letter)
-            c.setFont("Helvetica", 12)
-            
-            c.drawString(100, 750, "Shinano Pharmacy Receipt")
-            c.drawString(100, 730, f"Transaction ID: {transaction_id}")
-            c.drawString(100, 710, f"Date: {timestamp}")
-            c.drawString(100, 690, "-" * 50)
-            
-            y = 670
-            c.drawString(100, y, "Item | Quantity | Price | Subtotal")
-            y -= 20
-            
-            for item_str in items.split(";"):
-                item_id, qty = item_str.split(":")
-                qty = int(qty)
-                with self.conn:
-                    cursor = self.conn.cursor()
-                    cursor.execute("SELECT name, retail_price FROM inventory WHERE item_id = ?", (item_id,))
-                    item_data = cursor.fetchone()
-                    if item_data:
-                        name, price = item_data
-                        subtotal = (price or 0) * (qty or 0)
-                        c.drawString(100, y, f"{name} | {qty} | ₱{price:.2f} | ₱{subtotal:.2f}")
-                        y -= 20
-            
-            c.drawString(100, y - 20, "-" * 50)
-            c.drawString(100, y - 40, f"Total: ₱{total_amount:.2f}")
-            c.drawString(100, y - 60, f"Cash Paid: ₱{cash_paid:.2f}")
-            c.drawString(100, y - 80, f"Change: ₱{change:.2f}")
-            
-            c.showPage()
-            c.save()
-            
-            print(f"Receipt generated at {receipt_path}")
-        except Exception as e:
-            print(f"Error generating receipt: {e}")
-            messagebox.showerror("Error", f"Failed to generate receipt: {e}", parent=self.root)
-
-    def update_cart_table(self) -> None:
-        # FIXED: Removed call to update_quantity_display
-        if hasattr(self, 'cart_table') and self.cart_table.winfo_exists():
-            for item in self.cart_table.get_children():
-                self.cart_table.delete(item)
-            for item in self.cart:
-                price = item.get('retail_price') or 0
-                qty = item.get('quantity') or 0
-                discount = price * qty * 0.2 if item.get('discount_applied', False) else 0
-                subtotal = (price * qty) - discount
-                item['subtotal'] = subtotal
-                display_name = f"{item['name']} (20% OFF)" if item.get('discount_applied', False) else item['name']
-                self.cart_table.insert("", "end", values=(
-                    display_name, f"{item['retail_price']:.2f}", item['quantity'], f"{subtotal:.2f}"
-                ))
-            self.update_cart_totals()
+            written.append(write_receipt_pdf(receipt, receipt_dir))
+        return written
+
+    def low_stock_job(self, conn: sqlite3.Connection, payload: Dict) -> List[tuple]:
+        """Post-checkout job: find which of the sold items are now low and log the check.
+
+        The log row is committed by the worker together with the job's removal.
+        """
+        item_ids = payload["item_ids"]
+        placeholders = ",".join("?" * len(item_ids))
+        low_items = conn.execute(
+            f"SELECT item_id, name, quantity FROM inventory WHERE item_id IN ({placeholders}) AND quantity <= ?",
+            item_ids + [LOW_STOCK_THRESHOLD]
+        ).fetchall()
+        conn.execute(
+            "INSERT INTO transaction_log (log_id, action, details, timestamp, user) VALUES (?, ?, ?, ?, ?)",
+            (str(uuid.uuid4()), "Check Inventory", f"Checked low inventory, found {len(low_items)} items",
+             datetime.now().strftime("%Y-%m-%d %H:%M:%S"), payload.get("user") or "System")
+        )
+        return low_items
 
+    def on_post_checkout_done(self, kind: str, payload: Dict, result) -> None:
+        if kind == "receipt":
+            if result:
+                print(f"Receipt written to {', '.join(result)}")
+            else:
+                print(f"No receipt printer configured (SHINANO_RECEIPT_PRINTER); "
+                      f"receipt for {payload['transaction_id']} not printed")
+        elif kind == "low_stock" and result:
+            self.show_low_inventory_alert(result)
+
+    def on_post_checkout_error(self, kind: str, payload: Dict, error: Exception) -> None:
+        print(f"Post-checkout job '{kind}' failed: {error}")
+        if kind == "receipt" and not isinstance(error, JobNotRemovedError):
+            messagebox.showerror("Error", f"Failed to generate receipt for {payload['transaction_id']}: {error}",
+                                 parent=self.root)
+
+    def cart_row_for(self, line: CartLine) -> tuple:
+        display_name = f"{line.name} (20% OFF)" if line.discount_applied else line.name
+        return (display_name, f"{line.retail_price:.2f}", line.quantity, f"{line.subtotal:.2f}")
+
+    def update_cart_table(self, changed: Optional[Iterable[str]] = None) -> None:
+        """Sync cart_table with self.cart, touching only rows that changed.
+
+        Rows use the item_id as their iid, so unchanged rows keep their
+        selection and the view does not jump back to the top. Callers that
+        know which lines they touched pass their item_ids in `changed`, which
+        skips walking the rest of the cart.
+        """
+        if not (hasattr(self, 'cart_table') and self.cart_table.winfo_exists()):
+            return
+        if changed is not None:
+            self.sync_cart_rows(changed)
+        else:
+            self.sync_all_cart_rows()
+        self.update_cart_totals()
+
+    def sync_cart_rows(self, item_ids: Iterable[str]) -> None:
+        for iid in item_ids:
+            line = self.cart.get(iid)
+            if line is None:
+                if self.cart_table.exists(iid):
+                    self.cart_table.delete(iid)
+                self.cart_row_values.pop(iid, None)
+                continue
+            values = self.cart_row_for(line)
+            if not self.cart_table.exists(iid):
+                # New lines are always appended to the cart, so they go last
+                self.cart_table.insert("", "end", iid=iid, values=values)
+            elif self.cart_row_values.get(iid) != values:
+                self.cart_table.item(iid, values=values)
+            self.cart_row_values[iid] = values
+
+    def sync_all_cart_rows(self) -> None:
+        wanted = [(line.item_id, self.cart_row_for(line)) for line in self.cart]
+        wanted_ids = {iid for iid, _ in wanted}
+        children = self.cart_table.get_children()
+        rows = [iid for iid in children if iid in wanted_ids]
+        stale = set(children) - wanted_ids
+        if stale:
+            self.cart_table.delete(*stale)
+        present = set(rows)
+        for index, (iid, values) in enumerate(wanted):
+            if iid not in present:
+                self.cart_table.insert("", index, iid=iid, values=values)
+                rows.insert(index, iid)
+                present.add(iid)
+            else:
+                if self.cart_row_values.get(iid) != values:
+                    self.cart_table.item(iid, values=values)
+                if rows[index] != iid:
+                    self.cart_table.move(iid, "", index)
+                    rows.remove(iid)
+                    rows.insert(index, iid)
+            self.cart_row_values[iid] = values
+        for iid in stale:
+            self.cart_row_values.pop(iid, None)
 
     def update_cart_totals(self) -> None:
-        subtotal = sum((item['retail_price'] * item['quantity']) - 
-                    (item['retail_price'] * item['quantity'] * 0.2 if item.get('discount_applied', False) else 0) 
-                    for item in self.cart)
+        # Running aggregates kept by Cart; no per-line re-summing
+        subtotal = self.cart.total
         final_total = subtotal  # Final total is the sum of discounted subtotals
 
         # Update Subtotal
@@ -1446,6 +1381,7 @@ class PharmacyPOS:
                     cursor = self.conn.cursor()
                     items_added = 0
                     items_skipped = 0
+                    added_ids = []
                     for row in reader:
                         try:
                             item_id = row["BARCODE"].strip()
@@ -1486,6 +1422,7 @@ class PharmacyPOS:
                                 VALUES (?, ?, ?, ?, ?, ?, ?)
                             """, (item_id, name, item_type, retail_price, unit_price, quantity, supplier))
                             items_added += 1
+                            added_ids.append(item_id)
 
                         except (ValueError, KeyError) as e:
                             messagebox.showwarning("Warning", f"Invalid data for item {row.get('ITEM DESCRIPTION', 'unknown')}: {e}", parent=self.root)
@@ -1503,6 +1440,7 @@ class PharmacyPOS:
                         self.current_user
                     ))
                     self.conn.commit()
+                    self.inventory_index.reload_items(self.conn, added_ids)
 
             # Refresh inventory table
             self.update_inventory_table()
@@ -1546,6 +1484,7 @@ class PharmacyPOS:
                               (str(uuid.uuid4()), "Delete Item", f"Deleted item {item_id}: {item_name}",
                                datetime.now().strftime("%Y-%m-%d %H:%M:%S"), self.current_user))
                 self.conn.commit()
+                self.inventory_index.remove(item_id)
                 self.update_inventory_table()
                 window.destroy()
                 messagebox.showinfo("Success", "Item deleted successfully", parent=self.root)
@@ -1734,6 +1673,7 @@ class PharmacyPOS:
                 ))
 
                 self.conn.commit()
+                self.inventory_index.reload_items(self.conn, [item_id])
                 self.update_inventory_table()
                 window.destroy()
                 messagebox.showinfo("Success", "Item added successfully", parent=self.root)
@@ -1935,6 +1875,7 @@ class PharmacyPOS:
                 ))
 
                 self.conn.commit()
+                self.inventory_index.reload_items(self.conn, [original_item_id, item_id])
                 self.update_inventory_table()
                 window.destroy()
                 messagebox.showinfo("Success", f"Item '{name}' updated successfully", parent=self.root)
@@ -1961,19 +1902,21 @@ class PharmacyPOS:
             self.update_item_btn.config(state="disabled")
             self.delete_item_btn.config(state="disabled")
 
+    def show_low_inventory_alert(self, low_items: List[tuple]) -> None:
+        message = "The following items are low in stock:\n\n"
+        for item_id, name, quantity in low_items:
+            message += f"{name} (ID: {item_id}) - Quantity: {quantity}\n"
+        messagebox.showwarning("Low Inventory Alert", message, parent=self.root)
+
     def check_low_inventory(self) -> None:
         try:
-            threshold = 10  # Define low stock threshold (adjustable)
             with self.conn:
                 cursor = self.conn.cursor()
-                cursor.execute("SELECT item_id, name, quantity FROM inventory WHERE quantity <= ?", (threshold,))
+                cursor.execute(LOW_STOCK_SQL)
                 low_items = cursor.fetchall()
                 
                 if low_items:
-                    message = "The following items are low in stock:\n\n"
-                    for item_id, name, quantity in low_items:
-                        message += f"{name} (ID: {item_id}) - Quantity: {quantity}\n"
-                    messagebox.showwarning("Low Inventory Alert", message, parent=self.root)
+                    self.show_low_inventory_alert(low_items)
                 # Optionally, log the check in transaction_log
                 cursor.execute(
                     "INSERT INTO transaction_log (log_id, action, details, timestamp, user) VALUES (?, ?, ?, ?, ?)",
@@ -1989,7 +1932,25 @@ class PharmacyPOS:
             messagebox.showerror("Error", f"Unexpected error checking inventory: {e}", parent=self.root)
     
 
+    def is_search_keystroke(self, event: Optional[tk.Event]) -> bool:
+        """Typing is debounced; programmatic refreshes and filter changes apply immediately."""
+        return event is not None and event.type == tk.EventType.KeyRelease
+
     def update_inventory_table(self, event: Optional[tk.Event] = None) -> None:
+        query = self.inventory_search_entry.get().strip()
+        type_filter = self.type_filter_var.get()
+        type_filter = None if type_filter == "All" else type_filter
+        self.search_pipeline.run(
+            "inventory",
+            lambda conn: search_inventory(conn, query, type_filter=type_filter),
+            self.render_inventory_rows,
+            self.conn,
+            debounce=self.is_search_keystroke(event)
+        )
+
+    def render_inventory_rows(self, rows: List[tuple]) -> None:
+        if not self.inventory_table.winfo_exists():
+            return
         # Clear existing items in the Treeview
         for item in self.inventory_table.get_children():
             self.inventory_table.delete(item)
@@ -1997,37 +1958,19 @@ class PharmacyPOS:
         # Configure tag for low inventory (red background, white text for visibility)
         self.inventory_table.tag_configure('low_stock', background='#FF5555', foreground='white')
         
-        with self.conn:
-            cursor = self.conn.cursor()
-            query = self.inventory_search_entry.get().strip()
-            type_filter = self.type_filter_var.get()
-            sql = "SELECT item_id, name, type, retail_price, quantity, supplier FROM inventory"
-            params = []
-            conditions = []
-            if query:
-                conditions.append("(name LIKE ?)")
-                params.append(f"%{query}%")
-            if type_filter != "All":
-                conditions.append("type = ?")
-                params.append(type_filter)
-            if conditions:
-                sql += " WHERE " + " AND ".join(conditions)
-            cursor.execute(sql, params)
-            for item in cursor.fetchall():
-                item_id, name, item_type, retail_price, quantity, supplier = item
-                # Ensure quantity is an integer
-                try:
-                    quantity = int(float(quantity))  # Handle potential float values
-                except (ValueError, TypeError):
-                    quantity = 0  # Fallback if quantity is invalid
-                # Apply 'low_stock' tag if quantity <= 5
-                tags = ('low_stock',) if quantity <= 5 else ()
-                # Insert item into Treeview with item_id as iid
-                self.inventory_table.insert("", "end", iid=item_id, values=(
-                    name, item_type, f"{retail_price:.2f}", quantity, supplier or "Unknown"
-                ), tags=tags)
-                # Debug print to verify tagging
-                print(f"Item: {name}, ID: {item_id}, Quantity: {quantity}, Tags: {tags}")
+        for item in rows:
+            item_id, name, item_type, retail_price, quantity, supplier = item
+            # Ensure quantity is an integer
+            try:
+                quantity = int(float(quantity))  # Handle potential float values
+            except (ValueError, TypeError):
+                quantity = 0  # Fallback if quantity is invalid
+            # Apply 'low_stock' tag if quantity <= 5
+            tags = ('low_stock',) if quantity <= 5 else ()
+            # Insert item into Treeview with item_id as iid
+            self.inventory_table.insert("", "end", iid=item_id, values=(
+                name, item_type, f"{retail_price:.2f}", quantity, supplier or "Unknown"
+            ), tags=tags)
 
     def treeview_scroll(self, event: tk.Event, canvas: tk.Canvas = None, treeview: ttk.Treeview = None) -> str:
         """Handle mouse wheel scrolling for a Treeview widget, optionally within a Canvas."""
@@ -2064,7 +2007,7 @@ class PharmacyPOS:
 
         search_frame = tk.Frame(content_frame, bg="#F5F6F5")  # Soft White
         search_frame.pack(fill="x", pady=10)
-        tk.Label(search_frame, text="Search by Transaction ID:", font=("Helvetica", 18),
+        tk.Label(search_frame, text="Transaction ID starts with:", font=("Helvetica", 18),
                 bg="#F5F6F5", fg="#2C3E50").pack(side="left")  # Soft White, Dark Slate
         self.search_entry = tk.Entry(search_frame, font=("Helvetica", 18), bg="#F4E1C1", fg="#2C3E50")  # Sandy Beige, Dark Slate
         self.search_entry.pack(side="left", fill="x", expand=True, padx=5)
@@ -2073,6 +2016,7 @@ class PharmacyPOS:
                 bg="#2ECC71", fg="#F5F6F5", font=("Helvetica", 18),  # Seafoam Green, Soft White
                 activebackground="#27AE60", activeforeground="#F5F6F5",  # Darker Seafoam Green, Soft White
                 padx=12, pady=8, bd=0).pack(side="left", padx=5)
+        self.setup_transaction_filters(content_frame)
 
         transactions_frame = tk.Frame(content_frame, bg="#F5F6F5", bd=1, relief="flat")  # Soft White
         transactions_frame.pack(fill="both", expand=True, pady=10)
@@ -2087,7 +2031,7 @@ class PharmacyPOS:
         h_scrollbar = ttk.Scrollbar(transactions_frame, orient="horizontal", command=canvas.xview)
         h_scrollbar.grid(row=2, column=0, sticky="ew")
 
-        canvas.configure(xscrollcommand=h_scrollbar.set, yscrollcommand=v_scrollbar.set)
+        canvas.configure(xscrollcommand=h_scrollbar.set)
 
         tree_frame = tk.Frame(canvas, bg="#F5F6F5")  # Soft White
         canvas_window = canvas.create_window((0, 0), window=tree_frame, anchor="nw")
@@ -2101,6 +2045,11 @@ class PharmacyPOS:
             self.transactions_table.column(col, width=width, anchor="center" if col != "ItemsList" else "w")
         self.transactions_table.pack(fill="both", expand=True)
 
+        # Rows are paged in as the table scrolls, so the vertical scrollbar drives the Treeview itself
+        v_scrollbar.configure(command=self.transactions_table.yview)
+        self.transactions_table.configure(
+            yscrollcommand=lambda first, last: self.on_transactions_scroll(v_scrollbar, first, last))
+
         # Apply Treeview styling
         style = ttk.Style()
         style.configure("Treeview", background="#F5F6F5", foreground="#2C3E50", fieldbackground="#F5F6F5")  # Soft White, Dark Slate
@@ -2111,9 +2060,9 @@ class PharmacyPOS:
         tree_frame.bind("<Configure>", configure_canvas)
 
         # Add mouse wheel bindings for vertical scrolling
-        self.transactions_table.bind("<MouseWheel>", lambda event: self.treeview_scroll(event, canvas=canvas))
-        self.transactions_table.bind("<Button-4>", lambda event: self.treeview_scroll(event, canvas=canvas))
-        self.transactions_table.bind("<Button-5>", lambda event: self.treeview_scroll(event, canvas=canvas))
+        self.transactions_table.bind("<MouseWheel>", lambda event: self.treeview_scroll(event, treeview=self.transactions_table))
+        self.transactions_table.bind("<Button-4>", lambda event: self.treeview_scroll(event, treeview=self.transactions_table))
+        self.transactions_table.bind("<Button-5>", lambda event: self.treeview_scroll(event, treeview=self.transactions_table))
 
         # Existing horizontal scrolling bindings
         def scroll_horizontal(event):
@@ -2154,6 +2103,10 @@ class PharmacyPOS:
                                 activebackground="#2C3E50", activeforeground="#F5F6F5",  # Dark Slate, Soft White
                                 padx=12, pady=8, bd=0, state="disabled")
         self.print_btn.pack(side="left", padx=5)
+        tk.Button(self.transaction_button_frame, text="Export Receipts", command=self.show_receipt_export,
+                  bg="#4DA8DA", fg="#F5F6F5", font=("Helvetica", 18),  # Aqua Blue, Soft White
+                  activebackground="#2C3E50", activeforeground="#F5F6F5",  # Dark Slate, Soft White
+                  padx=12, pady=8, bd=0).pack(side="left", padx=5)
         self.edit_transaction_btn = tk.Button(self.transaction_button_frame, text="Edit Transaction",
                                             command=lambda: self.create_password_auth_window(
                                                 "Authenticate Edit", "Enter admin password to edit transaction",
@@ -2179,55 +2132,188 @@ class PharmacyPOS:
                                     padx=12, pady=8, bd=0, state="disabled")
         self.refund_btn.pack(side="left", padx=5)
 
+    def setup_transaction_filters(self, parent: tk.Frame) -> None:
+        filter_frame = tk.Frame(parent, bg="#F5F6F5")  # Soft White
+        filter_frame.pack(fill="x", pady=(0, 10))
+        label_style = {"font": ("Helvetica", 14), "bg": "#F5F6F5", "fg": "#2C3E50"}  # Soft White, Dark Slate
+        entry_style = {"font": ("Helvetica", 14), "bg": "#F4E1C1", "fg": "#2C3E50"}  # Sandy Beige, Dark Slate
+
+        self.transaction_date_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(filter_frame, text="From", variable=self.transaction_date_var,
+                       command=self.update_transactions_table, **label_style).pack(side="left")
+        self.transaction_start_entry = DateEntry(filter_frame, date_pattern="yyyy-mm-dd", font=("Helvetica", 14), width=10)
+        self.transaction_start_entry.pack(side="left", padx=5)
+        tk.Label(filter_frame, text="To", **label_style).pack(side="left")
+        self.transaction_end_entry = DateEntry(filter_frame, date_pattern="yyyy-mm-dd", font=("Helvetica", 14), width=10)
+        self.transaction_end_entry.pack(side="left", padx=5)
+        for entry in (self.transaction_start_entry, self.transaction_end_entry):
+            entry.bind("<<DateEntrySelected>>", self.update_transactions_table)
+
+        tk.Label(filter_frame, text="Status", **label_style).pack(side="left", padx=(10, 0))
+        self.transaction_status_var = tk.StringVar(value="All")
+        status_menu = ttk.Combobox(filter_frame, textvariable=self.transaction_status_var, state="readonly", width=10,
+                                   values=["All"] + self.TRANSACTION_STATUSES, font=("Helvetica", 14))
+        status_menu.pack(side="left", padx=5)
+        status_menu.bind("<<ComboboxSelected>>", self.update_transactions_table)
+
+        tk.Label(filter_frame, text="Payment", **label_style).pack(side="left", padx=(10, 0))
+        self.transaction_payment_var = tk.StringVar(value="All")
+        payment_menu = ttk.Combobox(filter_frame, textvariable=self.transaction_payment_var, state="readonly", width=14,
+                                    values=["All"] + self.PAYMENT_METHODS, font=("Helvetica", 14))
+        payment_menu.pack(side="left", padx=5)
+        payment_menu.bind("<<ComboboxSelected>>", self.update_transactions_table)
+
+        self.transaction_filter_entries: Dict[str, tk.Entry] = {}
+        for key, label, width in (("customer", "Customer ID", 12), ("item", "Item ID/Name", 14),
+                                  ("min_amount", "Min ₱", 7), ("max_amount", "Max ₱", 7)):
+            tk.Label(filter_frame, text=label, **label_style).pack(side="left", padx=(10, 0))
+            entry = tk.Entry(filter_frame, width=width, **entry_style)
+            entry.pack(side="left", padx=5)
+            # Exact-match filters apply on Enter rather than on every keystroke
+            entry.bind("<Return>", self.update_transactions_table)
+            self.transaction_filter_entries[key] = entry
+
+    def read_transaction_filter(self) -> TransactionFilter:
+        """TransactionFilter from the search box and filter widgets; blank or unparsable fields are ignored."""
+        try:
+            if not (hasattr(self, 'search_entry') and self.search_entry.winfo_exists()):
+                return TransactionFilter()
+            entries = self.transaction_filter_entries
+
+            def amount(key: str) -> Optional[float]:
+                try:
+                    return float(entries[key].get().strip())
+                except ValueError:
+                    return None
+
+            use_dates = self.transaction_date_var.get()
+            status = self.transaction_status_var.get()
+            payment_method = self.transaction_payment_var.get()
+            return TransactionFilter(
+                transaction_id=self.search_entry.get().strip(),
+                start_date=self.transaction_start_entry.get_date() if use_dates else None,
+                end_date=self.transaction_end_entry.get_date() if use_dates else None,
+                status=None if status == "All" else status,
+                payment_method=None if payment_method == "All" else payment_method,
+                customer_id=entries["customer"].get().strip() or None,
+                item=entries["item"].get().strip() or None,
+                min_amount=amount("min_amount"),
+                max_amount=amount("max_amount"),
+            )
+        except (tk.TclError, AttributeError) as e:
+            print(f"Error reading transaction filters: {e}")
+            return TransactionFilter()
+
     def update_transactions_table(self, event=None) -> None:
-        # print("Updating transactions table, event:", event)
+        criteria = self.read_transaction_filter()
+
+        # A new search or refresh starts again from the newest page
+        self.search_pipeline.cancel("transactions_page")
+        self.transactions_loading = True
+        self.search_pipeline.run(
+            "transactions",
+            lambda conn: self.fetch_transaction_rows(conn, criteria),
+            lambda rows: self.render_transaction_rows(rows, criteria),
+            self.conn,
+            debounce=self.is_search_keystroke(event),
+            error_fn=self.on_transactions_error
+        )
+
+    def on_transactions_error(self, error: Exception) -> None:
+        # Clear the flag so the next scroll can retry the page that failed
+        self.transactions_loading = False
+        messagebox.showerror("Database Error", f"Failed to fetch transactions: {error}", parent=self.root)
+
+    def fetch_transaction_rows(self, conn: sqlite3.Connection, criteria: TransactionFilter,
+                               older_than: Optional[Tuple[str, str]] = None,
+                               newer_than: Optional[Tuple[str, str]] = None) -> List[tuple]:
+        """Build one page of display rows for the transactions table; runs on the search worker, so no Tk calls."""
+        rows = []
+        for (transaction_id, total_amount, cash_paid, change_amount, timestamp,
+             status, payment_method, customer_id, item_names) in fetch_transaction_page(
+                conn, criteria, older_than=older_than, newer_than=newer_than):
+            items_display = item_names[:100] + "..." if item_names and len(item_names) > 100 else item_names or "No items"
+            rows.append((
+                transaction_id, items_display, f"{total_amount:.2f}",
+                f"{cash_paid:.2f}", f"{change_amount:.2f}",
+                timestamp, status, payment_method or "Cash",
+                customer_id or "None"
+            ))
+        return rows
+
+    def render_transaction_rows(self, rows: List[tuple], criteria: TransactionFilter = TransactionFilter()) -> None:
+        if not self.transactions_table.winfo_exists():
+            return
         for item in self.transactions_table.get_children():
             self.transactions_table.delete(item)
-        
-        search_term = ""
-        try:
-            if hasattr(self, 'search_entry') and self.search_entry.winfo_exists():
-                search_term = self.search_entry.get().strip()
-                print(f"Search term: '{search_term}'")
-            else:
-                print("No valid search_entry available")
-        except tk.TclError as e:
-            print(f"TclError accessing search_entry: {e}")
-        
-        with self.conn:
-            cursor = self.conn.cursor()
-            try:
-                if search_term:
-                    # Case-insensitive search for TransactionID
-                    cursor.execute("SELECT * FROM transactions WHERE UPPER(transaction_id) LIKE UPPER(?)", (f"%{search_term}%",))
-                else:
-                    cursor.execute("SELECT * FROM transactions")
-                transactions = cursor.fetchall()
-                print(f"Fetched {len(transactions)} transactions")
-                
-                for transaction in transactions:
-                    items_str = transaction[1]
-                    item_names = []
-                    for item_data in items_str.split(";"):
-                        if item_data:
-                            try:
-                                item_id, qty = item_data.split(":")
-                                cursor.execute("SELECT name FROM inventory WHERE item_id = ?", (item_id,))
-                                name = cursor.fetchone()
-                                if name:
-                                    item_names.append(f"{name[0]} (x{qty})")
-                            except ValueError as e:
-                                print(f"Error parsing item_data '{item_data}': {e}")
-                    items_display = ", ".join(item_names)[:100] + "..." if len(", ".join(item_names)) > 100 else ", ".join(item_names) if item_names else "No items"
-                    self.transactions_table.insert("", "end", values=(
-                        transaction[0], items_display, f"{transaction[2]:.2f}",
-                        f"{transaction[3]:.2f}", f"{transaction[4]:.2f}",
-                        transaction[5], transaction[6], transaction[7] or "Cash",
-                        transaction[8] or "None"
-                    ))
-            except Exception as e:
-                print(f"Database error: {e}")
-                messagebox.showerror("Database Error", f"Failed to fetch transactions: {e}", parent=self.root)
+        # Page key (timestamp) of every loaded row, by transaction ID
+        self.transaction_row_keys: Dict[str, str] = {}
+        self.transactions_filter = criteria
+        self.transactions_more_older = len(rows) == PAGE_SIZE
+        self.transactions_more_newer = False
+        self.transactions_loading = False
+        self.insert_transaction_rows(rows, "end")
+
+    def insert_transaction_rows(self, rows: List[tuple], index) -> None:
+        for offset, values in enumerate(rows):
+            # The row's iid is the transaction ID, so actions never read it back from display text
+            position = index + offset if index != "end" else "end"
+            self.transactions_table.insert("", position, iid=values[0], values=values)
+            self.transaction_row_keys[values[0]] = values[5]
+
+    def transaction_page_key(self, iid: str) -> Tuple[str, str]:
+        return self.transaction_row_keys[iid], iid
+
+    def on_transactions_scroll(self, scrollbar: ttk.Scrollbar, first: str, last: str) -> None:
+        """Page in older rows near the bottom and newer ones near the top."""
+        scrollbar.set(first, last)
+        if getattr(self, "transactions_loading", True):
+            return
+        children = self.transactions_table.get_children()
+        if not children:
+            return
+        if float(last) >= 0.9 and self.transactions_more_older:
+            self.load_transaction_page(older_than=self.transaction_page_key(children[-1]))
+        elif float(first) <= 0.1 and self.transactions_more_newer:
+            self.load_transaction_page(newer_than=self.transaction_page_key(children[0]))
+
+    def load_transaction_page(self, older_than: Optional[Tuple[str, str]] = None,
+                              newer_than: Optional[Tuple[str, str]] = None) -> None:
+        self.transactions_loading = True
+        criteria = self.transactions_filter
+        self.search_pipeline.submit(
+            "transactions_page",
+            lambda conn: self.fetch_transaction_rows(conn, criteria, older_than, newer_than),
+            lambda rows: self.render_transaction_page(rows, older=older_than is not None),
+            delay_ms=0,
+            error_fn=self.on_transactions_error
+        )
+
+    def render_transaction_page(self, rows: List[tuple], older: bool) -> None:
+        """Add a page at one end of the table and drop rows past TRANSACTION_WINDOW_ROWS from the other."""
+        if not self.transactions_table.winfo_exists():
+            return
+        table = self.transactions_table
+        if older:
+            self.transactions_more_older = len(rows) == PAGE_SIZE
+            self.insert_transaction_rows(rows, "end")
+            excess = list(table.get_children()[:max(0, len(table.get_children()) - self.TRANSACTION_WINDOW_ROWS)])
+            if excess:
+                table.delete(*excess)
+                # Rows above the view went away; scroll back so the same rows stay on screen
+                table.yview_scroll(-len(excess), "units")
+                self.transactions_more_newer = True
+        else:
+            self.transactions_more_newer = len(rows) == PAGE_SIZE
+            self.insert_transaction_rows(rows, 0)
+            table.yview_scroll(len(rows), "units")
+            excess = list(table.get_children()[self.TRANSACTION_WINDOW_ROWS:])
+            if excess:
+                table.delete(*excess)
+                self.transactions_more_older = True
+        for iid in excess:
+            self.transaction_row_keys.pop(iid, None)
+        self.transactions_loading = False
 
     def on_transaction_select(self, event: tk.Event) -> None:
         selected_item = self.transactions_table.selection()
@@ -2245,7 +2331,7 @@ class PharmacyPOS:
             messagebox.showerror("Error", "No transaction selected", parent=self.root)
             return
 
-        transaction_id = self.transactions_table.item(selected_item)["values"][0]
+        transaction_id = selected_item[0]
         with self.conn:
             cursor = self.conn.cursor()
             cursor.execute("SELECT password FROM users WHERE role = 'Drug Lord'")
@@ -2262,6 +2348,8 @@ class PharmacyPOS:
                         window.destroy()
                         messagebox.showerror("Error", "Cannot delete unpaid transactions from this view. Use Unpaid Transactions view.", parent=self.root)
                         return
+                    restate_daily_sales(self.conn, transaction_id, self.current_user)
+                    delete_transaction_items(self.conn, transaction_id)
                     cursor.execute("DELETE FROM transactions WHERE transaction_id = ?", (transaction_id,))
                     log_id = f"{datetime.now().strftime('%m-%Y')}-{str(uuid.uuid4())[:6]}"
                     cursor.execute("INSERT INTO transaction_log (log_id, action, details, timestamp, user) VALUES (?, ?, ?, ?, ?)",
@@ -2284,7 +2372,7 @@ class PharmacyPOS:
             window.destroy()
             messagebox.showerror("Error", "No transaction selected", parent=self.root)
             return
-        transaction_id = self.transactions_table.item(selected_item)["values"][0]
+        transaction_id = selected_item[0]
         with self.conn:
             cursor = self.conn.cursor()
             cursor.execute("SELECT password FROM users WHERE role = 'Drug Lord'")
@@ -2308,18 +2396,9 @@ class PharmacyPOS:
                 messagebox.showerror("Error", "Cannot edit a returned transaction", parent=self.root)
                 return
 
-            items = transaction[0].split(";")
             edit_items = []
-            for item_data in items:
-                if item_data:
-                    try:
-                        item_id, qty = item_data.split(":")
-                        cursor.execute("SELECT name, price, quantity FROM inventory WHERE item_id = ?", (item_id,))
-                        item = cursor.fetchone()
-                        if item:
-                            edit_items.append({"id": item_id, "name": item[0], "price": float(item[1]), "original_quantity": int(qty), "current_quantity": int(qty), "inventory_quantity": int(item[2])})
-                    except ValueError:
-                        continue
+            for item_id, name, price, qty, inventory_quantity in load_editable_items(self.conn, transaction_id):
+                edit_items.append({"id": item_id, "name": name, "price": float(price or 0), "original_quantity": int(qty), "current_quantity": int(qty), "inventory_quantity": int(inventory_quantity or 0)})
 
             if not edit_items:
                 messagebox.showerror("Error", "No valid items to edit", parent=self.root)
@@ -2411,6 +2490,9 @@ class PharmacyPOS:
                 # Update transaction
                 items_str = ";".join(new_items)
                 change_amount = cash_paid - total_amount if cash_paid >= total_amount else 0.0
+                restate_daily_sales(self.conn, transaction_id, self.current_user, items_str, total_amount)
+                set_transaction_item_quantities(
+                    self.conn, transaction_id, {item["id"]: item["current_quantity"] for item in edit_items})
                 cursor.execute("""
                     UPDATE transactions SET items = ?, total_amount = ?, cash_paid = ?, change_amount = ? 
                     WHERE transaction_id = ?
@@ -2420,6 +2502,7 @@ class PharmacyPOS:
                             "Edit Transaction", f"Edited transaction {transaction_id}", 
                             datetime.now().strftime("%Y-%m-%d %H:%M:%S"), self.current_user))
                 self.conn.commit()
+                self.inventory_index.reload_items(self.conn, [item["id"] for item in edit_items])
                 self.update_transactions_table()
                 window.destroy()
                 messagebox.showinfo("Success", f"Transaction {transaction_id} updated successfully", parent=self.root)
@@ -2428,21 +2511,24 @@ class PharmacyPOS:
             messagebox.showerror("Error", f"Failed to update transaction: {e}", parent=self.root)
 
     def print_receipt(self) -> None:
-        from reportlab.platypus import Table, TableStyle
-        from reportlab.lib import colors
-        from reportlab.lib.pagesizes import letter
-        from reportlab.pdfgen import canvas
-
         selected_item = self.transactions_table.selection()
         if not selected_item:
             messagebox.showerror("Error", "No transaction selected", parent=self.root)
             return
-        transaction_id = self.transactions_table.item(selected_item)["values"][0]
-        items = self.transactions_table.item(selected_item)["values"][1].split(", ")
-        total_amount = float(self.transactions_table.item(selected_item)["values"][2])
-        cash_paid = float(self.transactions_table.item(selected_item)["values"][3])
-        change = float(self.transactions_table.item(selected_item)["values"][4])
-        timestamp = self.transactions_table.item(selected_item)["values"][5]
+        self.reprint_receipt(selected_item[0])
+
+    def reprint_receipt(self, transaction_id: str) -> None:
+        """Reprint a stored sale as a PDF from the database alone."""
+        from reportlab.platypus import Table
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
+
+        receipt = load_receipt_by_id(self.conn, transaction_id)
+        if receipt is None:
+            messagebox.showerror("Error", f"Transaction {transaction_id} not found", parent=self.root)
+            return
+        timestamp = receipt.timestamp
+        total_amount, cash_paid, change = receipt.total_amount, receipt.cash_paid, receipt.change
 
         downloads_path = os.path.expanduser("~/Downloads")
         pdf_path = os.path.join(downloads_path, f"Receipt_{transaction_id}.pdf")
@@ -2459,44 +2545,19 @@ class PharmacyPOS:
         c.drawString(100, 650, f"Date: {timestamp}")
         c.drawString(100, 632, f"TRANSACTION CODE: {transaction_id}")
 
-        # Prepare table data
+        # Prepare table data from the lines as they were sold
         data = [["Name", "Qty", "Price"]]
         total_qty = 0
-        missing_items = []
-        for item in items:
-            if item:
-                name, qty = item.rsplit(" (x", 1) if " (x" in item else (item, "0")
-                qty = int(qty.strip(")")) if qty != "0" else 0
-                item_name = name.strip()
-                retail_price = 0.0
-                with self.conn:
-                    cursor = self.conn.cursor()
-                    cursor.execute("SELECT retail_price FROM inventory WHERE name = ?", (item_name,))
-                    result = cursor.fetchone()
-                    if result:
-                        retail_price = float(result[0])
-                    else:
-                        missing_items.append(item_name)
-                data.append([item_name, str(qty), f"{retail_price:.2f}"])
-                total_qty += qty
-
-        # Show warning for missing items
-        if missing_items:
-            messagebox.showwarning("Warning", f"Items not found in inventory: {', '.join(missing_items)}", parent=self.root)
+        for item in receipt.items:
+            data.append([item.name, str(item.qty), f"{item.price:.2f}"])
+            total_qty += item.qty
 
         # Add total row
         data.append(["Total", str(total_qty), f"{total_amount:.2f}"])
 
         # Create table
         table = Table(data)
-        table.setStyle(TableStyle([
-            ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', 12),
-            ('FONT', (0, -1), (-1, -1), 'Helvetica-Bold', 12),
-            ('FONT', (0, 1), (-1, -2), 'Helvetica', 12),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('PADDING', (0, 0), (-1, -1), 6),
-        ]))
+        table.setStyle(reprint_table_style())
 
         # Calculate table position
         table_width = 400
@@ -2519,6 +2580,85 @@ class PharmacyPOS:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to print receipt: {e}", parent=self.root)
 
+    def show_receipt_export(self) -> None:
+        window = tk.Toplevel(self.root)
+        window.title("Export Receipts")
+        window.geometry("500x400")
+        window.configure(bg="#1B263B")  # Deep Ocean Blue
+
+        export_box = tk.Frame(window, bg="#F5F6F5", padx=20, pady=20, bd=1, relief="flat")  # Soft White
+        export_box.pack(pady=20)
+
+        tk.Label(export_box, text="Export Receipts", font=("Helvetica", 18, "bold"),
+                 bg="#F5F6F5", fg="#2C3E50").pack(pady=12)  # Soft White, Dark Slate
+        tk.Label(export_box, text="From", font=("Helvetica", 14),
+                 bg="#F5F6F5", fg="#2C3E50").pack()  # Soft White, Dark Slate
+        start_entry = DateEntry(export_box, date_pattern="yyyy-mm-dd", font=("Helvetica", 14))
+        start_entry.pack(pady=5)
+        tk.Label(export_box, text="To", font=("Helvetica", 14),
+                 bg="#F5F6F5", fg="#2C3E50").pack()  # Soft White, Dark Slate
+        end_entry = DateEntry(export_box, date_pattern="yyyy-mm-dd", font=("Helvetica", 14))
+        end_entry.pack(pady=5)
+
+        tk.Button(export_box, text="Export",
+                  command=lambda: self.export_receipts(start_entry.get_date(), end_entry.get_date(), window),
+                  bg="#4DA8DA", fg="#F5F6F5", font=("Helvetica", 18),  # Aqua Blue, Soft White
+                  activebackground="#2C3E50", activeforeground="#F5F6F5",  # Dark Slate, Soft White
+                  padx=12, pady=8, bd=0).pack(pady=12)
+
+    def export_receipts(self, start_date: date, end_date: date, window: tk.Toplevel) -> None:
+        """Write every completed sale from start_date through end_date into one PDF, off the Tk thread.
+
+        The export gets its own thread and connection rather than the search
+        worker, so changing screens can't cancel it and a long range doesn't
+        hold up searches. Completion or failure is always reported.
+        """
+        if end_date < start_date:
+            messagebox.showerror("Error", "The end date is before the start date.", parent=window)
+            return
+        pdf_path = filedialog.asksaveasfilename(
+            parent=window,
+            title="Save Receipts",
+            initialdir=os.path.expanduser("~/Downloads"),
+            initialfile=f"Receipts_{start_date:%Y-%m-%d}_to_{end_date:%Y-%m-%d}.pdf",
+            defaultextension=".pdf",
+            filetypes=[("PDF files", "*.pdf")]
+        )
+        if not pdf_path:
+            return
+        window.destroy()
+
+        start = start_date.strftime("%Y-%m-%d")
+        end = (end_date + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        results: "queue.Queue[Tuple[int, Optional[Exception]]]" = queue.Queue(maxsize=1)
+
+        def export() -> None:
+            try:
+                conn = sqlite3.connect(self.db_path)
+                try:
+                    results.put((export_receipts_pdf(conn, pdf_path, start, end), None))
+                finally:
+                    conn.close()
+            except Exception as e:
+                results.put((0, e))
+
+        def poll() -> None:
+            try:
+                count, error = results.get_nowait()
+            except queue.Empty:
+                self.root.after(self.EXPORT_POLL_MS, poll)
+                return
+            if error is not None:
+                logging.error(f"Receipt export to {pdf_path} failed: {error}")
+                messagebox.showerror("Error", f"Failed to export receipts: {error}", parent=self.root)
+                return
+            messagebox.showinfo("Success", f"Exported {count} receipts to {pdf_path}", parent=self.root)
+            webbrowser.open(f"file://{os.path.abspath(pdf_path)}")
+
+        threading.Thread(target=export, name="receipt-export", daemon=True).start()
+        self.root.after(self.EXPORT_POLL_MS, poll)
+
     def print_sales_report(self, month, year, total_unit_sales, daily_sales):
                 try:
                     month = int(month)
@@ -2833,18 +2973,13 @@ class PharmacyPOS:
                 cursor.execute('''
                     SELECT strftime('%m', sale_date) AS month,
                            SUM(total_sales) AS total_sales,
-                           SUM((
-                               SELECT SUM(CAST(SUBSTR(t2.items, instr(t2.items, ':') + 1) AS INTEGER) * i.unit_price)
-                               FROM transactions t2
-                               JOIN inventory i ON instr(t2.items, i.item_id) > 0
-                               WHERE strftime('%Y-%m-%d', t2.timestamp) = d.sale_date
-                           )) AS total_unit_cost,
+                           SUM(unit_cost) AS total_unit_cost,
                            SUM(net_profit) AS net_profit
-                    FROM daily_sales d
-                    WHERE strftime('%Y', sale_date) = ?
+                    FROM daily_sales
+                    WHERE sale_date >= ? AND sale_date < ?
                     GROUP BY strftime('%m', sale_date)
                     ORDER BY month
-                ''', (year,))
+                ''', year_bounds(int(year)))
                 monthly_data = cursor.fetchall()
                 print(f"Debug: Monthly data for {year}: {monthly_data}")
                 month_names = {str(i).zfill(2): name for i, name in enumerate(
@@ -2863,17 +2998,12 @@ class PharmacyPOS:
                 cursor.execute('''
                     SELECT sale_date,
                            total_sales,
-                           (
-                               SELECT SUM(CAST(SUBSTR(t2.items, instr(t2.items, ':') + 1) AS INTEGER) * i.unit_price)
-                               FROM transactions t2
-                               JOIN inventory i ON instr(t2.items, i.item_id) > 0
-                               WHERE strftime('%Y-%m-%d', t2.timestamp) = d.sale_date
-                           ) AS total_unit_cost,
+                           unit_cost AS total_unit_cost,
                            net_profit
-                    FROM daily_sales d
-                    WHERE strftime('%Y', sale_date) = ? AND strftime('%m', sale_date) = ?
+                    FROM daily_sales
+                    WHERE sale_date >= ? AND sale_date < ?
                     ORDER BY sale_date DESC
-                ''', (year, month.zfill(2)))
+                ''', month_bounds(int(year), int(month)))
                 daily_data = cursor.fetchall()
                 print(f"Debug: Daily data for {year}-{month.zfill(2)}: {daily_data}")
                 for row in daily_data:
@@ -2903,10 +3033,7 @@ class PharmacyPOS:
             messagebox.showerror("Error", "Invalid month or year selected.", parent=self.root)
             return
 
-        start_date = f"{year}-{month:02d}-01"
-        next_month = month + 1 if month < 12 else 1
-        next_year = year if month < 12 else year + 1
-        end_date = f"{next_year}-{next_month:02d}-01"
+        start_date, end_date = month_bounds(year, month)
 
         try:
             # Prepare data for the report
@@ -2914,55 +3041,17 @@ class PharmacyPOS:
             daily_sales = {}
             with self.conn:
                 cursor = self.conn.cursor()
-                # Monthly calculations
-                cursor.execute("""
-                    SELECT strftime('%Y-%m', timestamp) AS month, items, total_amount
-                    FROM transactions
-                    WHERE status = 'Completed' AND timestamp >= ? AND timestamp < ?
-                """, (start_date, end_date))
-                for month_str, items, total_amount in cursor.fetchall():
+                cursor.execute(COMPLETED_SALES_SQL, (start_date, end_date))
+                total_unit_sales = 0.0
+                total_grand_sales = 0.0
+                for date, total_amount, unit_sales in cursor.fetchall():
+                    month_str = date[:7]
                     if month_str not in monthly_sales:
                         monthly_sales[month_str] = {"unit_sales": 0.0, "grand_sales": 0.0}
-                    unit_sales = 0.0
-                    for item_data in items.split(";"):
-                        if item_data:
-                            try:
-                                item_id, qty = item_data.split(":")
-                                qty = int(qty)
-                                cursor.execute("SELECT unit_price FROM inventory WHERE item_id = ?",
-                                            (item_id,))
-                                item = cursor.fetchone()
-                                if item:
-                                    unit_sales += item[0] * qty
-                            except (ValueError, IndexError):
-                                continue
                     monthly_sales[month_str]["unit_sales"] += unit_sales
                     monthly_sales[month_str]["grand_sales"] += total_amount
-
-                # Daily calculations
-                cursor.execute("""
-                    SELECT strftime('%Y-%m-%d', timestamp) AS date, items, total_amount
-                    FROM transactions
-                    WHERE status = 'Completed' AND timestamp >= ? AND timestamp < ?
-                """, (start_date, end_date))
-                total_unit_sales = 0.0
-                total_grand_sales = 0.0
-                for date, items, total_amount in cursor.fetchall():
                     if date not in daily_sales:
                         daily_sales[date] = {"unit_sales": 0.0, "grand_sales": 0.0}
-                    unit_sales = 0.0
-                    for item_data in items.split(";"):
-                        if item_data:
-                            try:
-                                item_id, qty = item_data.split(":")
-                                qty = int(qty)
-                                cursor.execute("SELECT unit_price FROM inventory WHERE item_id = ?",
-                                            (item_id,))
-                                item = cursor.fetchone()
-                                if item:
-                                    unit_sales += item[0] * qty
-                            except (ValueError, IndexError):
-                                continue
                     daily_sales[date]["grand_sales"] += total_amount
                     daily_sales[date]["unit_sales"] += unit_sales
                     total_unit_sales += unit_sales
@@ -3313,7 +3402,7 @@ class PharmacyPOS:
             self.log_table.delete(item)
         with self.conn:
             cursor = self.conn.cursor()
-            cursor.execute("SELECT action, details, timestamp, user FROM transaction_log ORDER BY timestamp DESC")
+            cursor.execute(TRANSACTION_LOG_SQL)
             for log in cursor.fetchall():
                 self.log_table.insert("", "end", values=log)
 
@@ -3371,15 +3460,22 @@ class PharmacyPOS:
         self.delete_customer_btn.pack(side="left", padx=5)
 
     def update_customer_table(self, event: Optional[tk.Event] = None) -> None:
+        query = self.customer_search_entry.get().strip()
+        self.search_pipeline.run(
+            "customers",
+            lambda conn: search_customers(conn, query),
+            self.render_customer_rows,
+            self.conn,
+            debounce=self.is_search_keystroke(event)
+        )
+
+    def render_customer_rows(self, rows: List[tuple]) -> None:
+        if not self.customer_table.winfo_exists():
+            return
         for item in self.customer_table.get_children():
             self.customer_table.delete(item)
-        with self.conn:
-            cursor = self.conn.cursor()
-            query = self.customer_search_entry.get().strip()
-            sql = "SELECT customer_id, name, contact, address FROM customers WHERE name LIKE ?" if query else "SELECT customer_id, name, contact, address FROM customers"
-            cursor.execute(sql, (f"%{query}%",) if query else ())
-            for customer in cursor.fetchall():
-                self.customer_table.insert("", "end", values=customer)
+        for customer in rows:
+            self.customer_table.insert("", "end", values=customer)
 
     def on_customer_select(self, event: tk.Event) -> None:
         selected_item = self.customer_table.selection()
@@ -3388,32 +3484,8 @@ class PharmacyPOS:
         self.delete_customer_btn.config(state=state)
 
     def generate_customer_id(self) -> str:
-   
-        current_time = datetime.now()
-        month_year = current_time.strftime("%m-%Y")  # Format: MM-YYYY
-        
-        with self.conn:
-            cursor = self.conn.cursor()
-            # Query the latest customer ID for the current month and year
-            cursor.execute("""
-                SELECT customer_id 
-                FROM customers 
-                WHERE customer_id LIKE ? 
-                ORDER BY customer_id DESC 
-                LIMIT 1
-            """, (f"{month_year}-C%",))
-            last_customer = cursor.fetchone()
-            
-            if last_customer:
-                # Extract the sequential number from the last customer ID
-                last_seq = int(last_customer[0][-5:])  # Last 5 digits
-                new_seq = last_seq + 1
-            else:
-                new_seq = 1  # Start at 1 if no customers exist for this month/year
-            
-            # Format the new customer ID
-            customer_id = f"{month_year}-C{new_seq:05d}"  # Ensures 5-digit padding
-            return customer_id
+        """Next MM-YYYY-T<terminal>-CNNNNN id from this terminal's sequence."""
+        return next_customer_id(self.conn)
 
     def show_add_customer(self) -> None:
         window = tk.Toplevel(self.root)
@@ -3584,16 +3656,23 @@ class PharmacyPOS:
             customer_table.column(col, width=150 if col != "Name" else 200, anchor="center" if col != "Name" else "w")
         customer_table.pack(fill="both", expand=True)
 
-        def update_customer_selection_table(event: Optional[tk.Event] = None) -> None:
+        def render_customer_selection(rows: List[tuple]) -> None:
+            if not customer_table.winfo_exists():
+                return
             for item in customer_table.get_children():
                 customer_table.delete(item)
-            with self.conn:
-                cursor = self.conn.cursor()
-                query = search_entry.get().strip()
-                sql = "SELECT customer_id, name, contact FROM customers WHERE name LIKE ?" if query else "SELECT customer_id, name, contact FROM customers"
-                cursor.execute(sql, (f"%{query}%",) if query else ())
-                for customer in cursor.fetchall():
-                    customer_table.insert("", "end", values=customer)
+            for customer_id, name, contact, _ in rows:
+                customer_table.insert("", "end", values=(customer_id, name, contact))
+
+        def update_customer_selection_table(event: Optional[tk.Event] = None) -> None:
+            query = search_entry.get().strip()
+            self.search_pipeline.run(
+                "customer_selection",
+                lambda conn: search_customers(conn, query),
+                render_customer_selection,
+                self.conn,
+                debounce=self.is_search_keystroke(event)
+            )
 
         search_entry.bind("<KeyRelease>", update_customer_selection_table)
         update_customer_selection_table()
@@ -3606,6 +3685,7 @@ class PharmacyPOS:
             customer_id = customer_table.item(selected_item)["values"][0]
             customer_name = customer_table.item(selected_item)["values"][1]
             self.current_customer_id = customer_id
+            self.cart_journal.record_customer(customer_id)
             self.customer_id_label.config(text=f"{customer_name} ({customer_id})")
             window.destroy()
 
@@ -3643,22 +3723,22 @@ class PharmacyPOS:
             messagebox.showerror("Error", "Invalid amount", parent=self.root)
 
     def void_selected_items(self, event: Optional[tk.Event] = None) -> None:
-        if not self.cart or self.selected_item_index is None:
+        item = self.cart.get(self.selected_item_id) if self.selected_item_id is not None else None
+        if item is None:
             messagebox.showerror("Error", "No item selected or cart is empty", parent=self.root)
             return
-        item = self.cart[self.selected_item_index]
         if messagebox.askyesno("Confirm Void",
-                            f"Are you sure you want to void {item['name']} from the cart?",
+                            f"Are you sure you want to void {item.name} from the cart?",
                             parent=self.root):
             with self.conn:
                 cursor = self.conn.cursor()
                 cursor.execute("INSERT INTO transaction_log (log_id, action, details, timestamp, user) VALUES (?, ?, ?, ?, ?)",
-                            (str(uuid.uuid4()), "Void Item", f"Voided item {item['name']} from cart",
+                            (str(uuid.uuid4()), "Void Item", f"Voided item {item.name} from cart",
                             datetime.now().strftime("%Y-%m-%d %H:%M:%S"), self.current_user))
                 self.conn.commit()
-            self.cart.pop(self.selected_item_index)
-            self.update_cart_table()
-            self.selected_item_index = None
+            self.cart.remove(item.item_id)
+            self.update_cart_table([item.item_id])
+            self.selected_item_id = None
             if hasattr(self, 'quantity_entry'):
                 self.quantity_entry.config(state="disabled")
             messagebox.showinfo("Success", "Item voided successfully", parent=self.root)
@@ -3677,7 +3757,7 @@ class PharmacyPOS:
                             datetime.now().strftime("%Y-%m-%d %H:%M:%S"), self.current_user))
                 self.conn.commit()
             self.cart.clear()
-            self.selected_item_index = None
+            self.selected_item_id = None
             self.discount_var.set(False)
             self.discount_authenticated = False
             self.update_cart_table()
@@ -3689,20 +3769,24 @@ class PharmacyPOS:
             messagebox.showerror("Error", "Cart is empty", parent=self.root)
             return
         transaction_id = str(uuid.uuid4())
-        items = ";".join([f"{item['id']}:{item['quantity']}" for item in self.cart])
-        total_amount = sum(item["subtotal"] for item in self.cart)
+        items = self.cart.items_string()
+        total_amount = self.cart.total
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         with self.conn:
             cursor = self.conn.cursor()
             cursor.execute("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
                           (transaction_id, items, total_amount, 0.0, 0.0, timestamp, "Held", "Cash", 
                            getattr(self, 'current_customer_id', None)))
+            write_transaction_items(self.conn, transaction_id, priced_lines(
+                self.conn, {line.item_id: line.quantity for line in self.cart},
+                {line.item_id: line.discount for line in self.cart if line.discount_applied}
+            ))
             cursor.execute("INSERT INTO transaction_log (log_id, action, details, timestamp, user) VALUES (?, ?, ?, ?, ?)",
                           (str(uuid.uuid4()), "Hold Transaction", f"Held transaction {transaction_id}",
                            timestamp, self.current_user))
             self.conn.commit()
         self.cart.clear()
-        self.selected_item_index = None
+        self.selected_item_id = None
         self.discount_var.set(False)
         self.discount_authenticated = False
         self.update_cart_table()
@@ -3730,22 +3814,11 @@ class PharmacyPOS:
 
         with self.conn:
             cursor = self.conn.cursor()
-            cursor.execute("SELECT transaction_id, items, total_amount, timestamp FROM transactions WHERE status = 'Held'")
-            for transaction in cursor.fetchall():
-                items_str = transaction[1]
-                item_names = []
-                for item_data in items_str.split(";"):
-                    if item_data:
-                        try:
-                            item_id, qty = item_data.split(":")
-                            cursor.execute("SELECT name FROM inventory WHERE item_id = ?", (item_id,))
-                            name = cursor.fetchone()
-                            if name:
-                                item_names.append(f"{name[0]} (x{qty})")
-                        except ValueError:
-                            continue  # Skip malformed item data
-                items_display = ", ".join(item_names)[:100] + "..." if len(", ".join(item_names)) > 100 else ", ".join(item_names)
-                unpaid_table.insert("", "end", values=(transaction[0], items_display, f"{transaction[2]:.2f}", transaction[3]))
+            cursor.execute(HELD_TRANSACTIONS_SQL)
+            for transaction_id, total_amount, timestamp, item_names in cursor.fetchall():
+                item_names = item_names or ""
+                items_display = item_names[:100] + "..." if len(item_names) > 100 else item_names
+                unpaid_table.insert("", "end", values=(transaction_id, items_display, f"{total_amount:.2f}", timestamp))
 
         unpaid_table.bind("<<TreeviewSelect>>", lambda e: self.on_unpaid_transaction_select(unpaid_table))
 
@@ -3782,30 +3855,25 @@ class PharmacyPOS:
         try:
             with self.conn:
                 cursor = self.conn.cursor()
-                cursor.execute("SELECT items, total_amount, customer_id FROM transactions WHERE transaction_id = ?", (transaction_id,))
+                cursor.execute("SELECT total_amount, customer_id FROM transactions WHERE transaction_id = ?", (transaction_id,))
                 transaction = cursor.fetchone()
                 if not transaction:
                     messagebox.showerror("Error", "Transaction not found", parent=window)
                     return
-                for item_data in transaction[0].split(";"):
-                    if item_data:
-                        try:
-                            item_id, qty = item_data.split(":")
-                            cursor.execute("SELECT item_id, name, price FROM inventory WHERE item_id = ?", (item_id,))
-                            item = cursor.fetchone()
-                            if item:
-                                self.cart.append({
-                                    "id": item[0],
-                                    "name": item[1],
-                                    "price": item[2],
-                                    "quantity": int(qty),
-                                    "subtotal": item[2] * int(qty)
-                                })
-                            else:
-                                messagebox.showwarning("Warning", f"Item ID {item_id} not found in inventory", parent=window)
-                        except ValueError:
-                            continue  # Skip malformed item data
-                self.current_customer_id = transaction[2]
+                cursor.execute("""
+                    SELECT ti.item_id, i.name, i.retail_price, ti.qty
+                    FROM transaction_items ti
+                    LEFT JOIN inventory i ON i.item_id = ti.item_id
+                    WHERE ti.transaction_id = ?
+                    ORDER BY ti.item_id
+                """, (transaction_id,))
+                for item_id, name, retail_price, qty in cursor.fetchall():
+                    if name is not None:
+                        self.cart.add(item_id, name, retail_price, int(qty))
+                    else:
+                        messagebox.showwarning("Warning", f"Item ID {item_id} not found in inventory", parent=window)
+                self.current_customer_id = transaction[1]
+                self.cart_journal.record_customer(self.current_customer_id)
                 if self.current_customer_id:
                     cursor.execute("SELECT name FROM customers WHERE customer_id = ?", (self.current_customer_id,))
                     customer_name = cursor.fetchone()
@@ -3815,6 +3883,7 @@ class PharmacyPOS:
                         self.customer_id_label.config(text="None Selected")
                 else:
                     self.customer_id_label.config(text="None Selected")
+                delete_transaction_items(self.conn, transaction_id)
                 cursor.execute("DELETE FROM transactions WHERE transaction_id = ?", (transaction_id,))
                 log_id = f"{datetime.now().strftime('%m-%Y')}-{str(uuid.uuid4())[:6]}"
                 cursor.execute("INSERT INTO transaction_log (log_id, action, details, timestamp, user) VALUES (?, ?, ?, ?, ?)",
@@ -3829,22 +3898,14 @@ class PharmacyPOS:
             
             # Verify and update cart table
             if hasattr(self, 'cart_table') and self.cart_table.winfo_exists():
-                # Clear existing items
-                for item in self.cart_table.get_children():
-                    self.cart_table.delete(item)
-                # Insert cart items
-                for item in self.cart:
-                    self.cart_table.insert("", "end", values=(
-                        item["name"], f"{item['price']:.2f}", item["quantity"], f"{item['subtotal']:.2f}"
-                    ))
+                self.update_cart_table()
                 # Re-grid cart table and parent frame
                 self.cart_table.grid(row=1, column=0, columnspan=4, sticky="nsew")
                 if self.cart_table.winfo_parent():
                     parent = self.cart_table.winfo_parent()
                     parent_frame = self.cart_table._nametowidget(parent)
                     parent_frame.grid(row=0, column=0, sticky="nsew")
-                # Update totals and quantity
-                self.update_cart_totals()
+                # Update quantity
                 self.update_quantity_display()
             else:
                 messagebox.showwarning("Warning", "Cart table not initialized, retrying dashboard setup")
@@ -3883,6 +3944,7 @@ class PharmacyPOS:
         with self.conn:
             cursor = self.conn.cursor()
             try:
+                delete_transaction_items(self.conn, transaction_id)
                 cursor.execute("DELETE FROM transactions WHERE transaction_id = ?", (transaction_id,))
                 log_id = f"{datetime.now().strftime('%m-%Y')}-{str(uuid.uuid4())[:6]}"
                 cursor.execute("INSERT INTO transaction_log (log_id, action, details, timestamp, user) VALUES (?, ?, ?, ?, ?)",
@@ -3911,8 +3973,7 @@ class PharmacyPOS:
                 bg="#ffffff", fg="#8B5A2B").pack(pady=15)
 
         payment_var = tk.StringVar()
-        payment_options = ["Cash", "Credit Card", "Debit Card", "Mobile Payment"]
-        for option in payment_options:
+        for option in self.PAYMENT_METHODS:
             tk.Radiobutton(payment_box, text=option, variable=payment_var, value=option,
                           font=("Helvetica", 16), bg="#ffffff", fg="#8B5A2B").pack(anchor="w", pady=5)
 
@@ -3962,7 +4023,7 @@ class PharmacyPOS:
         # Extract transaction_id from selected_item if not provided
         if not transaction_id and selected_item:
             try:
-                transaction_id = self.transactions_table.item(selected_item[0])["values"][0]
+                transaction_id = selected_item[0]
             except (IndexError, KeyError):
                 window.destroy()
                 messagebox.showerror("Error", "No transaction selected or invalid selection", parent=self.root)
@@ -3989,30 +4050,22 @@ class PharmacyPOS:
     def show_return_transaction(self, transaction_id: str) -> None:
         with self.conn:
             cursor = self.conn.cursor()
-            cursor.execute("SELECT * FROM transactions WHERE transaction_id = ?", (transaction_id,))
+            cursor.execute("SELECT status FROM transactions WHERE transaction_id = ?", (transaction_id,))
             transaction = cursor.fetchone()
             if not transaction:
                 messagebox.showerror("Error", "Transaction ID not found", parent=self.root)
                 return
-            if transaction[6] == "Returned":
+            if transaction[0] == "Returned":
                 messagebox.showerror("Error", "Transaction has already been returned", parent=self.root)
                 return
 
-            items = transaction[1].split(";")
             return_items = []
             missing_items = []
-            for item_data in items:
-                if item_data:
-                    try:
-                        item_id, qty = item_data.split(":")
-                        cursor.execute("SELECT name, retail_price FROM inventory WHERE item_id = ?", (item_id,))
-                        item = cursor.fetchone()
-                        if item:
-                            return_items.append({"id": item_id, "name": item[0], "quantity": int(qty), "retail_price": float(item[1])})
-                        else:
-                            missing_items.append(item_id)
-                    except ValueError:
-                        missing_items.append(item_data)
+            for item_id, name, qty, _, retail_price, _ in load_transaction_items(self.conn, transaction_id):
+                if name is not None:
+                    return_items.append({"id": item_id, "name": name, "quantity": int(qty), "retail_price": float(retail_price or 0)})
+                else:
+                    missing_items.append(item_id)
 
             if missing_items:
                 messagebox.showwarning("Warning", f"Some items not found in inventory: {', '.join(missing_items)}", parent=self.root)
@@ -4070,12 +4123,14 @@ class PharmacyPOS:
                     cursor.execute("UPDATE inventory SET quantity = quantity + ? WHERE item_id = ?",
                                 (item["quantity"], item["id"]))
 
+                restate_daily_sales(self.conn, transaction_id, self.current_user)
                 cursor.execute("UPDATE transactions SET status = 'Returned' WHERE transaction_id = ?",
                             (transaction_id,))
                 cursor.execute("INSERT INTO transaction_log (log_id, action, details, timestamp, user) VALUES (?, ?, ?, ?, ?)",
                             (str(uuid.uuid4()), "Return Transaction", f"Returned transaction {transaction_id}",
                             datetime.now().strftime("%Y-%m-%d %H:%M:%S"), self.current_user))
                 self.conn.commit()
+                self.inventory_index.reload_items(self.conn, [item["id"] for item in return_items])
                 window.destroy()
                 messagebox.showinfo("Success", "Transaction returned successfully", parent=self.root)
                 if hasattr(self, 'transactions_table'):
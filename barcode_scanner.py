@@ -0,0 +1,46 @@
+import tkinter as tk
+from typing import Optional
+
+
+class BarcodeScanDetector:
+    """Tells a barcode scanner apart from a person typing in the same Entry.
+
+    Scanners emit the whole code as a burst of keystrokes a few milliseconds
+    apart followed by Enter. Gaps are measured with the X event timestamps
+    rather than wall-clock time, so scans queued behind a busy UI are still
+    recognised when their events are finally delivered.
+    """
+
+    def __init__(self, max_gap_ms: int = 50, min_length: int = 4):
+        self.max_gap_ms = max_gap_ms
+        self.min_length = min_length
+        self.buffer: list = []
+        self.last_time: Optional[int] = None
+
+    def reset(self) -> None:
+        self.buffer = []
+        self.last_time = None
+
+    def feed(self, event: tk.Event) -> None:
+        """Bind to <KeyPress> on the entry the scanner types into."""
+        if event.keysym == "BackSpace":
+            self.reset()
+            return
+        char = event.char
+        if len(char) != 1 or not char.isprintable():
+            return  # Shift and other modifiers keep the burst going
+        if self.last_time is not None and event.time - self.last_time > self.max_gap_ms:
+            self.buffer = []
+        self.buffer.append(char)
+        self.last_time = event.time
+
+    def take_scan(self, event: tk.Event) -> Optional[str]:
+        """Call on <Return>; returns the scanned code, or None if the input was typed."""
+        code = "".join(self.buffer)
+        is_burst = (
+            len(code) >= self.min_length
+            and self.last_time is not None
+            and event.time - self.last_time <= self.max_gap_ms
+        )
+        self.reset()
+        return code.strip() if is_burst else None
@@ -0,0 +1,126 @@
+"""Headless checkout benchmark.
+
+Drives the same path as PharmacyPOS.process_checkout (build a Cart, take
+a transaction ID from the sequence, commit_sale with its outbox jobs)
+against a scratch copy of the schema, and reports commit latency
+percentiles and sustained transactions per second.
+
+    python bench_checkout.py --transactions 5000 --skus 3000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from typing import List, Tuple
+
+from cart import Cart
+from checkout import commit_sale
+from inventory_index import InventoryIndex
+from schema import migrate
+from sequences import next_transaction_id
+
+# Lines per basket: most pharmacy sales are one to three items, with a long tail
+CART_SIZES = [1, 2, 3, 4, 5, 6, 8, 10, 15, 25]
+CART_WEIGHTS = [34, 24, 15, 9, 6, 4, 3, 2, 2, 1]
+QUANTITIES = [1, 2, 3, 5, 10]
+QUANTITY_WEIGHTS = [70, 15, 7, 5, 3]
+
+
+def seed_inventory(conn: sqlite3.Connection, skus: int, rng: random.Random) -> List[str]:
+    rows = []
+    for n in range(skus):
+        unit_price = round(rng.uniform(2, 800), 2)
+        rows.append((f"MED{n:06d}", f"Medicine {n}", "Tablet", round(unit_price * 1.3, 2), unit_price,
+                     10_000_000, "Bench"))
+    with conn:
+        conn.executemany("""
+            INSERT OR REPLACE INTO inventory (item_id, name, type, retail_price, unit_price, quantity, supplier)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+    return [row[0] for row in rows]
+
+
+def build_cart(index: InventoryIndex, item_ids: List[str], rng: random.Random) -> Cart:
+    cart = Cart()
+    size = rng.choices(CART_SIZES, CART_WEIGHTS)[0]
+    for item_id in rng.sample(item_ids, size):
+        item = index.get(item_id)
+        cart.add(item.item_id, item.name, item.retail_price, rng.choices(QUANTITIES, QUANTITY_WEIGHTS)[0])
+    return cart
+
+
+def checkout(conn: sqlite3.Connection, cart: Cart) -> None:
+    """The database half of PharmacyPOS.process_checkout."""
+    transaction_id = next_transaction_id(conn)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    total = cart.total
+    jobs = [
+        ("receipt", {"transaction_id": transaction_id, "timestamp": timestamp,
+                     "total_amount": total, "cash_paid": total, "change": 0.0}),
+        ("low_stock", {"item_ids": [line.item_id for line in cart], "user": "bench"}),
+    ]
+    commit_sale(conn, transaction_id, [(line.item_id, line.quantity) for line in cart],
+                total, total, 0.0, timestamp, "Cash", None, "bench", jobs=jobs)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    k = max(0, min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def run(db_path: str, transactions: int, skus: int, warmup: int, seed: int) -> Tuple[List[float], float]:
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+    item_ids = seed_inventory(conn, skus, rng)
+    index = InventoryIndex()
+    index.load(conn)
+
+    for _ in range(warmup):
+        checkout(conn, build_cart(index, item_ids, rng))
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(transactions):
+        cart = build_cart(index, item_ids, rng)
+        t0 = time.perf_counter()
+        checkout(conn, cart)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return latencies, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure checkout commit latency and throughput.")
+    parser.add_argument("--transactions", type=int, default=2000)
+    parser.add_argument("--skus", type=int, default=2000, help="inventory size to seed")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db", help="scratch database path (default: a temporary file, deleted afterwards)")
+    args = parser.parse_args()
+
+    scratch_dir = None
+    db_path = args.db
+    if db_path is None:
+        scratch_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(scratch_dir.name, "pharmacy.db")
+    try:
+        latencies, elapsed = run(db_path, args.transactions, args.skus, args.warmup, args.seed)
+    finally:
+        if scratch_dir is not None:
+            scratch_dir.cleanup()
+
+    ordered = sorted(latencies)
+    print(f"checkouts: {len(latencies)}  skus: {args.skus}  db: {args.db or '(temporary)'}")
+    print(f"commit latency ms  p50 {percentile(ordered, 50):.2f}  p95 {percentile(ordered, 95):.2f}  "
+          f"p99 {percentile(ordered, 99):.2f}  max {ordered[-1]:.2f}  mean {statistics.fmean(ordered):.2f}")
+    print(f"throughput: {len(latencies) / elapsed:.1f} transactions/s (including cart building)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Senior citizen / PWD discount applied per line
+DISCOUNT_RATE = 0.2
+
+
+class CartLine:
+    """One product in the cart. Mutate through Cart so its totals stay in step."""
+    __slots__ = ("item_id", "name", "retail_price", "quantity", "discount_applied")
+
+    def __init__(self, item_id: str, name: str, retail_price: float, quantity: int = 1,
+                 discount_applied: bool = False):
+        self.item_id = item_id
+        self.name = name
+        self.retail_price = retail_price or 0.0
+        self.quantity = quantity or 0
+        self.discount_applied = discount_applied
+
+    @property
+    def gross(self) -> float:
+        return self.retail_price * self.quantity
+
+    @property
+    def discount(self) -> float:
+        return self.gross * DISCOUNT_RATE if self.discount_applied else 0.0
+
+    @property
+    def subtotal(self) -> float:
+        return self.gross - self.discount
+
+
+class Cart:
+    """Insertion-ordered cart keyed by item_id with running totals.
+
+    Adding, editing, discounting or removing a line adjusts gross, discount
+    and units in place, so none of them ever walk the whole cart. If
+    on_change is set it is called as on_change(op, item_id, **fields) after
+    every mutation, which is how CartJournal records the cart.
+    """
+
+    def __init__(self):
+        self._lines: Dict[str, CartLine] = {}
+        self.gross = 0.0
+        self.discount = 0.0
+        self.units = 0
+        self.on_change: Optional[Callable[..., None]] = None
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __iter__(self) -> Iterator[CartLine]:
+        return iter(self._lines.values())
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._lines
+
+    @property
+    def total(self) -> float:
+        return self.gross - self.discount
+
+    def get(self, item_id: str) -> Optional[CartLine]:
+        return self._lines.get(item_id)
+
+    def add(self, item_id: str, name: str, retail_price: float, quantity: int = 1) -> CartLine:
+        """Add quantity of an item, merging into its existing line if there is one."""
+        line = self._lines.get(item_id)
+        if line is None:
+            line = CartLine(item_id, name, retail_price, 0)
+            self._lines[item_id] = line
+        self._account(line, -1)
+        line.quantity += quantity
+        self._account(line, 1)
+        self._notify("add", item_id, name=name, retail_price=retail_price, quantity=quantity)
+        return line
+
+    def set_quantity(self, item_id: str, quantity: int) -> None:
+        """Change a line's quantity; zero removes the line."""
+        line = self._lines[item_id]
+        if quantity <= 0:
+            self.remove(item_id)
+            return
+        self._account(line, -1)
+        line.quantity = quantity
+        self._account(line, 1)
+        self._notify("quantity", item_id, quantity=quantity)
+
+    def set_price(self, item_id: str, retail_price: float) -> None:
+        """Re-price a line, e.g. after the item's price was changed elsewhere."""
+        line = self._lines[item_id]
+        self._account(line, -1)
+        line.retail_price = retail_price or 0.0
+        self._account(line, 1)
+        self._notify("price", item_id, retail_price=retail_price)
+
+    def set_discount(self, item_id: str, applied: bool) -> None:
+        line = self._lines[item_id]
+        self._account(line, -1)
+        line.discount_applied = applied
+        self._account(line, 1)
+        self._notify("discount", item_id, discount_applied=applied)
+
+    def remove(self, item_id: str) -> Optional[CartLine]:
+        line = self._lines.pop(item_id, None)
+        if line is not None:
+            self._account(line, -1)
+            self._notify("void", item_id)
+        return line
+
+    def clear(self) -> None:
+        self._lines.clear()
+        self.gross = 0.0
+        self.discount = 0.0
+        self.units = 0
+        self._notify("clear", None)
+
+    def discounted_names(self) -> List[str]:
+        return [line.name for line in self._lines.values() if line.discount_applied]
+
+    def items_string(self) -> str:
+        """Serialize as the transactions.items format: "item_id:qty;item_id:qty"."""
+        return ";".join(f"{line.item_id}:{line.quantity}" for line in self._lines.values())
+
+    def _notify(self, op: str, item_id: Optional[str], **fields) -> None:
+        if self.on_change is not None:
+            self.on_change(op, item_id, **fields)
+
+    def _account(self, line: CartLine, sign: int) -> None:
+        self.gross += sign * line.gross
+        self.discount += sign * line.discount
+        self.units += sign * line.quantity
+        if not self._lines:
+            # Drop accumulated float error once the cart is empty
+            self.gross = self.discount = 0.0
@@ -0,0 +1,164 @@
+import os
+import socket
+import sqlite3
+import tkinter as tk
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from cart import Cart
+
+_JOURNAL_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS cart_journal (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        terminal TEXT NOT NULL,
+        op TEXT NOT NULL,
+        item_id TEXT,
+        name TEXT,
+        retail_price REAL,
+        quantity INTEGER,
+        flag INTEGER,
+        customer_id TEXT,
+        user TEXT,
+        timestamp TEXT
+    )
+"""
+
+_INSERT_SQL = """
+    INSERT INTO cart_journal (terminal, op, item_id, name, retail_price, quantity, flag, customer_id, user, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def terminal_id() -> str:
+    """Name of this till; SHINANO_TERMINAL overrides the host name."""
+    return os.getenv("SHINANO_TERMINAL") or socket.gethostname()
+
+
+def ensure_cart_journal(conn: sqlite3.Connection) -> None:
+    with conn:
+        conn.execute(_JOURNAL_TABLE_SQL)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cart_journal_terminal ON cart_journal(terminal, seq)")
+
+
+OPEN_CART_SQL = """
+    SELECT op, item_id, name, retail_price, quantity, flag, customer_id, user, timestamp
+    FROM cart_journal
+    WHERE terminal = ? AND seq > COALESCE(
+        (SELECT MAX(seq) FROM cart_journal WHERE terminal = ? AND op = 'clear'), 0)
+    ORDER BY seq
+"""
+
+OPEN_CART_TERMINALS_SQL = """
+    SELECT terminal FROM cart_journal
+    GROUP BY terminal
+    HAVING MAX(seq) > COALESCE(MAX(CASE WHEN op = 'clear' THEN seq END), 0)
+"""
+
+
+def load_open_cart(conn: sqlite3.Connection, terminal: Optional[str] = None) -> List[Tuple]:
+    """Journal entries for the sale still open on terminal (everything after its last 'clear').
+
+    Rows are (op, item_id, name, retail_price, quantity, flag, customer_id, user, timestamp).
+    """
+    terminal = terminal or terminal_id()
+    return conn.execute(OPEN_CART_SQL, (terminal, terminal)).fetchall()
+
+
+def open_cart_terminals(conn: sqlite3.Connection) -> List[str]:
+    """Terminals whose journal ends in an unfinished sale."""
+    return [row[0] for row in conn.execute(OPEN_CART_TERMINALS_SQL)]
+
+
+def replay_open_cart(conn: sqlite3.Connection, cart: Cart, terminal: Optional[str] = None) -> dict:
+    """Apply terminal's open sale to cart without journaling it again.
+
+    Returns {"customer_id", "user", "timestamp"} taken from the replayed entries.
+    """
+    info = {"customer_id": None, "user": None, "timestamp": None}
+    on_change, cart.on_change = cart.on_change, None
+    try:
+        for op, item_id, name, retail_price, quantity, flag, customer_id, user, timestamp in load_open_cart(conn, terminal):
+            if op == "add":
+                cart.add(item_id, name, retail_price, quantity)
+            elif op == "quantity" and item_id in cart:
+                cart.set_quantity(item_id, quantity)
+            elif op == "price" and item_id in cart:
+                cart.set_price(item_id, retail_price)
+            elif op == "discount" and item_id in cart:
+                cart.set_discount(item_id, bool(flag))
+            elif op == "void":
+                cart.remove(item_id)
+            elif op == "customer":
+                info["customer_id"] = customer_id
+            info["user"] = user or info["user"]
+            info["timestamp"] = timestamp
+    finally:
+        cart.on_change = on_change
+    return info
+
+
+class CartJournal:
+    """Append-only, group-committed log of every cart mutation on this terminal.
+
+    Entries are buffered and written in a single transaction GROUP_COMMIT_MS
+    after the first one, so a burst of scans costs one commit rather than one
+    per scan. A 'clear' entry (checkout, hold, void order, logout) closes the
+    sale and lets the rows before it be discarded.
+    """
+
+    GROUP_COMMIT_MS = 100
+
+    def __init__(self, root: tk.Misc, conn: sqlite3.Connection, terminal: Optional[str] = None):
+        self.root = root
+        self.conn = conn
+        self.terminal = terminal or terminal_id()
+        self.user: Optional[str] = None
+        self.pending: List[Tuple] = []
+        self.flush_id: Optional[str] = None
+
+    def attach(self, cart: Cart) -> None:
+        cart.on_change = self.record
+
+    def record(self, op: str, item_id: Optional[str], name: Optional[str] = None,
+               retail_price: Optional[float] = None, quantity: Optional[int] = None,
+               discount_applied: Optional[bool] = None, customer_id: Optional[str] = None) -> None:
+        flag = None if discount_applied is None else int(discount_applied)
+        self.pending.append((self.terminal, op, item_id, name, retail_price, quantity, flag, customer_id,
+                             self.user, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        if op == "clear":
+            # A finished sale should not be resurrected by a crash in the next 100 ms
+            self.flush()
+        elif self.flush_id is None:
+            self.flush_id = self.root.after(self.GROUP_COMMIT_MS, self.flush)
+
+    def record_customer(self, customer_id: Optional[str]) -> None:
+        self.record("customer", None, customer_id=customer_id)
+
+    def flush(self) -> None:
+        if self.flush_id is not None:
+            try:
+                self.root.after_cancel(self.flush_id)
+            except tk.TclError:
+                pass  # Window already destroyed during shutdown
+            self.flush_id = None
+        if not self.pending:
+            return
+        entries, self.pending = self.pending, []
+        try:
+            with self.conn:
+                self.conn.executemany(_INSERT_SQL, entries)
+                if any(entry[1] == "clear" for entry in entries):
+                    # Keep only the open sale: drop everything before the newest clear
+                    self.conn.execute("""
+                        DELETE FROM cart_journal WHERE terminal = ? AND seq < (
+                            SELECT MAX(seq) FROM cart_journal WHERE terminal = ? AND op = 'clear')
+                    """, (self.terminal, self.terminal))
+        except sqlite3.Error as e:
+            print(f"Failed to write cart journal: {e}")
+            self.pending = entries + self.pending
+
+    def recover(self, cart: Cart) -> Tuple[int, Optional[str]]:
+        """Replay the open sale into cart; returns (lines recovered, customer_id)."""
+        info = replay_open_cart(self.conn, cart, self.terminal)
+        self.user = info["user"] or self.user
+        return len(cart), info["customer_id"]
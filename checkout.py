@@ -0,0 +1,156 @@
+import sqlite3
+import uuid
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from post_checkout import enqueue_jobs
+from transaction_items import load_transaction_items, parse_items, write_transaction_items
+
+
+class CheckoutError(ValueError):
+    """The cart can't be committed as-is (unknown item or not enough stock)."""
+
+
+class PriceChangedError(CheckoutError):
+    """Some lines were rung up at a price that no longer matches inventory."""
+
+    def __init__(self, prices: Dict[str, float]):
+        super().__init__("Prices changed for " + ", ".join(prices) + "; please review the cart")
+        self.prices = prices  # item_id -> current retail_price
+
+
+class SaleResult(NamedTuple):
+    net_profit: float
+    unit_sales: int
+    remaining: Dict[str, int]  # item_id -> stock left after the sale
+
+
+def upsert_daily_sales(conn: sqlite3.Connection, sale_date: str, total_sales: float, unit_sales: int,
+                       net_profit: float, unit_cost: float, user: Optional[str]) -> None:
+    """Add to sale_date's running totals in one statement; negative amounts subtract.
+
+    unit_cost is the cost of goods sold (qty * unit_price of the lines), kept
+    here so the sales summary never has to re-derive it from the sold lines.
+    """
+    conn.execute("""
+        INSERT INTO daily_sales (sale_date, total_sales, unit_sales, net_profit, unit_cost, user)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(sale_date) DO UPDATE SET
+            total_sales = total_sales + excluded.total_sales,
+            unit_sales = unit_sales + excluded.unit_sales,
+            net_profit = net_profit + excluded.net_profit,
+            unit_cost = unit_cost + excluded.unit_cost,
+            user = excluded.user
+    """, (sale_date, total_sales, unit_sales, net_profit, unit_cost, user))
+
+
+def restate_daily_sales(conn: sqlite3.Connection, transaction_id: str, user: Optional[str],
+                        new_items: str = "", new_total: float = 0.0) -> None:
+    """Move a completed sale's contribution to daily_sales from what is stored to new_items/new_total.
+
+    Call inside the caller's transaction, before the transactions row is
+    edited, returned or deleted; the defaults take the sale out entirely.
+    The sale stays booked on the day it was rung up. Held and Returned
+    rows are not in daily_sales, so they are left alone.
+    """
+    row = conn.execute(
+        "SELECT total_amount, timestamp, status FROM transactions WHERE transaction_id = ?",
+        (transaction_id,)
+    ).fetchone()
+    if row is None or row[2] != "Completed":
+        return
+    old_total, timestamp, _ = row
+    new_quantities = parse_items(new_items)
+    unit_delta, profit_delta, cost_delta = 0, 0.0, 0.0
+    # Both sides are priced from the stored lines, i.e. at what the sale actually charged
+    for item_id, _, qty, unit_price, retail_price, _ in load_transaction_items(conn, transaction_id):
+        qty_delta = new_quantities.get(item_id, 0) - qty
+        unit_delta += qty_delta
+        profit_delta += ((retail_price or 0) - (unit_price or 0)) * qty_delta
+        cost_delta += (unit_price or 0) * qty_delta
+    upsert_daily_sales(conn, str(timestamp)[:10], (new_total or 0) - (old_total or 0),
+                       unit_delta, profit_delta, cost_delta, user)
+
+
+def commit_sale(conn: sqlite3.Connection, transaction_id: str, lines: Iterable[Tuple[str, int]],
+                total_amount: float, cash_paid: float, change: float, timestamp: str,
+                payment_method: Optional[str], customer_id: Optional[str], user: Optional[str],
+                discounts: Optional[Dict[str, float]] = None, jobs: Iterable[Tuple[str, dict]] = (),
+                prices: Optional[Dict[str, float]] = None) -> SaleResult:
+    """Write a completed sale in one transaction using set-based statements.
+
+    lines are (item_id, quantity). Stock for the whole cart is validated with
+    a single read, decremented with one guarded executemany, and daily_sales
+    is upserted, so the number of round trips does not grow with the cart.
+    Each line is stored in transaction_items with the price, cost and
+    discount (item_id -> amount off) it was sold at. jobs are (kind, payload) post-checkout jobs queued in the same
+    transaction for PostCheckoutWorker. prices (item_id -> retail price the
+    line was rung up at) are checked against the rows read for the stock
+    check; PriceChangedError is raised if any differ, so total_amount always
+    matches the stored lines. Raises CheckoutError and rolls back if any line
+    can't be fulfilled.
+    """
+    quantities: Dict[str, int] = {}
+    for item_id, quantity in lines:
+        quantities[item_id] = quantities.get(item_id, 0) + int(quantity)
+    if not quantities:
+        raise CheckoutError("Cart is empty")
+    item_ids = list(quantities)
+    items = ";".join(f"{item_id}:{quantity}" for item_id, quantity in quantities.items())
+    sale_date = timestamp[:10]
+
+    with conn:
+        cursor = conn.cursor()
+        placeholders = ",".join("?" * len(item_ids))
+        cursor.execute(
+            f"SELECT item_id, retail_price, unit_price, quantity, name FROM inventory WHERE item_id IN ({placeholders})",
+            item_ids
+        )
+        stock = {row[0]: row[1:] for row in cursor.fetchall()}
+        if prices:
+            changed = {item_id: stock[item_id][0] or 0.0 for item_id, price in prices.items()
+                       if item_id in stock and abs((stock[item_id][0] or 0.0) - price) >= 0.005}
+            if changed:
+                raise PriceChangedError(changed)
+
+        net_profit = unit_cost = 0.0
+        remaining = {}
+        for item_id, quantity in quantities.items():
+            if item_id not in stock:
+                raise CheckoutError(f"Item {item_id} not found in inventory")
+            retail_price, unit_price, current_quantity, _ = stock[item_id]
+            if current_quantity < quantity:
+                raise CheckoutError(f"Insufficient stock for item {item_id}: {current_quantity} available")
+            net_profit += ((retail_price or 0) - (unit_price or 0)) * quantity
+            unit_cost += (unit_price or 0) * quantity
+            remaining[item_id] = current_quantity - quantity
+
+        # The quantity guard makes the decrement safe even if another till sold in between
+        cursor.executemany(
+            "UPDATE inventory SET quantity = quantity - ? WHERE item_id = ? AND quantity >= ?",
+            [(quantity, item_id, quantity) for item_id, quantity in quantities.items()]
+        )
+        if cursor.rowcount != len(quantities):
+            raise CheckoutError("Stock changed during checkout; please try again")
+
+        cursor.execute('''
+            INSERT INTO transactions (transaction_id, items, total_amount, cash_paid, change_amount, timestamp, status, payment_method, customer_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (transaction_id, items, total_amount, cash_paid, change, timestamp, "Completed", payment_method, customer_id))
+
+        discounts = discounts or {}
+        write_transaction_items(conn, transaction_id, [
+            (item_id, stock[item_id][3], quantity, stock[item_id][1] or 0.0, stock[item_id][0] or 0.0,
+             discounts.get(item_id, 0.0))
+            for item_id, quantity in quantities.items()
+        ])
+
+        unit_sales = sum(quantities.values())
+        upsert_daily_sales(conn, sale_date, total_amount, unit_sales, net_profit, unit_cost, user)
+
+        cursor.execute('''
+            INSERT INTO transaction_log (log_id, action, details, timestamp, user)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (str(uuid.uuid4()), "Checkout", f"Completed transaction {transaction_id}", timestamp, user))
+        enqueue_jobs(conn, transaction_id, jobs)
+
+    return SaleResult(net_profit, unit_sales, remaining)
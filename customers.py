@@ -0,0 +1,14 @@
+import sqlite3
+from typing import List
+
+# Every customer screen lists these, in this order
+CUSTOMER_LIST_SQL = "SELECT customer_id, name, contact, address FROM customers"
+# Substring match, so it reads the whole table; customers stay few enough for that
+CUSTOMER_SEARCH_SQL = CUSTOMER_LIST_SQL + " WHERE name LIKE ?"
+
+
+def search_customers(conn: sqlite3.Connection, query: str) -> List[tuple]:
+    """(customer_id, name, contact, address) of customers whose name contains query, or all of them."""
+    if not query:
+        return conn.execute(CUSTOMER_LIST_SQL).fetchall()
+    return conn.execute(CUSTOMER_SEARCH_SQL, (f"%{query}%",)).fetchall()
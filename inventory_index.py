@@ -0,0 +1,272 @@
+import heapq
+import sqlite3
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class IndexedItem:
+    """One inventory row held in memory by InventoryIndex."""
+    __slots__ = ("item_id", "name", "type", "retail_price", "unit_price", "quantity", "supplier", "name_lower")
+
+    def __init__(self, item_id: str, name: str, item_type: str, retail_price: float,
+                 unit_price: float, quantity: int, supplier: Optional[str]):
+        self.item_id = item_id
+        self.name = name or ""
+        self.type = item_type
+        self.retail_price = retail_price or 0.0
+        self.unit_price = unit_price or 0.0
+        self.quantity = int(quantity or 0)
+        self.supplier = supplier
+        self.name_lower = self.name.lower()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def prefix_edit_distance(query: str, text: str, max_dist: int) -> int:
+    """Levenshtein distance from query to the closest prefix of text.
+
+    Gives up as soon as every cell in a row exceeds max_dist and returns
+    max_dist + 1, so non-matches cost only a few rows of the DP table.
+    """
+    previous = list(range(len(text) + 1))
+    for i, qc in enumerate(query, 1):
+        current = [i]
+        best = i
+        for j, tc in enumerate(text, 1):
+            cost = previous[j - 1] + (qc != tc)
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current.append(cost)
+            if cost < best:
+                best = cost
+        if best > max_dist:
+            return max_dist + 1
+        previous = current
+    return min(previous)
+
+
+class InventoryIndex:
+    """In-memory catalog with a word-prefix index and a trigram substring index.
+
+    Loaded once from SQLite and kept current by the callers that write to
+    inventory, so suggestion lookups never have to touch the database.
+    """
+
+    SELECT_SQL = "SELECT item_id, name, type, retail_price, unit_price, quantity, supplier FROM inventory"
+
+    # Match tiers for rank(); higher is better
+    TIER_NAME_PREFIX = 3
+    TIER_WORD_PREFIX = 2
+    TIER_SUBSTRING = 1
+    TIER_FUZZY = 0
+    # Most trigram-sharing names verified with edit distance per fuzzy lookup
+    FUZZY_CANDIDATE_LIMIT = 500
+
+    def __init__(self):
+        self.by_id: Dict[str, IndexedItem] = {}
+        self._prefixes: List[Tuple[str, str]] = []  # sorted (word, item_id)
+        self._trigram_postings: Dict[str, Set[str]] = {}
+        self.velocity: Dict[str, float] = {}  # item_id -> units sold per day
+        self.velocity_days = 30
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.by_id
+
+    def get(self, item_id: str) -> Optional[IndexedItem]:
+        return self.by_id.get(item_id)
+
+    def load(self, conn: sqlite3.Connection) -> None:
+        """Replace the index contents with the full inventory table."""
+        self.by_id = {}
+        self._trigram_postings = {}
+        prefixes = []
+        for row in conn.execute(self.SELECT_SQL):
+            item = IndexedItem(*row)
+            self.by_id[item.item_id] = item
+            self._add_postings(item)
+            prefixes.extend((word, item.item_id) for word in self._words(item.name_lower))
+        prefixes.sort()
+        self._prefixes = prefixes
+
+    def reload_items(self, conn: sqlite3.Connection, item_ids: Iterable[str]) -> None:
+        """Re-read the given item_ids from the database; ids that no longer exist are dropped."""
+        item_ids = list(dict.fromkeys(item_ids))
+        if not item_ids:
+            return
+        for item_id in item_ids:
+            self.remove(item_id)
+        placeholders = ",".join("?" * len(item_ids))
+        for row in conn.execute(f"{self.SELECT_SQL} WHERE item_id IN ({placeholders})", item_ids):
+            self.upsert(*row)
+
+    def upsert(self, item_id: str, name: str, item_type: str, retail_price: float,
+               unit_price: float, quantity: int, supplier: Optional[str]) -> None:
+        self.remove(item_id)
+        item = IndexedItem(item_id, name, item_type, retail_price, unit_price, quantity, supplier)
+        self.by_id[item_id] = item
+        self._add_postings(item)
+        for word in self._words(item.name_lower):
+            insort(self._prefixes, (word, item_id))
+
+    def remove(self, item_id: str) -> None:
+        item = self.by_id.pop(item_id, None)
+        if item is None:
+            return
+        for gram in _trigrams(item.name_lower):
+            postings = self._trigram_postings.get(gram)
+            if postings is not None:
+                postings.discard(item_id)
+                if not postings:
+                    del self._trigram_postings[gram]
+        for word in self._words(item.name_lower):
+            pos = bisect_left(self._prefixes, (word, item_id))
+            if pos < len(self._prefixes) and self._prefixes[pos] == (word, item_id):
+                del self._prefixes[pos]
+
+    def adjust_quantity(self, item_id: str, delta: int) -> None:
+        item = self.by_id.get(item_id)
+        if item is not None:
+            item.quantity += delta
+
+    def load_velocity(self, conn: sqlite3.Connection, days: int = 30) -> None:
+        """Compute units sold per day per item over the last `days` of completed sales."""
+        self.velocity_days = days
+        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+        rows = conn.execute("""
+            SELECT ti.item_id, SUM(ti.qty)
+            FROM transactions t
+            JOIN transaction_items ti ON ti.transaction_id = t.transaction_id
+            WHERE t.status = 'Completed' AND t.timestamp >= ?
+            GROUP BY ti.item_id
+        """, (since,))
+        self.velocity = {item_id: (qty or 0) / days for item_id, qty in rows}
+
+    def record_sale(self, item_id: str, quantity: int) -> None:
+        self.velocity[item_id] = self.velocity.get(item_id, 0.0) + quantity / self.velocity_days
+
+    def rank(self, query: str, k: int = 10) -> List[IndexedItem]:
+        """Return the best k items for query, tolerating typos and favouring fast sellers.
+
+        Candidates are ordered by match tier (whole-name prefix, word prefix,
+        substring, fuzzy), then edit distance, then sales velocity; the top k
+        are picked with a heap, so a one-letter query never sorts the catalog.
+        """
+        query = query.strip().lower()
+        if not query or k <= 0:
+            return []
+        candidates: Dict[str, Tuple[int, int]] = {}  # item_id -> (tier, distance)
+        for item_id in self._prefix_matches(query):
+            tier = self.TIER_NAME_PREFIX if self.by_id[item_id].name_lower.startswith(query) else self.TIER_WORD_PREFIX
+            candidates[item_id] = (tier, 0)
+        # Tier dominates the score, so lower tiers only matter while fewer than k are found
+        if len(candidates) < k and len(query) >= 3:
+            for item_id in self._substring_matches(query):
+                candidates.setdefault(item_id, (self.TIER_SUBSTRING, 0))
+        if len(candidates) < k and len(query) >= 4:
+            for item_id, distance in self._fuzzy_matches(query):
+                candidates.setdefault(item_id, (self.TIER_FUZZY, distance))
+
+        def score(item_id: str) -> Tuple:
+            tier, distance = candidates[item_id]
+            item = self.by_id[item_id]
+            return (tier, -distance, self.velocity.get(item_id, 0.0), -len(item.name_lower))
+
+        return [self.by_id[i] for i in heapq.nlargest(k, candidates, key=score)]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[IndexedItem]:
+        """Return items whose name contains query, word-prefix matches first."""
+        query = query.strip().lower()
+        if not query:
+            return []
+        prefix_ids = self._prefix_matches(query)
+        if len(query) >= 3:
+            substring_ids = self._substring_matches(query)
+        else:
+            # Trigrams need three characters; short queries only match word starts.
+            substring_ids = set()
+        substring_ids.difference_update(prefix_ids)
+
+        results = [self.by_id[i] for i in prefix_ids]
+        results.sort(key=lambda item: item.name_lower)
+        rest = [self.by_id[i] for i in substring_ids]
+        rest.sort(key=lambda item: item.name_lower)
+        results.extend(rest)
+        return results[:limit] if limit is not None else results
+
+    def _prefix_matches(self, query: str) -> Set[str]:
+        matches = set()
+        pos = bisect_left(self._prefixes, (query, ""))
+        while pos < len(self._prefixes):
+            word, item_id = self._prefixes[pos]
+            if not word.startswith(query):
+                break
+            matches.add(item_id)
+            pos += 1
+        return matches
+
+    def _substring_matches(self, query: str) -> Set[str]:
+        postings = [self._trigram_postings.get(gram) for gram in _trigrams(query)]
+        if any(p is None for p in postings):
+            return set()
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for p in postings[1:]:
+            candidates &= p
+            if not candidates:
+                return candidates
+        return {i for i in candidates if query in self.by_id[i].name_lower}
+
+    def _fuzzy_matches(self, query: str) -> List[Tuple[str, int]]:
+        """Items within a small edit distance of query, found via shared trigrams."""
+        max_dist = 1 if len(query) < 8 else 2
+        grams = _trigrams(query)
+        # Each edit destroys at most three of the query's trigrams
+        min_shared = max(1, len(grams) - 3 * max_dist)
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._trigram_postings.get(gram, ()))
+        # A prefix longer than this can't be within max_dist, so names are compared
+        # truncated and the result is reused for names that share the same words
+        window = len(query) + max_dist
+        distances: Dict[str, int] = {}
+        matches = []
+        best_shared = heapq.nlargest(self.FUZZY_CANDIDATE_LIMIT, shared.items(),
+                                     key=lambda entry: (entry[1], self.velocity.get(entry[0], 0.0)))
+        for item_id, count in best_shared:
+            if count < min_shared:
+                break
+            name_lower = self.by_id[item_id].name_lower
+            # Compare against the name from the start of every word
+            starts = [0] + [i + 1 for i, ch in enumerate(name_lower) if ch == " "]
+            distance = max_dist + 1
+            for pos in starts:
+                text = name_lower[pos:pos + window]
+                d = distances.get(text)
+                if d is None:
+                    d = distances[text] = prefix_edit_distance(query, text, max_dist)
+                if d < distance:
+                    distance = d
+            if distance <= max_dist:
+                matches.append((item_id, distance))
+        return matches
+
+    def _add_postings(self, item: IndexedItem) -> None:
+        for gram in _trigrams(item.name_lower):
+            self._trigram_postings.setdefault(gram, set()).add(item.item_id)
+
+    @staticmethod
+    def _words(name_lower: str) -> Set[str]:
+        # The full name is included so multi-word queries still prefix-match.
+        words = set(name_lower.split())
+        if name_lower:
+            words.add(name_lower)
+        return words
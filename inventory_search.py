@@ -0,0 +1,157 @@
+import re
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+# Column weights for bm25(): item_id, name, type, supplier
+BM25_WEIGHTS = (4.0, 10.0, 1.0, 2.0)
+
+# The trigram tokenizer indexes every three-character run, so a MATCH finds
+# a word anywhere in the text ("cetamol" finds Paracetamol), like LIKE '%...%' did
+_FTS_TOKENIZER = "trigram"
+TRIGRAM_MIN_LENGTH = 3
+
+_FTS_TABLE_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS inventory_fts USING fts5(
+        item_id, name, type, supplier,
+        content='inventory', content_rowid='rowid',
+        tokenize='{_FTS_TOKENIZER}'
+    )
+"""
+
+_FTS_TRIGGERS_SQL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_fts_ai AFTER INSERT ON inventory BEGIN
+        INSERT INTO inventory_fts(rowid, item_id, name, type, supplier)
+        VALUES (new.rowid, new.item_id, new.name, new.type, new.supplier);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_fts_ad AFTER DELETE ON inventory BEGIN
+        INSERT INTO inventory_fts(inventory_fts, rowid, item_id, name, type, supplier)
+        VALUES ('delete', old.rowid, old.item_id, old.name, old.type, old.supplier);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_fts_au AFTER UPDATE OF item_id, name, type, supplier ON inventory BEGIN
+        INSERT INTO inventory_fts(inventory_fts, rowid, item_id, name, type, supplier)
+        VALUES ('delete', old.rowid, old.item_id, old.name, old.type, old.supplier);
+        INSERT INTO inventory_fts(rowid, item_id, name, type, supplier)
+        VALUES (new.rowid, new.item_id, new.name, new.type, new.supplier);
+    END
+    """,
+)
+
+_COLUMNS = "i.item_id, i.name, i.type, i.retail_price, i.quantity, i.supplier"
+
+
+# id(conn) -> whether that connection's database has a current inventory_fts.
+# Connections can't be weak-referenced; a stale entry left by a recycled id is
+# corrected by search_inventory when the MATCH fails.
+_fts_checked: Dict[int, bool] = {}
+
+
+def _fts_table_sql(conn: sqlite3.Connection) -> Optional[str]:
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'inventory_fts'"
+    ).fetchone()
+    return row[0] if row else None
+
+
+def fts_available(conn: sqlite3.Connection) -> bool:
+    """Whether conn has the current inventory_fts table; looked up once per connection."""
+    available = _fts_checked.get(id(conn))
+    if available is None:
+        sql = _fts_table_sql(conn)
+        available = _fts_checked[id(conn)] = sql is not None and _FTS_TOKENIZER in sql
+    return available
+
+
+def ensure_inventory_fts(conn: sqlite3.Connection) -> bool:
+    """Create the inventory_fts shadow table and its sync triggers.
+
+    A table built with an older tokenizer is dropped and rebuilt. Returns
+    False when this SQLite build has no FTS5 or no trigram tokenizer, in
+    which case search_inventory falls back to LIKE.
+    """
+    sql = _fts_table_sql(conn)
+    try:
+        with conn:
+            if sql is not None and _FTS_TOKENIZER not in sql:
+                conn.execute("DROP TABLE inventory_fts")
+                sql = None
+            conn.execute(_FTS_TABLE_SQL)
+            for trigger_sql in _FTS_TRIGGERS_SQL:
+                conn.execute(trigger_sql)
+            if sql is None:
+                conn.execute("INSERT INTO inventory_fts(inventory_fts) VALUES ('rebuild')")
+    except sqlite3.OperationalError as e:
+        print(f"FTS5 trigram search unavailable, inventory search will use LIKE: {e}")
+        _fts_checked[id(conn)] = False
+        return False
+    _fts_checked[id(conn)] = True
+    return True
+
+
+def build_match_query(query: str) -> str:
+    """Turn free text into an FTS5 MATCH expression: every word must appear somewhere.
+
+    Returns "" when a word is shorter than a trigram, which the index can't
+    look up; the caller then falls back to LIKE.
+    """
+    tokens = re.findall(r"\w+", query.lower())
+    if any(len(token) < TRIGRAM_MIN_LENGTH for token in tokens):
+        return ""
+    return " AND ".join(f'"{token}"' for token in tokens)
+
+
+def search_inventory(conn: sqlite3.Connection, query: str, type_filter: Optional[str] = None,
+                     limit: Optional[int] = None) -> List[Tuple]:
+    """Search inventory by name, type, supplier or item_id, best matches first.
+
+    Rows are (item_id, name, type, retail_price, quantity, supplier). An empty
+    query lists the (optionally type-filtered) catalog by name. Words match
+    anywhere in the text; a query with a word under three characters is
+    matched against the name with LIKE instead.
+    """
+    match = build_match_query(query) if query else ""
+    use_fts = bool(match) and fts_available(conn)
+    try:
+        return conn.execute(*search_sql(query, match if use_fts else "", type_filter, limit)).fetchall()
+    except sqlite3.OperationalError:
+        if not use_fts:
+            raise
+        # inventory_fts went away under a cached answer; forget it and use LIKE
+        _fts_checked.pop(id(conn), None)
+        return conn.execute(*search_sql(query, "", type_filter, limit)).fetchall()
+
+
+def search_sql(query: str, match: str, type_filter: Optional[str] = None,
+               limit: Optional[int] = None) -> Tuple[str, List]:
+    """The statement search_inventory runs: an FTS5 MATCH when match is set, else LIKE on the name."""
+    params: List = []
+    conditions: List[str] = []
+    use_fts = bool(match)
+
+    if use_fts:
+        sql = f"SELECT {_COLUMNS} FROM inventory_fts JOIN inventory i ON i.rowid = inventory_fts.rowid"
+        conditions.append("inventory_fts MATCH ?")
+        params.append(match)
+    else:
+        sql = f"SELECT {_COLUMNS} FROM inventory i"
+        if query:
+            conditions.append("i.name LIKE ?")
+            params.append(f"%{query}%")
+    if type_filter:
+        conditions.append("i.type = ?")
+        params.append(type_filter)
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    if use_fts:
+        sql += " ORDER BY bm25(inventory_fts, %s)" % ", ".join(str(w) for w in BM25_WEIGHTS)
+    else:
+        sql += " ORDER BY LOWER(i.name)"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
@@ -0,0 +1,122 @@
+import zlib
+from array import array
+from typing import BinaryIO, Iterable, Optional, Tuple
+
+# Letter, in points
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+
+# A line of text: (x, y, text), with y measured up from the bottom of the page
+TextLine = Tuple[float, float, str]
+
+_FONT_ID, _PAGES_ID, _CATALOG_ID = 1, 2, 3
+
+
+def _pdf_string(text: str) -> bytes:
+    # Helvetica's WinAnsi encoding has no peso sign; it prints as "P" like the thermal receipt
+    raw = text.replace("₱", "P").encode("cp1252", errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _text_ops(lines: Iterable[TextLine], font_size: int) -> bytes:
+    ops = [b"BT", b"/F1 %d Tf" % font_size]
+    for x, y, text in lines:
+        # Tm positions each line absolutely, so lines can come in any order
+        ops.append(b"1 0 0 1 %.2f %.2f Tm %s Tj" % (x, y, _pdf_string(text)))
+    ops.append(b"ET")
+    return b"\n".join(ops)
+
+
+class PdfStreamWriter:
+    """Writes a text-only PDF page by page, putting each page on disk as soon as it is added.
+
+    Meant for long exports that would otherwise be held in memory until
+    save(). Pages are Letter size and set in the built-in Helvetica, so no
+    font data is embedded. define_form() stores lines shared by every page
+    once, as a form XObject. Only each object's file offset (in a packed
+    array) is kept until close(), where the page tree and cross-reference
+    table are written out in chunks.
+    """
+
+    def __init__(self, path: str, font_size: int = 12):
+        self.font_size = font_size
+        self._file: BinaryIO = open(path, "wb")
+        # Eight bytes per object and per page; by object number - 1, the fixed objects filled in as written
+        self._offsets = array("q", [0, 0, 0])
+        self._page_ids = array("q")
+        self._form_id: Optional[int] = None
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_object(_FONT_ID, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                                     b"/Encoding /WinAnsiEncoding >>")
+
+    def __enter__(self) -> "PdfStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    def define_form(self, lines: Iterable[TextLine]) -> None:
+        """Lines drawn on every page added after this."""
+        self._form_id = self._write_stream(
+            b"/Type /XObject /Subtype /Form /BBox [0 0 %d %d] /Resources << /Font << /F1 %d 0 R >> >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, _FONT_ID),
+            _text_ops(lines, self.font_size)
+        )
+
+    def add_page(self, lines: Iterable[TextLine]) -> None:
+        content = _text_ops(lines, self.font_size)
+        resources = b"/Font << /F1 %d 0 R >>" % _FONT_ID
+        if self._form_id is not None:
+            content = b"/Form Do\n" + content
+            resources += b" /XObject << /Form %d 0 R >>" % self._form_id
+        content_id = self._write_stream(b"", content)
+        page_id = self._new_id()
+        self._write_object(page_id, b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+                                    b"/Resources << %s >> /Contents %d 0 R >>"
+                           % (_PAGES_ID, PAGE_WIDTH, PAGE_HEIGHT, resources, content_id))
+        self._page_ids.append(page_id)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._offsets[_PAGES_ID - 1] = self._file.tell()
+        self._file.write(b"%d 0 obj\n<< /Type /Pages /Count %d /Kids [" % (_PAGES_ID, len(self._page_ids)))
+        self._write_chunked(b"%d 0 R " % page_id for page_id in self._page_ids)
+        self._file.write(b"] >>\nendobj\n")
+        self._write_object(_CATALOG_ID, b"<< /Type /Catalog /Pages %d 0 R >>" % _PAGES_ID)
+        xref = self._file.tell()
+        self._file.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self._offsets) + 1))
+        self._write_chunked(b"%010d 00000 n \n" % offset for offset in self._offsets)
+        self._file.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                         % (len(self._offsets) + 1, _CATALOG_ID, xref))
+        self._file.close()
+
+    def _write_chunked(self, parts: Iterable[bytes], chunk: int = 1024) -> None:
+        buffer = []
+        for part in parts:
+            buffer.append(part)
+            if len(buffer) == chunk:
+                self._file.write(b"".join(buffer))
+                buffer = []
+        self._file.write(b"".join(buffer))
+
+    def _new_id(self) -> int:
+        self._offsets.append(0)
+        return len(self._offsets)
+
+    def _write_object(self, object_id: int, body: bytes) -> None:
+        self._offsets[object_id - 1] = self._file.tell()
+        self._file.write(b"%d 0 obj\n%s\nendobj\n" % (object_id, body))
+
+    def _write_stream(self, dictionary: bytes, data: bytes) -> int:
+        data = zlib.compress(data)
+        object_id = self._new_id()
+        self._write_object(object_id, b"<< %s /Filter /FlateDecode /Length %d >>\nstream\n%s\nendstream"
+                           % (dictionary, len(data), data))
+        return object_id
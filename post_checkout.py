@@ -0,0 +1,208 @@
+import json
+import queue
+import sqlite3
+import threading
+import tkinter as tk
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from cart_journal import terminal_id
+
+_OUTBOX_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS checkout_outbox (
+        job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        terminal TEXT NOT NULL,
+        transaction_id TEXT,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        created TEXT
+    )
+"""
+
+# Oldest job still waiting on a terminal
+NEXT_JOB_SQL = """
+    SELECT job_id, kind, payload, attempts FROM checkout_outbox
+    WHERE terminal = ? AND status = 'pending'
+    ORDER BY job_id LIMIT 1
+"""
+
+
+def ensure_outbox(conn: sqlite3.Connection) -> None:
+    with conn:
+        conn.execute(_OUTBOX_TABLE_SQL)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_checkout_outbox_pending ON checkout_outbox(terminal, status, job_id)")
+
+
+def enqueue_jobs(conn: sqlite3.Connection, transaction_id: str, jobs: Iterable[Tuple[str, dict]],
+                 terminal: Optional[str] = None) -> None:
+    """Queue (kind, payload) jobs for transaction_id without committing.
+
+    Call inside the transaction that writes the sale so the jobs exist if
+    and only if the sale does.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return
+    terminal = terminal or terminal_id()
+    created = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        "INSERT INTO checkout_outbox (terminal, transaction_id, kind, payload, created) VALUES (?, ?, ?, ?, ?)",
+        [(terminal, transaction_id, kind, json.dumps(payload), created) for kind, payload in jobs]
+    )
+
+
+class JobNotRemovedError(Exception):
+    """A job's handler finished but the job could not be taken off the outbox; it is not run again."""
+
+
+class PostCheckoutWorker:
+    """Runs this terminal's queued post-checkout jobs on a background thread.
+
+    Jobs are read from checkout_outbox, so anything still pending after a
+    crash is picked up again on the next start. handlers[kind](conn, payload)
+    runs on the worker with its own connection and must not touch Tk or
+    commit; its writes are committed together with the job's removal.
+    on_done(kind, payload, result) and on_error(kind, payload, error) are
+    called back on the Tk thread.
+
+    A job is marked 'running' in its own commit before its handler starts,
+    and only a handler that raises is retried. If the handler returned but
+    the removal could not be committed, its device output (a printed
+    receipt) already happened, so the job is marked 'failed' rather than
+    run again. A job that keeps raising is marked 'failed' after
+    MAX_ATTEMPTS. Failed jobs stay in the table for inspection. Jobs left
+    'running' by a crash, or whose failure could not be recorded, are run
+    again on the next start.
+    """
+
+    POLL_MS = 100
+    IDLE_SECONDS = 5.0
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, root: tk.Misc, db_path: str,
+                 handlers: Dict[str, Callable[[sqlite3.Connection, dict], Any]],
+                 on_done: Callable[[str, dict, Any], None],
+                 on_error: Callable[[str, dict, Exception], None],
+                 terminal: Optional[str] = None):
+        self.root = root
+        self.db_path = db_path
+        self.handlers = handlers
+        self.on_done = on_done
+        self.on_error = on_error
+        self.terminal = terminal or terminal_id()
+        self._results: "queue.Queue" = queue.Queue()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._worker: Optional[threading.Thread] = None
+        self._poll_id: Optional[str] = None
+
+    def start(self) -> None:
+        if self._worker is not None:
+            return
+        self._stopping = False
+        self._worker = threading.Thread(target=self._work, name="post-checkout", daemon=True)
+        self._worker.start()
+        self._poll_id = self.root.after(self.POLL_MS, self._poll)
+
+    def notify(self) -> None:
+        """Tell the worker new jobs were committed."""
+        self._wake.set()
+
+    def shutdown(self) -> None:
+        self._stopping = True
+        self._wake.set()
+        self._worker = None
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except tk.TclError:
+                pass  # Window already destroyed during shutdown
+            self._poll_id = None
+
+    def _claim(self, conn: sqlite3.Connection) -> Optional[Tuple[int, str, str, int]]:
+        return conn.execute(NEXT_JOB_SQL, (self.terminal,)).fetchone()
+
+    def _recover(self, conn: sqlite3.Connection) -> None:
+        """Put jobs a previous run left 'running' back in the queue."""
+        try:
+            with conn:
+                conn.execute("UPDATE checkout_outbox SET status = 'pending' WHERE terminal = ? AND status = 'running'",
+                             (self.terminal,))
+        except sqlite3.Error as e:
+            print(f"Failed to requeue interrupted post-checkout jobs: {e}")
+
+    def _work(self) -> None:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            self._recover(conn)
+            while not self._stopping:
+                try:
+                    job = self._claim(conn)
+                except sqlite3.Error as e:
+                    print(f"Failed to read checkout outbox: {e}")
+                    job = None
+                if job is None or not self._run(conn, *job):
+                    self._wake.wait(self.IDLE_SECONDS)
+                    self._wake.clear()
+        finally:
+            conn.close()
+
+    def _run(self, conn: sqlite3.Connection, job_id: int, kind: str, payload_json: str, attempts: int) -> bool:
+        """Run one job; returns False if the outbox could not be written, so the caller backs off."""
+        attempts += 1
+        try:
+            with conn:
+                conn.execute("UPDATE checkout_outbox SET status = 'running', attempts = ? WHERE job_id = ?",
+                             (attempts, job_id))
+        except sqlite3.Error as e:
+            print(f"Failed to start post-checkout job {job_id}: {e}")
+            return False
+
+        payload = json.loads(payload_json)
+        handler = self.handlers.get(kind)
+        finished = False
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for post-checkout job '{kind}'")
+            with conn:
+                result = handler(conn, payload)
+                finished = True
+                conn.execute("DELETE FROM checkout_outbox WHERE job_id = ?", (job_id,))
+        except Exception as e:
+            if finished:
+                e = JobNotRemovedError(f"Finished, but could not be removed from the outbox: {e}")
+                status = "failed"
+            else:
+                status = "failed" if attempts >= self.MAX_ATTEMPTS else "pending"
+            try:
+                with conn:
+                    conn.execute("UPDATE checkout_outbox SET status = ?, error = ? WHERE job_id = ?",
+                                 (status, str(e), job_id))
+            except sqlite3.Error as record_error:
+                # Still 'running', so the job is left alone until the next start
+                print(f"Failed to record the failure of post-checkout job {job_id}: {record_error}")
+                return False
+            if status == "failed":
+                self._results.put((kind, payload, None, e))
+            return True
+        self._results.put((kind, payload, result, None))
+        return True
+
+    def _poll(self) -> None:
+        while True:
+            try:
+                kind, payload, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if error is not None:
+                    self.on_error(kind, payload, error)
+                else:
+                    self.on_done(kind, payload, result)
+            except tk.TclError as e:
+                print(f"Post-checkout callback for '{kind}' failed: {e}")
+        if not self._stopping:
+            self._poll_id = self.root.after(self.POLL_MS, self._poll)
@@ -0,0 +1,157 @@
+"""EXPLAIN QUERY PLAN check for the application's hot queries.
+
+Runs every query in QUERIES against a database and reports each one that
+still reads a whole large table instead of searching an index. Scans listed
+in ACCEPTED_SCANS are reported with their reason and don't fail the check.
+
+    python query_plans.py                 # a fresh scratch schema
+    python query_plans.py path/to/pharmacy.db
+
+A database file is opened read-only and never migrated. One whose schema is
+behind the application's is reported instead of checked.
+"""
+import argparse
+import re
+import sqlite3
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from cart_journal import OPEN_CART_SQL, OPEN_CART_TERMINALS_SQL
+from customers import CUSTOMER_SEARCH_SQL
+from inventory_search import build_match_query, search_sql
+from post_checkout import NEXT_JOB_SQL
+from receipts import _RECEIPT_SQL
+from schema import LOW_STOCK_SQL, SCHEMA_VERSION, TRANSACTION_LOG_SQL, migrate, schema_version
+from transaction_pages import (_PAGE_SQL, COMPLETED_COST_SQL, COMPLETED_SALES_SQL, HELD_TRANSACTIONS_SQL,
+                               TransactionFilter, filter_conditions)
+
+# Tables that grow with the business; a full scan of any of them is flagged
+LARGE_TABLES = {"inventory", "transactions", "transaction_items", "transaction_log", "customers",
+                "daily_sales", "cart_journal", "checkout_outbox"}
+
+
+def filtered_page(criteria: TransactionFilter) -> Tuple[str, tuple]:
+    """The transactions page query and parameters fetch_transaction_page runs for criteria."""
+    conditions, params = filter_conditions(criteria)
+    return _PAGE_SQL.format(where="WHERE " + " AND ".join(conditions), order="DESC"), tuple(params) + (100,)
+
+
+def inventory_search(query: str) -> Tuple[str, tuple]:
+    """The statement search_inventory runs for query when inventory_fts is available."""
+    sql, params = search_sql(query, build_match_query(query))
+    return sql, tuple(params)
+
+
+# (label, sql, sample parameters), all taken from the modules that run them
+QUERIES: List[Tuple[str, str, tuple]] = [
+    ("inventory search", *inventory_search("vitamin")),
+    ("inventory search, word under a trigram", *inventory_search("c")),
+    ("inventory catalog", *inventory_search("")),
+    ("customer search", CUSTOMER_SEARCH_SQL, ("%juan%",)),
+    ("low stock alert", LOW_STOCK_SQL, ()),
+    ("held transactions (Unpaid)", HELD_TRANSACTIONS_SQL, ()),
+    ("transactions page",
+     _PAGE_SQL.format(where="WHERE (timestamp, transaction_id) < (?, ?)", order="DESC"),
+     ("2026-01-01 00:00:00", "", 100)),
+    ("transactions by ID prefix", *filtered_page(TransactionFilter(transaction_id="T2026"))),
+    ("transactions on a day", *filtered_page(TransactionFilter(start_date=date(2026, 1, 1), end_date=date(2026, 1, 1)))),
+    ("transactions by payment method", *filtered_page(TransactionFilter(payment_method="Cash"))),
+    ("transactions of a customer", *filtered_page(TransactionFilter(customer_id="C1"))),
+    ("transactions containing an item", *filtered_page(TransactionFilter(item="Vitamin C"))),
+    ("completed sales in a month", COMPLETED_SALES_SQL, ("2026-01-01", "2026-02-01")),
+    ("cost of sales in a month", COMPLETED_COST_SQL, ("2026-01-01", "2026-02-01")),
+    ("receipt by transaction ID", _RECEIPT_SQL + " WHERE t.transaction_id = ? ORDER BY ti.item_id", ("T1",)),
+    ("receipt export", _RECEIPT_SQL + """
+        WHERE t.status = 'Completed' AND t.timestamp >= ? AND t.timestamp < ?
+        ORDER BY t.timestamp, t.transaction_id, ti.item_id
+    """, ("2026-01-01", "2026-02-01")),
+    ("transaction log", TRANSACTION_LOG_SQL, ()),
+    ("next outbox job", NEXT_JOB_SQL, ("till-1",)),
+    ("open cart journal", OPEN_CART_SQL, ("till-1", "till-1")),
+    ("terminals with an open cart", OPEN_CART_TERMINALS_SQL, ()),
+]
+
+# Queries known to read a whole large table, and why that is accepted. They
+# are reported on every run and never counted as using an index.
+ACCEPTED_SCANS: Dict[str, str] = {
+    "inventory search, word under a trigram": "LIKE '%...%' on the name; inventory_fts can't look up 1-2 letters",
+    "inventory catalog": "lists every item",
+    "customer search": "LIKE '%...%' on the name, on every keystroke",
+    "transaction log": "the Logs screen lists the whole log, newest first",
+    "terminals with an open cart": "runs once at startup; each terminal's journal is trimmed at every sale",
+}
+
+
+def table_aliases(sql: str) -> Dict[str, str]:
+    """Map each name a query uses for a table (the table itself or its alias) to the table."""
+    aliases = {}
+    for table, alias in re.findall(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", sql, re.IGNORECASE):
+        aliases[table] = table
+        if alias and alias.upper() not in ("WHERE", "JOIN", "LEFT", "INNER", "ON", "GROUP", "ORDER", "LIMIT"):
+            aliases[alias] = table
+    return aliases
+
+
+def full_scans(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> List[str]:
+    """Large tables the plan for sql reads end to end without an index."""
+    aliases = table_aliases(sql)
+    scanned = []
+    # Walking a whole index in order still reads every row unless a LIMIT stops it early
+    pattern = r"SCAN (\w+)" if re.search(r"\bLIMIT\b", sql, re.IGNORECASE) else r"SCAN (\w+)( USING .*INDEX .*)?"
+    for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+        match = re.fullmatch(pattern, row[-1])
+        if match and aliases.get(match.group(1)) in LARGE_TABLES:
+            scanned.append(aliases[match.group(1)])
+    return scanned
+
+
+def verify_query_plans(conn: sqlite3.Connection) -> List[Tuple[str, List[str]]]:
+    """(label, scanned tables) for every registered query that full-scans, accepted or not."""
+    scans = []
+    for label, sql, params in QUERIES:
+        scanned = full_scans(conn, sql, params)
+        if scanned:
+            scans.append((label, scanned))
+    return scans
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Flag application queries that full-scan a large table.")
+    parser.add_argument("db", nargs="?", default=":memory:",
+                        help="database to check, opened read-only (default: a fresh schema)")
+    args = parser.parse_args()
+
+    if args.db == ":memory:":
+        conn = sqlite3.connect(args.db)
+        migrate(conn)
+    else:
+        try:
+            conn = sqlite3.connect(Path(args.db).resolve().as_uri() + "?mode=ro", uri=True)
+            version = schema_version(conn)
+        except sqlite3.Error as e:
+            print(f"Cannot open {args.db} read-only: {e}")
+            sys.exit(2)
+        if version < SCHEMA_VERSION:
+            conn.close()
+            print(f"{args.db} is at schema version {version}, the application expects {SCHEMA_VERSION}; "
+                  f"start the application once to migrate it, then check again")
+            sys.exit(2)
+    scans = verify_query_plans(conn)
+    conn.close()
+
+    failures = [(label, scanned) for label, scanned in scans if label not in ACCEPTED_SCANS]
+    for label, scanned in scans:
+        if label in ACCEPTED_SCANS:
+            print(f"SCAN  {label}: {', '.join(scanned)} (accepted: {ACCEPTED_SCANS[label]})")
+    for label, scanned in failures:
+        print(f"SCAN  {label}: {', '.join(scanned)}")
+    scanned_labels = {label for label, _ in scans}
+    indexed = sum(1 for label, _, _ in QUERIES if label not in scanned_labels and label not in ACCEPTED_SCANS)
+    print(f"{indexed}/{len(QUERIES)} queries use an index, {len(ACCEPTED_SCANS)} accepted scans, "
+          f"{len(failures)} unexpected scans")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
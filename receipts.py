@@ -0,0 +1,261 @@
+import os
+import sqlite3
+from functools import lru_cache
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from pdf_stream import PdfStreamWriter
+from transaction_items import load_transaction_items
+
+RECEIPT_TITLE = "Shinano Pharmacy Receipt"
+
+# Characters per line in the printer's default font
+PAPER_COLUMNS = {58: 32, 80: 48}
+
+ESC_INIT = b"\x1b@"
+ESC_ALIGN_LEFT = b"\x1ba\x00"
+ESC_ALIGN_CENTER = b"\x1ba\x01"
+ESC_BOLD_ON = b"\x1bE\x01"
+ESC_BOLD_OFF = b"\x1bE\x00"
+GS_FEED_AND_CUT = b"\x1dV\x42\x03"  # Feed 3 lines, then partial cut
+
+
+class ReceiptItem(NamedTuple):
+    name: str
+    qty: int
+    price: float
+    subtotal: float
+
+
+class Receipt(NamedTuple):
+    """Everything printed on a receipt; both renderers lay out this and nothing else."""
+    transaction_id: str
+    timestamp: str
+    items: List[ReceiptItem]
+    total_amount: float
+    cash_paid: float
+    change: float
+    payment_method: str = "Cash"
+    customer_name: str = "N/A"
+
+    def totals(self) -> List[Tuple[str, float]]:
+        return [("Total", self.total_amount), ("Cash Paid", self.cash_paid), ("Change", self.change)]
+
+
+def load_receipt(conn: sqlite3.Connection, transaction_id: str, timestamp: str,
+                 total_amount: float, cash_paid: float, change: float) -> Receipt:
+    """Receipt for a sale from its stored lines. Only reads, so worker threads may call it."""
+    items = [
+        ReceiptItem(name or item_id, qty, price or 0.0, (price or 0.0) * qty - (discount or 0.0))
+        for item_id, name, qty, _, price, discount in load_transaction_items(conn, transaction_id)
+    ]
+    return Receipt(transaction_id, timestamp, items, total_amount, cash_paid, change)
+
+
+_RECEIPT_SQL = """
+    SELECT t.transaction_id, t.timestamp, t.total_amount, t.cash_paid, t.change_amount,
+           t.payment_method, COALESCE(c.name, 'N/A'),
+           ti.item_id, ti.name, ti.qty, ti.retail_price, ti.discount
+    FROM transactions t
+    LEFT JOIN customers c ON c.customer_id = t.customer_id
+    LEFT JOIN transaction_items ti ON ti.transaction_id = t.transaction_id
+"""
+
+
+def _group_receipts(rows: Iterable[tuple]) -> Iterator[Receipt]:
+    """Fold rows of _RECEIPT_SQL, ordered by transaction, into receipts as they arrive."""
+    receipt = None
+    for (transaction_id, timestamp, total_amount, cash_paid, change, payment_method, customer_name,
+         item_id, name, qty, price, discount) in rows:
+        if receipt is None or receipt.transaction_id != transaction_id:
+            if receipt is not None:
+                yield receipt
+            receipt = Receipt(transaction_id, timestamp, [], total_amount or 0.0, cash_paid or 0.0, change or 0.0,
+                              payment_method or "Cash", customer_name)
+        if item_id is not None:
+            price = price or 0.0
+            receipt.items.append(ReceiptItem(name or item_id, qty, price, price * qty - (discount or 0.0)))
+    if receipt is not None:
+        yield receipt
+
+
+def load_receipt_by_id(conn: sqlite3.Connection, transaction_id: str) -> Optional[Receipt]:
+    """Receipt for a stored sale from its ID alone (one query), or None if there is no such sale."""
+    rows = conn.execute(_RECEIPT_SQL + " WHERE t.transaction_id = ? ORDER BY ti.item_id", (transaction_id,))
+    return next(_group_receipts(rows), None)
+
+
+@lru_cache(maxsize=None)
+def reprint_table_style():
+    """TableStyle of the reprinted receipt's item table, built once per process."""
+    from reportlab.platypus import TableStyle
+
+    return TableStyle([
+        ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', 12),
+        ('FONT', (0, -1), (-1, -1), 'Helvetica-Bold', 12),
+        ('FONT', (0, 1), (-1, -2), 'Helvetica', 12),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('PADDING', (0, 0), (-1, -1), 6),
+    ])
+
+
+def receipt_printer() -> Optional[str]:
+    """Device or file the thermal printer is reached through (SHINANO_RECEIPT_PRINTER), if set."""
+    return os.getenv("SHINANO_RECEIPT_PRINTER") or None
+
+
+def receipt_paper_mm() -> int:
+    try:
+        paper_mm = int(os.getenv("SHINANO_RECEIPT_PAPER", "80"))
+    except ValueError:
+        return 80
+    return paper_mm if paper_mm in PAPER_COLUMNS else 80
+
+
+def pdf_archive_enabled() -> bool:
+    """PDF copies are opt-in (SHINANO_RECEIPT_PDF=1); the thermal receipt is the default."""
+    return os.getenv("SHINANO_RECEIPT_PDF", "").lower() in ("1", "true", "yes")
+
+
+def render_escpos(receipt: Receipt, paper_mm: int = 80) -> bytes:
+    """ESC/POS byte stream for a 58 or 80 mm thermal printer."""
+    width = PAPER_COLUMNS.get(paper_mm, PAPER_COLUMNS[80])
+
+    def text(line: str) -> bytes:
+        # Code page 437 has no peso sign; anything else it can't encode prints as "?"
+        return line.replace("₱", "P").encode("cp437", errors="replace") + b"\n"
+
+    def columns(left: str, right: str) -> str:
+        return left[:max(0, width - len(right) - 1)].ljust(width - len(right)) + right
+
+    out = [ESC_INIT, ESC_ALIGN_CENTER, ESC_BOLD_ON, text(RECEIPT_TITLE[:width]), ESC_BOLD_OFF]
+    out.append(text(receipt.transaction_id))
+    out.append(text(receipt.timestamp))
+    out.append(ESC_ALIGN_LEFT)
+    out.append(text("-" * width))
+    for item in receipt.items:
+        out.append(text(item.name[:width]))
+        out.append(text(columns(f"  {item.qty} x {item.price:.2f}", f"{item.subtotal:.2f}")))
+    out.append(text("-" * width))
+    for label, amount in receipt.totals():
+        if label == "Total":
+            out.extend([ESC_BOLD_ON, text(columns(label.upper(), f"P{amount:.2f}")), ESC_BOLD_OFF])
+        else:
+            out.append(text(columns(label.upper(), f"P{amount:.2f}")))
+    out.append(GS_FEED_AND_CUT)
+    return b"".join(out)
+
+
+def write_escpos(receipt: Receipt, target: str, paper_mm: int = 80) -> str:
+    """Send the receipt to target and return where it went.
+
+    target is a printer device (/dev/usb/lp0, a shared printer path, or
+    any file), or a directory, which acts as a local sink that keeps one
+    receipt_<id>.bin per sale. Only an explicitly configured directory is
+    used that way; with no printer set nothing is written.
+    """
+    if os.path.isdir(target):
+        target = os.path.join(target, f"receipt_{receipt.transaction_id}.bin")
+    with open(target, "wb") as device:
+        device.write(render_escpos(receipt, paper_mm))
+    return target
+
+
+# Drawn on every receipt page; the reportlab renderer and the streamed export share this layout
+_PDF_HEADER_LINES = [
+    (100, 750, RECEIPT_TITLE),
+    (100, 690, "-" * 50),
+    (100, 670, "Item | Quantity | Price | Subtotal"),
+]
+
+
+def _receipt_pages(receipt: Receipt) -> Iterator[List[Tuple[float, float, str]]]:
+    """Body lines (x, y, text) of each PDF page of receipt, continuing onto more pages if it is long."""
+    page = [(100, 730, f"Transaction ID: {receipt.transaction_id}"), (100, 710, f"Date: {receipt.timestamp}")]
+    y = 650
+    for item in receipt.items:
+        if y < 72:
+            yield page
+            page = [(100, 730, f"Transaction ID: {receipt.transaction_id} (continued)")]
+            y = 650
+        page.append((100, y, f"{item.name} | {item.qty} | ₱{item.price:.2f} | ₱{item.subtotal:.2f}"))
+        y -= 20
+
+    if y < 72 + 20 * (len(receipt.totals()) + 1):
+        yield page
+        page = []
+        y = 650
+    page.append((100, y - 20, "-" * 50))
+    y -= 40
+    for label, amount in receipt.totals():
+        page.append((100, y, f"{label}: ₱{amount:.2f}"))
+        y -= 20
+    yield page
+
+
+def _define_pdf_template(c) -> None:
+    """Register the static parts of a receipt page once so every page reuses them."""
+    c.beginForm("receipt_header")
+    c.setFont("Helvetica", 12)
+    for x, y, text in _PDF_HEADER_LINES:
+        c.drawString(x, y, text)
+    c.endForm()
+
+
+def _draw_receipt_pdf(c, receipt: Receipt) -> None:
+    """Draw receipt from the top of a fresh page, continuing onto more pages if it is long."""
+    for page in _receipt_pages(receipt):
+        c.doForm("receipt_header")
+        c.setFont("Helvetica", 12)
+        for x, y, text in page:
+            c.drawString(x, y, text)
+        c.showPage()
+
+
+def write_receipt_pdf(receipt: Receipt, receipt_dir: str) -> str:
+    """Archive the receipt as a PDF in receipt_dir and return the file path."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    os.makedirs(receipt_dir, exist_ok=True)
+    receipt_path = os.path.join(receipt_dir, f"receipt_{receipt.transaction_id}.pdf")
+
+    c = canvas.Canvas(receipt_path, pagesize=letter)
+    _define_pdf_template(c)
+    _draw_receipt_pdf(c, receipt)
+    c.save()
+    return receipt_path
+
+
+def iter_receipts(conn: sqlite3.Connection, start: str, end: str) -> Iterator[Receipt]:
+    """Completed sales with start <= timestamp < end, oldest first, built one at a time.
+
+    Rows are pulled from a single ordered join as they are needed, so the
+    query side holds only the receipt being yielded.
+    """
+    rows = conn.execute(_RECEIPT_SQL + """
+        WHERE t.status = 'Completed' AND t.timestamp >= ? AND t.timestamp < ?
+        ORDER BY t.timestamp, t.transaction_id, ti.item_id
+    """, (start, end))
+    return _group_receipts(rows)
+
+
+def export_receipts_pdf(conn: sqlite3.Connection, pdf_path: str, start: str, end: str) -> int:
+    """Write every completed sale with start <= timestamp < end into one PDF; returns the receipt count.
+
+    Receipts come from iter_receipts and each page goes to disk through
+    PdfStreamWriter as soon as it is laid out. No page content is kept in
+    memory, only each page's object offsets for the cross-reference table,
+    about 24 bytes per page. The header is one shared form, and the
+    built-in Helvetica means nothing is embedded per receipt.
+    """
+    count = 0
+    with PdfStreamWriter(pdf_path) as pdf:
+        pdf.define_form(_PDF_HEADER_LINES)
+        for receipt in iter_receipts(conn, start, end):
+            for page in _receipt_pages(receipt):
+                pdf.add_page(page)
+            count += 1
+        if count == 0:
+            pdf.add_page([(100, 730, f"No completed sales between {start} and {end}")])
+    return count
@@ -0,0 +1,231 @@
+"""Database schema shared by every entry point.
+
+Each step in MIGRATIONS brings the database from one PRAGMA user_version
+to the next. When the database is already current, migrate() costs a
+pragma read plus the inventory_fts check. Steps only use IF NOT EXISTS and
+column checks, so a step that was interrupted, or raced by another
+terminal starting at the same moment, can safely run again.
+
+inventory_fts depends on the SQLite build rather than on the schema
+version, so it is re-checked on every start until it exists: a database
+first opened without FTS5 gets the table once SQLite is upgraded.
+"""
+import sqlite3
+from typing import Callable, List
+
+from cart_journal import ensure_cart_journal
+from inventory_search import ensure_inventory_fts, fts_available
+from post_checkout import ensure_outbox
+from sequences import ensure_sequences
+from stock_cache import ensure_inventory_changes
+from transaction_items import ensure_transaction_items
+from transaction_pages import ensure_transaction_page_index
+
+_BASE_TABLES_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        password TEXT,
+        role TEXT,
+        status TEXT DEFAULT 'Online'
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS inventory (
+        item_id TEXT PRIMARY KEY,
+        name TEXT,
+        type TEXT,
+        retail_price REAL DEFAULT 0.0,
+        unit_price REAL DEFAULT 0.0,
+        quantity INTEGER DEFAULT 0,
+        supplier TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS transactions (
+        transaction_id TEXT PRIMARY KEY,
+        items TEXT,
+        total_amount REAL DEFAULT 0.0,
+        cash_paid REAL DEFAULT 0.0,
+        change_amount REAL DEFAULT 0.0,
+        timestamp TEXT,
+        status TEXT,
+        payment_method TEXT,
+        customer_id TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS funds (
+        fund_id TEXT PRIMARY KEY,
+        type TEXT,
+        amount REAL DEFAULT 0.0,
+        timestamp TEXT,
+        user TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS customers (
+        customer_id TEXT PRIMARY KEY,
+        name TEXT,
+        contact TEXT,
+        address TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS likes (
+        like_id TEXT PRIMARY KEY,
+        transaction_id TEXT,
+        customer_id TEXT,
+        timestamp TEXT,
+        user TEXT,
+        FOREIGN KEY (transaction_id) REFERENCES transactions(transaction_id),
+        FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS transaction_log (
+        log_id TEXT PRIMARY KEY,
+        action TEXT,
+        details TEXT,
+        timestamp TEXT,
+        user TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS daily_sales (
+        sale_date TEXT PRIMARY KEY,
+        total_sales REAL DEFAULT 0.0,
+        unit_sales INTEGER DEFAULT 0,
+        net_profit REAL DEFAULT 0.0,
+        user TEXT
+    )
+    """,
+)
+
+DEFAULT_USERS = [
+    ("yamato", "ycb-0001", "Drug Lord", "Online"),
+    ("kongo", "kcb-0001", "User", "Online"),
+]
+
+# Items at or below this quantity are low on stock. The partial index below
+# repeats it literally, so changing it needs a migration that rebuilds the index.
+LOW_STOCK_THRESHOLD = 10
+LOW_STOCK_SQL = f"SELECT item_id, name, quantity FROM inventory WHERE quantity <= {LOW_STOCK_THRESHOLD}"
+
+TRANSACTION_LOG_SQL = "SELECT action, details, timestamp, user FROM transaction_log ORDER BY timestamp DESC"
+
+SAMPLE_ITEMS = [
+    ("MED001", "Pain Reliever", "Medicine", 10.00, 8.00, 100, "PharmaCorp"),
+    ("SUP001", "Vitamin C", "Supplement", 5.00, 4.00, 200, "HealthSupplies Inc"),
+    ("DEV001", "Thermometer", "Medical Device", 15.00, 12.00, 50, "MediTech Ltd"),
+]
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [col[1] for col in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _base_schema(conn: sqlite3.Connection) -> None:
+    """The tables create_database used to build, including its old column upgrades."""
+    with conn:
+        for sql in _BASE_TABLES_SQL:
+            conn.execute(sql)
+
+        columns = _columns(conn, "inventory")
+        if 'retail_price' not in columns and 'price' in columns:
+            conn.execute("ALTER TABLE inventory RENAME COLUMN price TO retail_price")
+        if 'unit_price' not in columns:
+            conn.execute("ALTER TABLE inventory ADD COLUMN unit_price REAL DEFAULT 0.0")
+        if 'supplier' not in columns:
+            conn.execute("ALTER TABLE inventory ADD COLUMN supplier TEXT")
+
+        columns = _columns(conn, "transactions")
+        if 'payment_method' not in columns:
+            conn.execute("ALTER TABLE transactions ADD COLUMN payment_method TEXT")
+        if 'customer_id' not in columns:
+            conn.execute("ALTER TABLE transactions ADD COLUMN customer_id TEXT")
+
+        conn.executemany("INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?)", DEFAULT_USERS)
+        conn.executemany("""
+            INSERT OR IGNORE INTO inventory
+            (item_id, name, type, retail_price, unit_price, quantity, supplier)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, SAMPLE_ITEMS)
+
+
+def _index_pack(conn: sqlite3.Connection) -> None:
+    """Secondary indexes for the predicates the screens and reports filter on."""
+    with conn:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_inventory_name ON inventory(name)")
+        conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_inventory_low_stock ON inventory(quantity)
+            WHERE quantity <= {LOW_STOCK_THRESHOLD}
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_status_timestamp ON transactions(status, timestamp)")
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_transactions_held ON transactions(timestamp)
+            WHERE status = 'Held'
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_transaction_log_timestamp ON transaction_log(timestamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_customers_name ON customers(name)")
+
+
+def _search_indexes(conn: sqlite3.Connection) -> None:
+    """Indexes behind the transaction search filters that have no index yet."""
+    with conn:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_payment_timestamp ON transactions(payment_method, timestamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_customer_timestamp ON transactions(customer_id, timestamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_total ON transactions(total_amount)")
+
+
+def _daily_sales_cost(conn: sqlite3.Connection) -> None:
+    """Store cost of goods per sale date, backfilled from the sold lines of completed sales."""
+    with conn:
+        if 'unit_cost' in _columns(conn, "daily_sales"):
+            return
+        conn.execute("ALTER TABLE daily_sales ADD COLUMN unit_cost REAL DEFAULT 0.0")
+        conn.execute("""
+            UPDATE daily_sales SET unit_cost = COALESCE((
+                SELECT SUM(ti.qty * ti.unit_price)
+                FROM transactions t
+                JOIN transaction_items ti ON ti.transaction_id = t.transaction_id
+                WHERE t.status = 'Completed'
+                  AND t.timestamp >= daily_sales.sale_date AND t.timestamp < date(daily_sales.sale_date, '+1 day')
+            ), 0.0)
+        """)
+
+
+# Append only: position N brings a database from user_version N to N + 1
+MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _base_schema,
+    ensure_sequences,
+    ensure_outbox,
+    ensure_cart_journal,
+    ensure_transaction_items,
+    ensure_inventory_fts,
+    ensure_transaction_page_index,
+    _index_pack,
+    _search_indexes,
+    _daily_sales_cost,
+    ensure_inventory_fts,  # again: rebuilds inventory_fts with the trigram tokenizer
+    ensure_inventory_changes,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Run whatever migrations the database has not seen yet; returns the resulting version."""
+    current = schema_version(conn)
+    for version in range(current, SCHEMA_VERSION):
+        MIGRATIONS[version](conn)
+        # PRAGMA cannot take a bound parameter; version is always an int
+        conn.execute(f"PRAGMA user_version = {version + 1}")
+        conn.commit()
+    if not fts_available(conn):
+        ensure_inventory_fts(conn)
+    return max(current, SCHEMA_VERSION)
@@ -0,0 +1,196 @@
+import queue
+import sqlite3
+import threading
+import tkinter as tk
+from tkinter import messagebox
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class SearchPipeline:
+    """Debounced, cancellable search runner for KeyRelease-driven widgets.
+
+    Keystrokes for the same key ("inventory", "transactions", ...) are
+    coalesced over delay_ms; only the newest request per key is executed
+    and only its result is applied. Database queries run on a single
+    worker thread with its own connection, so a stale query still running
+    when a newer one arrives is interrupted instead of blocking the UI.
+    A current request that fails calls its error_fn, or shows an error
+    dialog when it has none.
+    """
+
+    POLL_MS = 10
+
+    def __init__(self, root: tk.Misc, db_path: Optional[str] = None, delay_ms: int = 150):
+        self.root = root
+        self.db_path = db_path
+        self.delay_ms = delay_ms
+        self._generation: Dict[str, int] = {}
+        self._pending: Dict[str, Tuple[str, Callable[[], None]]] = {}  # key -> (after id, callback)
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._results: "queue.Queue" = queue.Queue()
+        self._outstanding = 0
+        self._polling = False
+        self._running_key: Optional[str] = None
+        self._worker: Optional[threading.Thread] = None
+        self._worker_conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def debounce(self, key: str, callback: Callable[[], None], delay_ms: Optional[int] = None) -> None:
+        """Run callback on the Tk thread once keystrokes for key pause for delay_ms."""
+        generation = self._next_generation(key)
+        self._schedule(key, delay_ms, lambda: self._run_inline(key, generation, callback))
+
+    def submit(self, key: str, query_fn: Callable[[sqlite3.Connection], Any],
+               apply_fn: Callable[[Any], None], delay_ms: Optional[int] = None,
+               error_fn: Optional[Callable[[Exception], None]] = None) -> None:
+        """Debounce, then run query_fn(conn) off the Tk thread and apply_fn(result) on it.
+
+        query_fn must not touch Tk widgets; read any widget values before submitting.
+        If it raises, error_fn(error) runs on the Tk thread instead of apply_fn.
+        """
+        generation = self._next_generation(key)
+        self._schedule(key, delay_ms, lambda: self._dispatch(key, generation, query_fn, apply_fn, error_fn))
+
+    def run(self, key: str, query_fn: Callable[[sqlite3.Connection], Any], apply_fn: Callable[[Any], None],
+            conn: sqlite3.Connection, debounce: bool = True,
+            error_fn: Optional[Callable[[Exception], None]] = None) -> None:
+        """Submit when debounce is set; otherwise drop pending work for key and refresh now on conn."""
+        if debounce:
+            self.submit(key, query_fn, apply_fn, error_fn=error_fn)
+        else:
+            self.cancel(key)
+            self._run_now(key, conn, query_fn, apply_fn, error_fn)
+
+    def flush(self, key: str) -> None:
+        """Start a debounced request for key now instead of waiting out the window."""
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            after_id, callback = pending
+            self.root.after_cancel(after_id)
+            callback()
+
+    def cancel(self, key: str) -> None:
+        """Drop any pending or running request for key."""
+        self._next_generation(key)
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            self.root.after_cancel(pending[0])
+
+    def cancel_all(self) -> None:
+        for key in list(self._generation):
+            self.cancel(key)
+
+    def is_current(self, key: str, generation: int) -> bool:
+        return self._generation.get(key) == generation
+
+    def shutdown(self) -> None:
+        self.cancel_all()
+        if self._worker is not None:
+            self._jobs.put(None)
+            self._worker = None
+
+    def _next_generation(self, key: str) -> int:
+        with self._lock:
+            generation = self._generation.get(key, 0) + 1
+            self._generation[key] = generation
+            if self._running_key == key and self._worker_conn is not None:
+                self._worker_conn.interrupt()
+        return generation
+
+    def _schedule(self, key: str, delay_ms: Optional[int], callback: Callable[[], None]) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            self.root.after_cancel(pending[0])
+        delay = self.delay_ms if delay_ms is None else delay_ms
+        self._pending[key] = (self.root.after(delay, callback), callback)
+
+    def _run_inline(self, key: str, generation: int, callback: Callable[[], None]) -> None:
+        self._pending.pop(key, None)
+        if self.is_current(key, generation):
+            callback()
+
+    def _run_now(self, key: str, conn: Optional[sqlite3.Connection], query_fn: Callable, apply_fn: Callable,
+                 error_fn: Optional[Callable]) -> None:
+        try:
+            result = query_fn(conn)
+        except Exception as e:
+            self._report_error(key, e, error_fn)
+            return
+        apply_fn(result)
+
+    def _report_error(self, key: str, error: Exception, error_fn: Optional[Callable]) -> None:
+        print(f"Search '{key}' failed: {error}")
+        if error_fn is not None:
+            error_fn(error)
+        else:
+            messagebox.showerror("Database Error", f"Failed to load results: {error}", parent=self.root)
+
+    def _dispatch(self, key: str, generation: int, query_fn: Callable, apply_fn: Callable,
+                  error_fn: Optional[Callable]) -> None:
+        self._pending.pop(key, None)
+        if not self.is_current(key, generation):
+            return
+        if self.db_path is None:
+            self._run_now(key, None, query_fn, apply_fn, error_fn)
+            return
+        self._ensure_worker()
+        self._outstanding += 1
+        self._jobs.put((key, generation, query_fn, apply_fn, error_fn))
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.POLL_MS, self._poll)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._work, name="search-pipeline", daemon=True)
+            self._worker.start()
+
+    def _work(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        self._worker_conn = conn
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+                key, generation, query_fn, apply_fn, error_fn = job
+                with self._lock:
+                    if not self.is_current(key, generation):
+                        self._results.put(None)
+                        continue
+                    self._running_key = key
+                try:
+                    result = query_fn(conn)
+                    error = None
+                except Exception as e:
+                    # Includes the OperationalError interrupt() raises; _poll tells them apart
+                    result, error = None, e
+                finally:
+                    with self._lock:
+                        self._running_key = None
+                self._results.put((key, generation, apply_fn, error_fn, result, error))
+        finally:
+            self._worker_conn = None
+            conn.close()
+
+    def _poll(self) -> None:
+        while True:
+            try:
+                item = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if item is None:
+                continue
+            key, generation, apply_fn, error_fn, result, error = item
+            # A request superseded while running was interrupted on purpose; drop it quietly
+            if not self.is_current(key, generation):
+                continue
+            if error is not None:
+                self._report_error(key, error, error_fn)
+                continue
+            apply_fn(result)
+        if self._outstanding > 0:
+            self.root.after(self.POLL_MS, self._poll)
+        else:
+            self._polling = False
@@ -0,0 +1,65 @@
+import sqlite3
+from datetime import datetime
+from typing import Optional
+
+from cart_journal import terminal_id
+
+
+def ensure_sequences(conn: sqlite3.Connection) -> None:
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sequences (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS terminals (
+                terminal TEXT PRIMARY KEY,
+                code INTEGER NOT NULL UNIQUE
+            )
+        """)
+
+
+def next_value(conn: sqlite3.Connection, name: str) -> int:
+    """Atomically increment sequence name and return the new value (the first is 1).
+
+    The upsert takes SQLite's write lock, so two connections can never be
+    handed the same value, and it touches a single row however many IDs
+    have been issued.
+    """
+    with conn:
+        return conn.execute("""
+            INSERT INTO sequences (name, value) VALUES (?, 1)
+            ON CONFLICT(name) DO UPDATE SET value = value + 1
+            RETURNING value
+        """, (name,)).fetchone()[0]
+
+
+def terminal_code(conn: sqlite3.Connection, terminal: Optional[str] = None) -> int:
+    """Short number for terminal, assigned the first time it asks for one."""
+    terminal = terminal or terminal_id()
+    row = conn.execute("SELECT code FROM terminals WHERE terminal = ?", (terminal,)).fetchone()
+    if row:
+        return row[0]
+    code = next_value(conn, "terminal")
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO terminals (terminal, code) VALUES (?, ?)", (terminal, code))
+    # Another connection may have registered this terminal first; its code wins
+    return conn.execute("SELECT code FROM terminals WHERE terminal = ?", (terminal,)).fetchone()[0]
+
+
+def next_transaction_id(conn: sqlite3.Connection, terminal: Optional[str] = None) -> str:
+    """MM-YYYY-T<terminal>-NNNNNN, numbered per terminal and month."""
+    month_year = datetime.now().strftime("%m-%Y")
+    code = terminal_code(conn, terminal)
+    seq = next_value(conn, f"transaction:{code}:{month_year}")
+    return f"{month_year}-T{code}-{seq:06d}"
+
+
+def next_customer_id(conn: sqlite3.Connection, terminal: Optional[str] = None) -> str:
+    """MM-YYYY-T<terminal>-CNNNNN, numbered per terminal and month."""
+    month_year = datetime.now().strftime("%m-%Y")
+    code = terminal_code(conn, terminal)
+    seq = next_value(conn, f"customer:{code}:{month_year}")
+    return f"{month_year}-T{code}-C{seq:05d}"
@@ -0,0 +1,110 @@
+import sqlite3
+from typing import Dict, Optional
+
+from inventory_index import InventoryIndex
+
+# Every insert, update or delete on inventory takes the next value of this
+# sequence and stamps it on the row (or on a tombstone for deletes), so a
+# reader can ask for exactly the rows that changed since the value it last saw.
+CHANGE_SEQUENCE = "inventory_change"
+
+_CHANGE_TRIGGERS_SQL = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS inventory_change_ai AFTER INSERT ON inventory BEGIN
+        UPDATE sequences SET value = value + 1 WHERE name = '{CHANGE_SEQUENCE}';
+        UPDATE inventory SET change_seq = (SELECT value FROM sequences WHERE name = '{CHANGE_SEQUENCE}')
+        WHERE rowid = new.rowid;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS inventory_change_au
+    AFTER UPDATE OF item_id, name, type, retail_price, unit_price, quantity, supplier ON inventory BEGIN
+        UPDATE sequences SET value = value + 1 WHERE name = '{CHANGE_SEQUENCE}';
+        UPDATE inventory SET change_seq = (SELECT value FROM sequences WHERE name = '{CHANGE_SEQUENCE}')
+        WHERE rowid = new.rowid;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS inventory_change_ad AFTER DELETE ON inventory BEGIN
+        UPDATE sequences SET value = value + 1 WHERE name = '{CHANGE_SEQUENCE}';
+        INSERT INTO inventory_deletions (change_seq, item_id)
+        VALUES ((SELECT value FROM sequences WHERE name = '{CHANGE_SEQUENCE}'), old.item_id);
+    END
+    """,
+)
+
+
+def ensure_inventory_changes(conn: sqlite3.Connection) -> None:
+    """Add inventory.change_seq, the deletion tombstones and the triggers that stamp them."""
+    with conn:
+        columns = [col[1] for col in conn.execute("PRAGMA table_info(inventory)")]
+        if 'change_seq' not in columns:
+            conn.execute("ALTER TABLE inventory ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_inventory_change_seq ON inventory(change_seq)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS inventory_deletions (
+                change_seq INTEGER PRIMARY KEY,
+                item_id TEXT
+            )
+        """)
+        conn.execute("INSERT OR IGNORE INTO sequences (name, value) VALUES (?, 0)", (CHANGE_SEQUENCE,))
+        for sql in _CHANGE_TRIGGERS_SQL:
+            conn.execute(sql)
+
+
+class StockCache:
+    """Session stock, names and prices served from InventoryIndex without touching disk.
+
+    This connection's own writes already keep the index current, so the
+    only way the snapshot goes stale is another connection (BackOffice, a
+    second terminal) committing. SQLite's PRAGMA data_version changes exactly
+    then, so it is checked before each read. When it has moved, the
+    inventory change sequence says whether inventory itself changed, and
+    only the rows stamped since the last look are re-read in full.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, index: InventoryIndex):
+        self.conn = conn
+        self.index = index
+        self.data_version = self._current_version()
+        self.change_seq = self._current_change_seq()
+
+    def _current_version(self) -> int:
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _current_change_seq(self) -> int:
+        row = self.conn.execute("SELECT value FROM sequences WHERE name = ?", (CHANGE_SEQUENCE,)).fetchone()
+        return row[0] if row else 0
+
+    def refresh_if_stale(self) -> bool:
+        """Re-read items another connection has changed; returns True if any were."""
+        version = self._current_version()
+        if version == self.data_version:
+            return False
+        self.data_version = version
+        change_seq = self._current_change_seq()
+        if change_seq == self.change_seq:
+            # The commit was to some other table (outbox, logs, journal)
+            return False
+        changed = [row[0] for row in self.conn.execute("""
+            SELECT item_id FROM inventory WHERE change_seq > ?
+            UNION
+            SELECT item_id FROM inventory_deletions WHERE change_seq > ?
+        """, (self.change_seq, self.change_seq))]
+        self.change_seq = change_seq
+        # Whole rows: a price or name edited elsewhere must reach the cart too
+        self.index.reload_items(self.conn, changed)
+        return bool(changed)
+
+    def available(self, item_id: str) -> Optional[int]:
+        """Units in stock for item_id, or None if the item does not exist."""
+        self.refresh_if_stale()
+        item = self.index.get(item_id)
+        return item.quantity if item is not None else None
+
+    def update_quantities(self, quantities: Dict[str, int]) -> None:
+        """Record stock levels this connection just wrote (e.g. the remainder after a sale)."""
+        for item_id, quantity in quantities.items():
+            item = self.index.get(item_id)
+            if item is not None:
+                item.quantity = int(quantity)
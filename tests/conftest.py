@@ -0,0 +1,15 @@
+import sqlite3
+
+import pytest
+
+from schema import migrate
+
+
+@pytest.fixture
+def conn():
+    """A fresh, fully migrated in-memory database with the sample inventory."""
+    conn = sqlite3.connect(":memory:")
+    migrate(conn)
+    yield conn
+    conn.close()
+
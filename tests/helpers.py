@@ -0,0 +1,76 @@
+import re
+import sqlite3
+import zlib
+
+from pdf_stream import PAGE_HEIGHT, PAGE_WIDTH
+
+
+def stock(conn: sqlite3.Connection, item_id: str) -> int:
+    return conn.execute("SELECT quantity FROM inventory WHERE item_id = ?", (item_id,)).fetchone()[0]
+
+
+def daily_sales(conn: sqlite3.Connection, sale_date: str):
+    return conn.execute(
+        "SELECT total_sales, unit_sales, net_profit, unit_cost FROM daily_sales WHERE sale_date = ?", (sale_date,)
+    ).fetchone()
+
+
+class ParsedPdf:
+    """Just enough of a PDF reader to check PdfStreamWriter's structure: xref, trailer, objects, streams."""
+
+    def __init__(self, data: bytes):
+        assert data.startswith(b"%PDF-1.4\n")
+        assert data.endswith(b"%%EOF\n")
+        self.data = data
+        xref = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", data).group(1))
+        assert data[xref:].startswith(b"xref\n")
+        header, rest = data[xref + 5:].split(b"\n", 1)
+        first, count = map(int, header.split())
+        assert first == 0
+        entries = rest[:20 * count]
+        assert len(entries) == 20 * count  # fixed-width "nnnnnnnnnn ggggg n \n" lines
+        assert entries[:20] == b"0000000000 65535 f \n"
+        self.offsets = {}
+        for number in range(1, count):
+            entry = entries[20 * number:20 * number + 20]
+            assert entry.endswith(b" 00000 n \n"), entry
+            self.offsets[number] = int(entry[:10])
+        trailer = rest[20 * count:]
+        assert trailer.startswith(b"trailer\n")
+        assert int(re.search(rb"/Size (\d+)", trailer).group(1)) == count
+        self.root = int(re.search(rb"/Root (\d+) 0 R", trailer).group(1))
+
+    def object(self, number: int) -> bytes:
+        start = self.offsets[number]
+        head = b"%d 0 obj\n" % number
+        assert self.data[start:].startswith(head), number
+        end = self.data.index(b"\nendobj\n", start)
+        return self.data[start + len(head):end]
+
+    def dictionary(self, number: int) -> bytes:
+        body = self.object(number)
+        return body.split(b"\nstream\n", 1)[0]
+
+    def ref(self, number: int, key: bytes) -> int:
+        return int(re.search(rb"/" + key + rb" (\d+) 0 R", self.dictionary(number)).group(1))
+
+    def stream(self, number: int) -> bytes:
+        body = self.object(number)
+        dictionary, rest = body.split(b"\nstream\n", 1)
+        length = int(re.search(rb"/Length (\d+)", dictionary).group(1))
+        assert rest[length:] == b"\nendstream"
+        assert b"/Filter /FlateDecode" in dictionary
+        return zlib.decompress(rest[:length])
+
+    def pages(self):
+        pages = self.ref(self.root, b"Pages")
+        tree = self.dictionary(pages)
+        assert b"/Type /Pages" in tree
+        kids = [int(n) for n in re.findall(rb"(\d+) 0 R", tree.split(b"/Kids [", 1)[1])]
+        assert int(re.search(rb"/Count (\d+)", tree).group(1)) == len(kids)
+        for kid in kids:
+            page = self.dictionary(kid)
+            assert b"/Type /Page " in page
+            assert self.ref(kid, b"Parent") == pages
+            assert b"/MediaBox [0 0 %d %d]" % (PAGE_WIDTH, PAGE_HEIGHT) in page
+        return kids
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+from barcode_scanner import BarcodeScanDetector
+
+
+def key(char, time, keysym=None):
+    return SimpleNamespace(char=char, time=time, keysym=keysym or char)
+
+
+def feed(detector, text, start, gap):
+    for i, char in enumerate(text):
+        detector.feed(key(char, start + i * gap))
+    return start + (len(text) - 1) * gap
+
+
+def test_fast_burst_is_a_scan():
+    detector = BarcodeScanDetector()
+    last = feed(detector, "MED001", 1000, 5)
+
+    assert detector.take_scan(key("\r", last + 5, "Return")) == "MED001"
+
+
+def test_typing_is_not_a_scan():
+    detector = BarcodeScanDetector()
+    last = feed(detector, "MED001", 1000, 150)
+
+    assert detector.take_scan(key("\r", last + 150, "Return")) is None
+
+
+def test_pause_before_a_burst_starts_a_new_buffer():
+    detector = BarcodeScanDetector()
+    feed(detector, "ab", 1000, 200)
+    last = feed(detector, "SUP001", 2000, 5)
+
+    assert detector.take_scan(key("\r", last + 5, "Return")) == "SUP001"
+
+
+def test_short_bursts_and_backspace_are_ignored():
+    detector = BarcodeScanDetector()
+    last = feed(detector, "ab", 1000, 5)
+    assert detector.take_scan(key("\r", last + 5, "Return")) is None
+
+    last = feed(detector, "MED001", 2000, 5)
+    detector.feed(key("", last + 5, "BackSpace"))
+    assert detector.take_scan(key("\r", last + 10, "Return")) is None
+
+
+def test_modifier_keys_do_not_break_a_burst():
+    detector = BarcodeScanDetector()
+    detector.feed(key("", 995, "Shift_L"))
+    last = feed(detector, "MED001", 1000, 5)
+
+    assert detector.take_scan(key("\r", last + 5, "Return")) == "MED001"
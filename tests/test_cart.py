@@ -0,0 +1,86 @@
+import pytest
+
+from cart import Cart
+
+
+def totals(cart):
+    return round(cart.gross, 2), round(cart.discount, 2), cart.units
+
+
+def test_add_merges_lines_and_keeps_insertion_order():
+    cart = Cart()
+    cart.add("MED001", "Paracetamol", 5.0, 2)
+    cart.add("SUP001", "Vitamin C", 10.0)
+    cart.add("MED001", "Paracetamol", 5.0, 3)
+
+    assert [line.item_id for line in cart] == ["MED001", "SUP001"]
+    assert cart.get("MED001").quantity == 5
+    assert totals(cart) == (35.0, 0.0, 6)
+    assert cart.items_string() == "MED001:5;SUP001:1"
+
+
+def test_totals_follow_every_mutation():
+    cart = Cart()
+    cart.add("MED001", "Paracetamol", 5.0, 2)
+    cart.add("SUP001", "Vitamin C", 10.0, 1)
+
+    cart.set_discount("SUP001", True)
+    assert totals(cart) == (20.0, 2.0, 3)
+    assert cart.total == pytest.approx(18.0)
+    assert cart.discounted_names() == ["Vitamin C"]
+
+    cart.set_quantity("SUP001", 3)
+    assert totals(cart) == (40.0, 6.0, 5)
+
+    cart.set_price("MED001", 6.0)
+    assert totals(cart) == (42.0, 6.0, 5)
+
+    cart.remove("SUP001")
+    assert totals(cart) == (12.0, 0.0, 2)
+
+
+def test_quantity_zero_removes_the_line():
+    cart = Cart()
+    cart.add("MED001", "Paracetamol", 5.0, 2)
+
+    cart.set_quantity("MED001", 0)
+
+    assert "MED001" not in cart
+    assert len(cart) == 0
+    assert totals(cart) == (0.0, 0.0, 0)
+
+
+def test_emptied_cart_drops_float_error():
+    cart = Cart()
+    for _ in range(10):
+        cart.add("MED001", "Paracetamol", 0.1)
+    cart.add("SUP001", "Vitamin C", 0.2)
+    cart.set_discount("SUP001", True)
+
+    cart.remove("MED001")
+    cart.remove("SUP001")
+
+    assert cart.gross == 0.0
+    assert cart.discount == 0.0
+
+
+def test_on_change_reports_each_mutation():
+    cart = Cart()
+    ops = []
+    cart.on_change = lambda op, item_id, **fields: ops.append((op, item_id, fields))
+
+    cart.add("MED001", "Paracetamol", 5.0, 2)
+    cart.set_quantity("MED001", 3)
+    cart.set_discount("MED001", True)
+    cart.set_price("MED001", 6.0)
+    cart.remove("MED001")
+    cart.clear()
+
+    assert ops == [
+        ("add", "MED001", {"name": "Paracetamol", "retail_price": 5.0, "quantity": 2}),
+        ("quantity", "MED001", {"quantity": 3}),
+        ("discount", "MED001", {"discount_applied": True}),
+        ("price", "MED001", {"retail_price": 6.0}),
+        ("void", "MED001", {}),
+        ("clear", None, {}),
+    ]
@@ -0,0 +1,111 @@
+import pytest
+
+from checkout import CheckoutError, PriceChangedError, commit_sale, restate_daily_sales
+from helpers import daily_sales, stock
+from transaction_items import load_transaction_items
+
+TIMESTAMP = "2026-03-14 10:30:00"
+
+
+def sell(conn, transaction_id, lines, total, **kwargs):
+    return commit_sale(conn, transaction_id, lines, total, total, 0.0, TIMESTAMP, "Cash", None, "kongo", **kwargs)
+
+
+def test_commit_sale_writes_sale_lines_stock_and_daily_totals(conn):
+    # MED001 sells at 10.00 and costs 8.00; SUP001 sells at 5.00 and costs 4.00
+    result = sell(conn, "T1", [("MED001", 2), ("SUP001", 3), ("MED001", 1)], 45.0)
+
+    assert result.unit_sales == 6
+    assert result.net_profit == pytest.approx(3 * 2.0 + 3 * 1.0)
+    assert result.remaining == {"MED001": 97, "SUP001": 197}
+    assert stock(conn, "MED001") == 97
+    assert conn.execute("SELECT items, total_amount, status FROM transactions WHERE transaction_id = 'T1'").fetchone() \
+        == ("MED001:3;SUP001:3", 45.0, "Completed")
+    assert load_transaction_items(conn, "T1") == [
+        ("MED001", "Pain Reliever", 3, 8.0, 10.0, 0.0),
+        ("SUP001", "Vitamin C", 3, 4.0, 5.0, 0.0),
+    ]
+    assert daily_sales(conn, "2026-03-14") == (45.0, 6, pytest.approx(9.0), pytest.approx(36.0))
+
+
+def test_second_sale_adds_to_the_days_totals(conn):
+    sell(conn, "T1", [("MED001", 1)], 10.0)
+    sell(conn, "T2", [("DEV001", 2)], 30.0)
+
+    assert daily_sales(conn, "2026-03-14") == (40.0, 3, pytest.approx(8.0), pytest.approx(32.0))
+
+
+def test_discount_is_stored_on_the_line(conn):
+    sell(conn, "T1", [("MED001", 2)], 16.0, discounts={"MED001": 4.0})
+
+    assert load_transaction_items(conn, "T1")[0][5] == 4.0
+
+
+@pytest.mark.parametrize("lines", [[("MED001", 101)], [("NOPE", 1)], []])
+def test_unfulfillable_cart_rolls_back(conn, lines):
+    with pytest.raises(CheckoutError):
+        sell(conn, "T1", lines, 10.0)
+
+    assert stock(conn, "MED001") == 100
+    assert conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM daily_sales").fetchone()[0] == 0
+
+
+def test_price_changed_since_ring_up_rolls_back(conn):
+    with conn:
+        conn.execute("UPDATE inventory SET retail_price = 12.0 WHERE item_id = 'MED001'")
+
+    with pytest.raises(PriceChangedError) as raised:
+        sell(conn, "T1", [("MED001", 1), ("SUP001", 1)], 15.0, prices={"MED001": 10.0, "SUP001": 5.0})
+
+    assert raised.value.prices == {"MED001": 12.0}
+    assert stock(conn, "MED001") == 100
+    assert conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 0
+
+
+def test_jobs_are_queued_with_the_sale(conn):
+    sell(conn, "T1", [("MED001", 1)], 10.0, jobs=[("receipt", {"transaction_id": "T1"})])
+
+    assert conn.execute("SELECT transaction_id, kind FROM checkout_outbox").fetchall() == [("T1", "receipt")]
+
+
+def test_restate_takes_a_deleted_sale_out_of_its_day(conn):
+    sell(conn, "T1", [("MED001", 2)], 20.0)
+    sell(conn, "T2", [("SUP001", 1)], 5.0)
+
+    with conn:
+        restate_daily_sales(conn, "T1", "manager")
+
+    assert daily_sales(conn, "2026-03-14") == (pytest.approx(5.0), 1, pytest.approx(1.0), pytest.approx(4.0))
+
+
+def test_restate_moves_an_edited_sale_to_its_new_lines(conn):
+    sell(conn, "T1", [("MED001", 2), ("SUP001", 2)], 30.0)
+
+    with conn:
+        restate_daily_sales(conn, "T1", "manager", "MED001:1;SUP001:4", 30.0)
+
+    # -1 MED001 (profit 2, cost 8), +2 SUP001 (profit 1, cost 4)
+    assert daily_sales(conn, "2026-03-14") == (pytest.approx(30.0), 5, pytest.approx(6.0 - 2.0 + 2.0),
+                                               pytest.approx(24.0 - 8.0 + 8.0))
+
+
+def test_restate_prices_from_the_sold_lines_not_todays_catalog(conn):
+    sell(conn, "T1", [("MED001", 2)], 20.0)
+    with conn:
+        conn.execute("UPDATE inventory SET retail_price = 50.0, unit_price = 40.0 WHERE item_id = 'MED001'")
+
+    with conn:
+        restate_daily_sales(conn, "T1", "manager")
+
+    assert daily_sales(conn, "2026-03-14") == (pytest.approx(0.0), 0, pytest.approx(0.0), pytest.approx(0.0))
+
+
+def test_restate_ignores_sales_that_are_not_completed(conn):
+    sell(conn, "T1", [("MED001", 1)], 10.0)
+    with conn:
+        conn.execute("UPDATE transactions SET status = 'Returned' WHERE transaction_id = 'T1'")
+        restate_daily_sales(conn, "T1", "manager")
+        restate_daily_sales(conn, "MISSING", "manager")
+
+    assert daily_sales(conn, "2026-03-14") == (10.0, 1, pytest.approx(2.0), pytest.approx(8.0))
@@ -0,0 +1,10 @@
+from customers import search_customers
+
+
+def test_search_matches_names_anywhere(conn):
+    with conn:
+        conn.executemany("INSERT INTO customers (customer_id, name, contact, address) VALUES (?, ?, ?, ?)",
+                         [("C1", "Juan dela Cruz", "0917", "Manila"), ("C2", "Maria Santos", "0918", "Cebu")])
+
+    assert search_customers(conn, "cruz") == [("C1", "Juan dela Cruz", "0917", "Manila")]
+    assert [row[0] for row in search_customers(conn, "")] == ["C1", "C2"]
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+
+from checkout import commit_sale
+from inventory_index import InventoryIndex, prefix_edit_distance
+
+
+def build(*names):
+    index = InventoryIndex()
+    for n, name in enumerate(names):
+        index.upsert(f"ITEM{n:03d}", name, "Medicine", 10.0, 8.0, 100, None)
+    return index
+
+
+def names(items):
+    return [item.name for item in items]
+
+
+def test_name_prefix_beats_word_prefix_beats_substring():
+    index = build("Antiparasitic", "Biogesic Paracetamol", "Paracetamol 500mg", "Vitamin C")
+
+    assert names(index.rank("para")) == ["Paracetamol 500mg", "Biogesic Paracetamol", "Antiparasitic"]
+
+
+@pytest.mark.parametrize("typo", ["paracetmol", "parcetmol", "paracetamool"])
+def test_typos_within_two_edits_still_match(typo):
+    index = build("Paracetamol 500mg", "Ibuprofen 200mg", "Vitamin C")
+
+    assert names(index.rank(typo)) == ["Paracetamol 500mg"]
+
+
+def test_short_typos_allow_one_edit_only():
+    index = build("Ibuprofen")
+
+    assert names(index.rank("ibuprfen")) == ["Ibuprofen"]
+    assert index.rank("ibprfen") == []
+
+
+def test_velocity_breaks_ties_within_a_tier():
+    index = build("Vitamin C", "Vitamin D", "Vitamin E")
+    index.record_sale("ITEM001", 30)
+    index.record_sale("ITEM002", 3)
+
+    assert names(index.rank("vitamin")) == ["Vitamin D", "Vitamin E", "Vitamin C"]
+
+
+def test_rank_returns_only_the_best_k():
+    index = build(*[f"Amoxicillin {n} mg" for n in range(100)], "Amoxil")
+    index.record_sale("ITEM042", 50)
+
+    top = index.rank("amox", k=3)
+
+    assert len(top) == 3
+    assert names(top)[:2] == ["Amoxicillin 42 mg", "Amoxil"]
+    assert index.rank("amox", k=0) == []
+    assert index.rank("  ") == []
+
+
+def test_prefix_edit_distance_gives_up_past_the_bound():
+    assert prefix_edit_distance("parac", "paracetamol", 1) == 0
+    assert prefix_edit_distance("paracetmol", "paracetamol", 2) == 1
+    assert prefix_edit_distance("zzzz", "paracetamol", 1) == 2
+
+
+def test_load_velocity_counts_completed_sales_lines(conn):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    commit_sale(conn, "T1", [("MED001", 6)], 60.0, 60.0, 0.0, now, "Cash", None, "kongo")
+    commit_sale(conn, "T2", [("MED001", 3), ("SUP001", 15)], 105.0, 105.0, 0.0, now, "Cash", None, "kongo")
+    with conn:
+        conn.execute("UPDATE transactions SET status = 'Returned' WHERE transaction_id = 'T2'")
+    index = InventoryIndex()
+    index.load(conn)
+
+    index.load_velocity(conn, days=30)
+
+    assert index.velocity == {"MED001": pytest.approx(6 / 30)}
@@ -0,0 +1,69 @@
+import sqlite3
+
+import pytest
+
+from inventory_search import build_match_query, ensure_inventory_fts, fts_available, search_inventory
+from schema import migrate
+
+
+def ids(rows):
+    return [row[0] for row in rows]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("eliev", ["MED001"]),  # inside a word
+    ("pain reliever", ["MED001"]),
+    ("pharmacorp", ["MED001"]),  # supplier
+    ("dev001", ["DEV001"]),
+    ("c", ["SUP001"]),  # under a trigram: LIKE on the name
+    ("aspirin", []),
+])
+def test_search(conn, query, expected):
+    assert ids(search_inventory(conn, query)) == expected
+
+
+def test_empty_query_lists_the_catalog_by_name(conn):
+    assert ids(search_inventory(conn, "")) == ["MED001", "DEV001", "SUP001"]
+    assert ids(search_inventory(conn, "", type_filter="Supplement")) == ["SUP001"]
+
+
+def test_build_match_query():
+    assert build_match_query("Pain  Reliever") == '"pain" AND "reliever"'
+    assert build_match_query('say "hi"') == ""
+
+
+def test_index_follows_inventory_edits(conn):
+    with conn:
+        conn.execute("UPDATE inventory SET name = 'Paracetamol' WHERE item_id = 'MED001'")
+        conn.execute("DELETE FROM inventory WHERE item_id = 'SUP001'")
+
+    assert ids(search_inventory(conn, "cetamol")) == ["MED001"]
+    assert ids(search_inventory(conn, "vitamin")) == []
+
+
+def test_table_from_an_older_tokenizer_is_rebuilt(conn):
+    with conn:
+        conn.execute("DROP TABLE inventory_fts")
+        conn.execute("CREATE VIRTUAL TABLE inventory_fts USING fts5(item_id, name, type, supplier, "
+                     "content='inventory', content_rowid='rowid')")
+        conn.execute("INSERT INTO inventory_fts(inventory_fts) VALUES ('rebuild')")
+    assert ids(search_inventory(conn, "eliev")) == []
+
+    assert ensure_inventory_fts(conn) is True
+    assert fts_available(conn)
+    assert ids(search_inventory(conn, "eliev")) == ["MED001"]
+
+
+def test_falls_back_to_like_when_the_table_disappears(tmp_path):
+    path = str(tmp_path / "pos.db")
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    assert fts_available(conn)
+    other = sqlite3.connect(path)
+    with other:
+        other.execute("DROP TABLE inventory_fts")
+    other.close()
+
+    assert ids(search_inventory(conn, "vitamin")) == ["SUP001"]
+    assert not fts_available(conn)
+    conn.close()
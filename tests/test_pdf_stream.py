@@ -0,0 +1,64 @@
+import pytest
+
+from helpers import ParsedPdf
+from pdf_stream import PdfStreamWriter
+
+
+def write(path, pages, form=None, **kwargs):
+    with PdfStreamWriter(str(path), **kwargs) as pdf:
+        if form is not None:
+            pdf.define_form(form)
+        for lines in pages:
+            pdf.add_page(lines)
+    return ParsedPdf(path.read_bytes())
+
+
+def test_every_object_is_reachable_from_the_trailer(tmp_path):
+    pdf = write(tmp_path / "out.pdf", [[(100, 700, "First page")], [(100, 700, "Second page")]],
+                form=[(100, 750, "Shinano Pharmacy")])
+
+    kids = pdf.pages()
+    assert len(kids) == 2
+    font = pdf.dictionary(pdf.ref(kids[0], b"F1"))
+    assert b"/BaseFont /Helvetica" in font
+    form = pdf.ref(kids[0], b"Form")
+    assert b"/Subtype /Form" in pdf.dictionary(form)
+    assert b"(Shinano Pharmacy) Tj" in pdf.stream(form)
+    content = pdf.stream(pdf.ref(kids[1], b"Contents"))
+    assert content.startswith(b"/Form Do\nBT\n/F1 12 Tf\n")
+    assert content.endswith(b"1 0 0 1 100.00 700.00 Tm (Second page) Tj\nET")
+
+
+def test_pages_before_a_form_do_not_reference_it(tmp_path):
+    pdf = write(tmp_path / "out.pdf", [[(72, 72, "x")]])
+
+    [kid] = pdf.pages()
+    assert b"/XObject" not in pdf.dictionary(kid)
+    assert not pdf.stream(pdf.ref(kid, b"Contents")).startswith(b"/Form Do")
+
+
+def test_text_is_escaped_for_pdf_strings(tmp_path):
+    pdf = write(tmp_path / "out.pdf", [[(72, 72, r"Total (due): ₱5.00 \ paid")]])
+
+    [kid] = pdf.pages()
+    assert rb"(Total \(due\): P5.00 \\ paid) Tj" in pdf.stream(pdf.ref(kid, b"Contents"))
+
+
+def test_large_documents_span_several_write_chunks(tmp_path):
+    pdf = write(tmp_path / "out.pdf", [[(72, 72, f"Page {n}")] for n in range(2500)], font_size=9)
+
+    kids = pdf.pages()
+    assert len(kids) == 2500
+    assert b"(Page 2499) Tj" in pdf.stream(pdf.ref(kids[-1], b"Contents"))
+    assert b"/F1 9 Tf" in pdf.stream(pdf.ref(kids[0], b"Contents"))
+
+
+def test_error_inside_the_block_closes_the_file_without_finishing_it(tmp_path):
+    path = tmp_path / "out.pdf"
+    with pytest.raises(RuntimeError):
+        with PdfStreamWriter(str(path)) as pdf:
+            pdf.add_page([(72, 72, "x")])
+            raise RuntimeError("export cancelled")
+
+    assert pdf._file.closed
+    assert b"%%EOF" not in path.read_bytes()
@@ -0,0 +1,148 @@
+import queue
+
+from post_checkout import NEXT_JOB_SQL, JobNotRemovedError, PostCheckoutWorker, enqueue_jobs
+
+TERMINAL = "till-1"
+
+
+class Handlers:
+    """Handlers that count their calls; "flaky" raises its first `failures` times."""
+
+    def __init__(self, failures=0):
+        self.calls = {"print": 0, "log": 0, "flaky": 0}
+        self.failures = failures
+
+    def print(self, conn, payload):
+        self.calls["print"] += 1
+        return payload["transaction_id"]
+
+    def log(self, conn, payload):
+        self.calls["log"] += 1
+        conn.execute("INSERT INTO transaction_log (log_id, action, timestamp) VALUES (?, 'Test', '2026-03-14')",
+                     (payload["transaction_id"],))
+
+    def flaky(self, conn, payload):
+        self.calls["flaky"] += 1
+        if self.calls["flaky"] <= self.failures:
+            raise OSError("printer offline")
+        return "printed"
+
+
+def make_worker(handlers):
+    handler_map = {"print": handlers.print, "log": handlers.log, "flaky": handlers.flaky}
+    # The Tk side (root, callbacks) is only used by start() and _poll(), which these tests don't call
+    return PostCheckoutWorker(None, ":memory:", handler_map, None, None, terminal=TERMINAL)
+
+
+def queue_job(conn, kind, transaction_id="T1"):
+    with conn:
+        enqueue_jobs(conn, transaction_id, [(kind, {"transaction_id": transaction_id})], terminal=TERMINAL)
+
+
+def run_next(worker, conn):
+    job = conn.execute(NEXT_JOB_SQL, (TERMINAL,)).fetchone()
+    assert job is not None
+    return worker._run(conn, *job)
+
+
+def outbox(conn):
+    return conn.execute("SELECT kind, status, attempts, error FROM checkout_outbox").fetchall()
+
+
+def results(worker):
+    out = []
+    while True:
+        try:
+            out.append(worker._results.get_nowait())
+        except queue.Empty:
+            return out
+
+
+def test_finished_job_is_removed_with_its_writes(conn):
+    handlers = Handlers()
+    worker = make_worker(handlers)
+    queue_job(conn, "log")
+
+    assert run_next(worker, conn) is True
+
+    assert outbox(conn) == []
+    assert conn.execute("SELECT COUNT(*) FROM transaction_log WHERE log_id = 'T1'").fetchone() == (1,)
+    assert results(worker) == [("log", {"transaction_id": "T1"}, None, None)]
+
+
+def test_raising_handler_is_retried_then_succeeds(conn):
+    handlers = Handlers(failures=1)
+    worker = make_worker(handlers)
+    queue_job(conn, "flaky")
+
+    run_next(worker, conn)
+    assert outbox(conn) == [("flaky", "pending", 1, "printer offline")]
+    assert results(worker) == []
+
+    run_next(worker, conn)
+    assert outbox(conn) == []
+    assert results(worker) == [("flaky", {"transaction_id": "T1"}, "printed", None)]
+
+
+def test_job_gives_up_after_max_attempts(conn):
+    handlers = Handlers(failures=99)
+    worker = make_worker(handlers)
+    queue_job(conn, "flaky")
+
+    for _ in range(PostCheckoutWorker.MAX_ATTEMPTS):
+        run_next(worker, conn)
+
+    assert outbox(conn) == [("flaky", "failed", 3, "printer offline")]
+    assert conn.execute(NEXT_JOB_SQL, (TERMINAL,)).fetchone() is None
+    [(kind, _, _, error)] = results(worker)
+    assert kind == "flaky" and isinstance(error, OSError)
+
+
+def test_finished_job_is_not_rerun_when_its_removal_fails(conn):
+    handlers = Handlers()
+    worker = make_worker(handlers)
+    queue_job(conn, "print")
+    with conn:
+        conn.execute("""
+            CREATE TRIGGER keep_jobs BEFORE DELETE ON checkout_outbox
+            BEGIN SELECT RAISE(ABORT, 'database is locked'); END
+        """)
+
+    run_next(worker, conn)
+
+    assert handlers.calls["print"] == 1
+    assert [row[:3] for row in outbox(conn)] == [("print", "failed", 1)]
+    assert conn.execute(NEXT_JOB_SQL, (TERMINAL,)).fetchone() is None
+    [(_, _, _, error)] = results(worker)
+    assert isinstance(error, JobNotRemovedError)
+
+
+def test_unrecordable_failure_does_not_escape_and_is_requeued_on_restart(conn):
+    handlers = Handlers(failures=1)
+    worker = make_worker(handlers)
+    queue_job(conn, "flaky")
+    queue_job(conn, "print", "T2")
+    with conn:
+        conn.execute("""
+            CREATE TRIGGER outbox_locked BEFORE UPDATE OF error ON checkout_outbox
+            BEGIN SELECT RAISE(ABORT, 'database is locked'); END
+        """)
+
+    assert run_next(worker, conn) is False
+    assert run_next(worker, conn) is True  # the next job still runs
+    assert outbox(conn) == [("flaky", "running", 1, None)]
+
+    with conn:
+        conn.execute("DROP TRIGGER outbox_locked")
+    worker._recover(conn)
+    run_next(worker, conn)
+    assert outbox(conn) == []
+
+
+def test_unknown_kind_fails_like_a_raising_handler(conn):
+    worker = make_worker(Handlers())
+    queue_job(conn, "nope")
+
+    run_next(worker, conn)
+
+    assert outbox(conn) == [("nope", "pending", 1, "No handler for post-checkout job 'nope'")]
@@ -0,0 +1,9 @@
+from query_plans import ACCEPTED_SCANS, QUERIES, verify_query_plans
+
+
+def test_only_accepted_queries_scan(conn):
+    assert {label for label, _ in verify_query_plans(conn)} == set(ACCEPTED_SCANS)
+
+
+def test_accepted_scans_name_registered_queries():
+    assert set(ACCEPTED_SCANS) <= {label for label, _, _ in QUERIES}
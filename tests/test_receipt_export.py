@@ -0,0 +1,60 @@
+import pytest
+
+from checkout import commit_sale
+from helpers import ParsedPdf
+from receipts import export_receipts_pdf, iter_receipts
+
+
+def sell(conn, transaction_id, lines, total, timestamp):
+    commit_sale(conn, transaction_id, lines, total, total, 0.0, timestamp, "Cash", None, "kongo")
+
+
+@pytest.fixture
+def sales(conn):
+    with conn:
+        conn.executemany(
+            "INSERT INTO inventory (item_id, name, type, retail_price, unit_price, quantity) VALUES (?, ?, ?, 1, 1, 10)",
+            [(f"BULK{i:03d}", f"Bulk item {i}", "Medicine") for i in range(40)]
+        )
+    sell(conn, "T1", [("MED001", 2), ("SUP001", 1)], 25.0, "2026-03-01 09:00:00")
+    sell(conn, "T2", [(f"BULK{i:03d}", 1) for i in range(40)], 40.0, "2026-03-02 09:00:00")
+    sell(conn, "T3", [("DEV001", 1)], 15.0, "2026-04-01 09:00:00")
+    return conn
+
+
+def read_pdf(path):
+    """(page count, decompressed text of every page) after checking the file's structure."""
+    pdf = ParsedPdf(path.read_bytes())
+    kids = pdf.pages()
+    return len(kids), b"".join(pdf.stream(pdf.ref(kid, b"Contents")) for kid in kids)
+
+
+def test_iter_receipts_is_bounded_by_the_range(sales):
+    receipts = list(iter_receipts(sales, "2026-03-01", "2026-04-01"))
+
+    assert [r.transaction_id for r in receipts] == ["T1", "T2"]
+    assert [(i.name, i.qty, i.subtotal) for i in receipts[0].items] == [("Pain Reliever", 2, 20.0),
+                                                                        ("Vitamin C", 1, 5.0)]
+    assert len(receipts[1].items) == 40
+
+
+def test_export_writes_a_page_per_receipt_and_continues_long_ones(sales, tmp_path):
+    path = tmp_path / "march.pdf"
+
+    assert export_receipts_pdf(sales, str(path), "2026-03-01", "2026-04-01") == 2
+
+    count, text = read_pdf(path)
+    assert count == 3  # T1, and T2 over two pages
+    assert b"(Transaction ID: T2 \\(continued\\)) Tj" in text
+    assert b"(Total: P25.00) Tj" in text
+    assert b"T3" not in text
+
+
+def test_empty_range_still_writes_a_readable_pdf(sales, tmp_path):
+    path = tmp_path / "empty.pdf"
+
+    assert export_receipts_pdf(sales, str(path), "2025-01-01", "2025-02-01") == 0
+
+    count, text = read_pdf(path)
+    assert count == 1
+    assert b"No completed sales" in text
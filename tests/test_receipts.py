@@ -0,0 +1,37 @@
+import pytest
+
+from receipts import (ESC_ALIGN_CENTER, ESC_ALIGN_LEFT, ESC_BOLD_OFF, ESC_BOLD_ON, ESC_INIT, GS_FEED_AND_CUT,
+                      PAPER_COLUMNS, Receipt, ReceiptItem, render_escpos)
+
+
+@pytest.fixture
+def receipt():
+    items = [ReceiptItem("Paracetamol 500mg", 2, 5.0, 10.0), ReceiptItem("A" * 60, 1, 12.5, 10.0)]
+    return Receipt("01-2026-T1-000001", "2026-01-05 09:30:00", items, 20.0, 50.0, 30.0)
+
+
+@pytest.mark.parametrize("paper_mm", [58, 80])
+def test_lines_fit_the_paper(receipt, paper_mm):
+    body = render_escpos(receipt, paper_mm)
+    assert body.startswith(ESC_INIT)
+    assert body.endswith(GS_FEED_AND_CUT)
+
+    text = body[len(ESC_INIT):-len(GS_FEED_AND_CUT)]
+    for line in text.split(b"\n"):
+        for command in (ESC_ALIGN_LEFT, ESC_ALIGN_CENTER, ESC_BOLD_ON, ESC_BOLD_OFF):
+            line = line.replace(command, b"")
+        assert len(line) <= PAPER_COLUMNS[paper_mm]
+
+
+def test_prints_items_and_totals(receipt):
+    body = render_escpos(receipt, 58)
+
+    assert b"01-2026-T1-000001\n" in body
+    assert b"  2 x 5.00" in body
+    assert b"TOTAL" in body and b"P20.00\n" in body
+    assert b"CHANGE" in body and b"P30.00\n" in body
+    assert "₱".encode() not in body
+
+
+def test_unknown_paper_width_falls_back_to_80mm(receipt):
+    assert render_escpos(receipt, 76) == render_escpos(receipt, 80)
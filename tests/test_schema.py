@@ -0,0 +1,93 @@
+import sqlite3
+
+import pytest
+
+from inventory_search import search_inventory
+from schema import MIGRATIONS, SCHEMA_VERSION, migrate, schema_version
+from transaction_items import load_transaction_items
+
+
+@pytest.fixture
+def raw():
+    conn = sqlite3.connect(":memory:")
+    yield conn
+    conn.close()
+
+
+def tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+
+
+def columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def test_migrates_an_empty_database_from_version_0(raw):
+    assert schema_version(raw) == 0
+
+    assert migrate(raw) == SCHEMA_VERSION
+
+    assert schema_version(raw) == SCHEMA_VERSION
+    assert {"users", "inventory", "transactions", "daily_sales", "sequences", "checkout_outbox", "cart_journal",
+            "transaction_items", "inventory_fts", "inventory_deletions"} <= tables(raw)
+    assert [row[0] for row in raw.execute("SELECT username FROM users ORDER BY username")] == ["kongo", "yamato"]
+    assert [row[0] for row in search_inventory(raw, "vitamin")] == ["SUP001"]
+
+
+def test_migrate_is_a_no_op_when_current(raw):
+    migrate(raw)
+    changes = raw.total_changes
+
+    assert migrate(raw) == SCHEMA_VERSION
+    assert raw.total_changes == changes
+
+
+def test_resumes_from_an_intermediate_version(raw):
+    for step in MIGRATIONS[:3]:
+        step(raw)
+    raw.execute("PRAGMA user_version = 3")
+
+    migrate(raw)
+
+    assert schema_version(raw) == SCHEMA_VERSION
+    assert "transaction_items" in tables(raw)
+
+
+def test_upgrades_a_version_0_database_with_the_oldest_layout(raw):
+    with raw:
+        raw.execute("CREATE TABLE inventory (item_id TEXT PRIMARY KEY, name TEXT, type TEXT, price REAL, quantity INTEGER)")
+        raw.execute("""
+            CREATE TABLE transactions (transaction_id TEXT PRIMARY KEY, items TEXT, total_amount REAL,
+                                       cash_paid REAL, change_amount REAL, timestamp TEXT, status TEXT)
+        """)
+        raw.execute("INSERT INTO inventory VALUES ('OLD001', 'Cough Syrup', 'Medicine', 7.5, 30)")
+        raw.execute("INSERT INTO transactions VALUES ('T1', 'OLD001:2', 15.0, 20.0, 5.0, '2025-12-01 08:00:00', 'Completed')")
+
+    migrate(raw)
+
+    assert {"retail_price", "unit_price", "supplier", "change_seq"} <= set(columns(raw, "inventory"))
+    assert {"payment_method", "customer_id"} <= set(columns(raw, "transactions"))
+    assert raw.execute("SELECT retail_price FROM inventory WHERE item_id = 'OLD001'").fetchone() == (7.5,)
+    assert load_transaction_items(raw, "T1") == [("OLD001", "Cough Syrup", 2, 0.0, 7.5, 0.0)]
+    assert [row[0] for row in search_inventory(raw, "syrup")] == ["OLD001"]
+
+
+def test_daily_sales_cost_is_backfilled_from_completed_sales(raw):
+    for step in MIGRATIONS[:9]:
+        step(raw)
+    raw.execute("PRAGMA user_version = 9")
+    with raw:
+        raw.executemany("INSERT INTO transactions (transaction_id, items, total_amount, timestamp, status) "
+                        "VALUES (?, '', 0, ?, ?)",
+                        [("T1", "2026-03-14 09:00:00", "Completed"), ("T2", "2026-03-14 23:59:59", "Completed"),
+                         ("T3", "2026-03-14 12:00:00", "Voided"), ("T4", "2026-03-15 00:00:00", "Completed")])
+        raw.executemany("INSERT INTO transaction_items (transaction_id, item_id, qty, unit_price) VALUES (?, ?, ?, ?)",
+                        [("T1", "MED001", 2, 8.0), ("T2", "SUP001", 1, 4.0), ("T3", "MED001", 5, 8.0),
+                         ("T4", "DEV001", 1, 12.0)])
+        raw.executemany("INSERT INTO daily_sales (sale_date, total_sales) VALUES (?, 0)",
+                        [("2026-03-14",), ("2026-03-16",)])
+
+    migrate(raw)
+
+    assert dict(raw.execute("SELECT sale_date, unit_cost FROM daily_sales")) == {"2026-03-14": 20.0,
+                                                                                  "2026-03-16": 0.0}
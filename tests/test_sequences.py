@@ -0,0 +1,50 @@
+import sqlite3
+import threading
+
+from schema import migrate
+from sequences import next_customer_id, next_transaction_id, next_value, terminal_code
+
+
+def test_values_start_at_one_and_are_per_name(conn):
+    assert [next_value(conn, "a") for _ in range(3)] == [1, 2, 3]
+    assert next_value(conn, "b") == 1
+
+
+def test_terminals_keep_their_code(conn):
+    first = terminal_code(conn, "counter-1")
+    second = terminal_code(conn, "counter-2")
+
+    assert first != second
+    assert terminal_code(conn, "counter-1") == first
+
+
+def test_ids_are_numbered_per_terminal(conn):
+    a1 = next_transaction_id(conn, "counter-1")
+    b1 = next_transaction_id(conn, "counter-2")
+    a2 = next_transaction_id(conn, "counter-1")
+
+    assert a1.endswith("-000001") and b1.endswith("-000001")
+    assert a2.endswith("-000002")
+    assert next_customer_id(conn, "counter-1").endswith("-C00001")
+
+
+def test_concurrent_connections_never_share_a_value(tmp_path):
+    path = str(tmp_path / "pos.db")
+    setup = sqlite3.connect(path)
+    migrate(setup)
+    setup.close()
+    issued = []
+
+    def take(count):
+        conn = sqlite3.connect(path, timeout=10)
+        values = [next_value(conn, "race") for _ in range(count)]
+        conn.close()
+        issued.extend(values)
+
+    threads = [threading.Thread(target=take, args=(50,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(issued) == list(range(1, 201))
@@ -0,0 +1,61 @@
+import sqlite3
+
+import pytest
+
+from inventory_index import InventoryIndex
+from schema import migrate
+from stock_cache import StockCache
+
+
+@pytest.fixture
+def two_terminals(tmp_path):
+    """A cache on one connection and a second connection committing behind its back."""
+    path = str(tmp_path / "pos.db")
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    index = InventoryIndex()
+    index.load(conn)
+    other = sqlite3.connect(path)
+    yield StockCache(conn, index), other
+    other.close()
+    conn.close()
+
+
+def test_unchanged_database_is_not_reread(two_terminals):
+    cache, _ = two_terminals
+
+    assert cache.refresh_if_stale() is False
+
+
+def test_commits_to_other_tables_do_not_reload(two_terminals):
+    cache, other = two_terminals
+    item = cache.index.get("MED001")
+    with other:
+        other.execute("INSERT INTO transaction_log (timestamp) VALUES ('2026-01-05 09:30:00')")
+
+    assert cache.refresh_if_stale() is False
+    assert cache.index.get("MED001") is item
+
+
+def test_edited_rows_are_reloaded_in_full(two_terminals):
+    cache, other = two_terminals
+    with other:
+        other.execute("UPDATE inventory SET quantity = 3, retail_price = 9.5, name = 'Paracetamol Forte' "
+                      "WHERE item_id = 'MED001'")
+
+    assert cache.available("MED001") == 3
+    item = cache.index.get("MED001")
+    assert (item.name, item.retail_price) == ("Paracetamol Forte", 9.5)
+    assert [row.item_id for row in cache.index.search("forte")] == ["MED001"]
+
+
+def test_inserts_and_deletes_reach_the_cache(two_terminals):
+    cache, other = two_terminals
+    with other:
+        other.execute("INSERT INTO inventory (item_id, name, type, retail_price, unit_price, quantity) "
+                      "VALUES ('NEW001', 'Zinc', 'Supplement', 4.0, 2.0, 12)")
+        other.execute("DELETE FROM inventory WHERE item_id = 'SUP001'")
+
+    assert cache.refresh_if_stale() is True
+    assert cache.available("NEW001") == 12
+    assert cache.available("SUP001") is None
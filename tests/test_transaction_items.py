@@ -0,0 +1,38 @@
+import pytest
+
+from checkout import commit_sale, restate_daily_sales
+from helpers import daily_sales
+from transaction_items import load_editable_items, load_transaction_items, set_transaction_item_quantities
+
+
+@pytest.fixture
+def sale(conn):
+    # MED001 sells at 10.00 and costs 8.00; SUP001 sells at 5.00 and costs 4.00
+    commit_sale(conn, "T1", [("MED001", 2), ("SUP001", 3)], 35.0, 35.0, 0.0, "2026-03-14 10:30:00",
+                "Cash", None, "kongo")
+    return "T1"
+
+
+def test_lines_of_deleted_products_stay_editable(conn, sale):
+    with conn:
+        conn.execute("DELETE FROM inventory WHERE item_id = 'SUP001'")
+
+    assert load_editable_items(conn, sale) == [
+        ("MED001", "Pain Reliever", 10.0, 2, 98),
+        ("SUP001", "Vitamin C", 5.0, 3, 0),
+    ]
+
+
+def test_editing_around_a_deleted_product_keeps_its_line_booked(conn, sale):
+    with conn:
+        conn.execute("DELETE FROM inventory WHERE item_id = 'SUP001'")
+    # What the edit screen saves when only MED001's quantity is changed
+    quantities = {item_id: qty for item_id, _, _, qty, _ in load_editable_items(conn, sale)}
+    quantities["MED001"] = 1
+    with conn:
+        restate_daily_sales(conn, sale, "kongo", "MED001:1;SUP001:3", 25.0)
+        set_transaction_item_quantities(conn, sale, quantities)
+
+    assert [(item_id, qty) for item_id, _, qty, _, _, _ in load_transaction_items(conn, sale)] == \
+        [("MED001", 1), ("SUP001", 3)]
+    assert daily_sales(conn, "2026-03-14") == (25.0, 4, pytest.approx(5.0), pytest.approx(20.0))
@@ -0,0 +1,136 @@
+from datetime import date
+
+import pytest
+
+from transaction_pages import TransactionFilter, fetch_transaction_page, filter_conditions, month_bounds, year_bounds
+
+
+@pytest.fixture
+def history(conn):
+    """25 completed sales over 5 seconds, five sharing each timestamp, with one line each."""
+    rows = [(f"T{n:03d}", 10.0 + n, f"2026-03-14 10:00:0{n // 5}") for n in range(25)]
+    with conn:
+        conn.executemany("""
+            INSERT INTO transactions (transaction_id, items, total_amount, cash_paid, change_amount, timestamp, status)
+            VALUES (?, 'MED001:1', ?, 0, 0, ?, 'Completed')
+        """, rows)
+        conn.executemany("""
+            INSERT INTO transaction_items (transaction_id, item_id, name, qty, unit_price, retail_price)
+            VALUES (?, 'MED001', 'Pain Reliever', 1, 8.0, 10.0)
+        """, [(row[0],) for row in rows])
+    # Newest first: later timestamp, then higher ID within a timestamp
+    return sorted(rows, key=lambda row: (row[2], row[0]), reverse=True)
+
+
+def ids(page):
+    return [row[0] for row in page]
+
+
+def key(row):
+    return row[4], row[0]
+
+
+def test_first_page_is_the_newest(conn, history):
+    page = fetch_transaction_page(conn, limit=7)
+
+    assert ids(page) == [row[0] for row in history[:7]]
+    assert page[0][8] == "Pain Reliever (x1)"
+
+
+def test_paging_older_visits_every_row_once(conn, history):
+    seen = []
+    page = fetch_transaction_page(conn, limit=7)
+    while page:
+        seen.extend(ids(page))
+        page = fetch_transaction_page(conn, older_than=key(page[-1]), limit=7)
+
+    assert seen == [row[0] for row in history]
+
+
+def test_paging_newer_returns_the_rows_just_above_newest_first(conn, history):
+    anchor = history[12]
+    page = fetch_transaction_page(conn, newer_than=(anchor[2], anchor[0]), limit=4)
+
+    assert ids(page) == [row[0] for row in history[8:12]]
+
+
+def test_paging_newer_walks_back_to_the_top(conn, history):
+    bottom = history[-1]
+    seen = []
+    page = fetch_transaction_page(conn, newer_than=(bottom[2], bottom[0]), limit=6)
+    while page:
+        seen = ids(page) + seen
+        page = fetch_transaction_page(conn, newer_than=key(page[0]), limit=6)
+
+    assert seen == [row[0] for row in history[:-1]]
+
+
+def test_past_either_end_is_empty(conn, history):
+    oldest, newest = history[-1], history[0]
+
+    assert fetch_transaction_page(conn, older_than=(oldest[2], oldest[0])) == []
+    assert fetch_transaction_page(conn, newer_than=(newest[2], newest[0])) == []
+
+
+@pytest.fixture
+def mixed(conn):
+    rows = [
+        ("03-2026-T1-000001", 10.0, "2026-03-01 09:00:00", "Completed", "Cash", "C1", "MED001"),
+        ("03-2026-T1-000002", 25.0, "2026-03-02 23:59:59", "Held", "Cash", None, "SUP001"),
+        ("03-2026-T2-000001", 40.0, "2026-03-03 00:00:00", "Completed", "Credit Card", "C2", "DEV001"),
+        ("04-2026-T1-000001", 55.0, "2026-04-01 12:00:00", "Returned", "Cash", "C1", "MED001"),
+    ]
+    with conn:
+        conn.executemany("""
+            INSERT INTO transactions (transaction_id, items, total_amount, timestamp, status, payment_method, customer_id)
+            VALUES (?, '', ?, ?, ?, ?, ?)
+        """, [row[:6] for row in rows])
+        conn.executemany("INSERT INTO transaction_items (transaction_id, item_id, qty) VALUES (?, ?, 1)",
+                         [(row[0], row[6]) for row in rows])
+    return rows
+
+
+@pytest.mark.parametrize("criteria, expected", [
+    (TransactionFilter(transaction_id="03-2026-t1"), ["03-2026-T1-000002", "03-2026-T1-000001"]),
+    (TransactionFilter(start_date=date(2026, 3, 2), end_date=date(2026, 3, 2)), ["03-2026-T1-000002"]),
+    (TransactionFilter(start_date=date(2026, 3, 2)), ["04-2026-T1-000001", "03-2026-T2-000001", "03-2026-T1-000002"]),
+    (TransactionFilter(status="Held"), ["03-2026-T1-000002"]),
+    (TransactionFilter(payment_method="Credit Card"), ["03-2026-T2-000001"]),
+    (TransactionFilter(customer_id="C1"), ["04-2026-T1-000001", "03-2026-T1-000001"]),
+    (TransactionFilter(item="MED001"), ["04-2026-T1-000001", "03-2026-T1-000001"]),
+    (TransactionFilter(item="Vitamin C"), ["03-2026-T1-000002"]),
+    (TransactionFilter(min_amount=25.0, max_amount=40.0), ["03-2026-T2-000001", "03-2026-T1-000002"]),
+    (TransactionFilter(customer_id="C1", status="Completed"), ["03-2026-T1-000001"]),
+    (TransactionFilter(transaction_id="05-"), []),
+])
+def test_filters(conn, mixed, criteria, expected):
+    assert ids(fetch_transaction_page(conn, criteria)) == expected
+
+
+@pytest.mark.parametrize("typed", ["3f2a9c", "3F2A9C", "3f2A"])
+def test_held_sales_with_uuid_ids_are_found_by_prefix(conn, mixed, typed):
+    # hold_transaction stores a lower-case uuid4, not a sequence ID
+    held_id = "3f2a9c1e-7b4d-4e2a-9c5f-0d1e2f3a4b5c"
+    with conn:
+        conn.execute("INSERT INTO transactions (transaction_id, items, total_amount, timestamp, status) "
+                     "VALUES (?, '', 5.0, '2026-03-05 10:00:00', 'Held')", (held_id,))
+
+    assert ids(fetch_transaction_page(conn, TransactionFilter(transaction_id=typed))) == [held_id]
+
+
+def test_filters_combine_with_paging(conn, mixed):
+    criteria = TransactionFilter(status="Completed")
+    first = fetch_transaction_page(conn, criteria, limit=1)
+
+    assert ids(first) == ["03-2026-T2-000001"]
+    assert ids(fetch_transaction_page(conn, criteria, older_than=key(first[0]))) == ["03-2026-T1-000001"]
+
+
+def test_empty_filter_adds_no_conditions():
+    assert filter_conditions(TransactionFilter()) == ([], [])
+
+
+def test_month_and_year_bounds_are_half_open():
+    assert month_bounds(2026, 2) == ("2026-02-01", "2026-03-01")
+    assert month_bounds(2026, 12) == ("2026-12-01", "2027-01-01")
+    assert year_bounds(2026) == ("2026-01-01", "2027-01-01")
@@ -0,0 +1,138 @@
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS transaction_items (
+        transaction_id TEXT NOT NULL,
+        item_id TEXT NOT NULL,
+        name TEXT,
+        qty INTEGER NOT NULL,
+        unit_price REAL DEFAULT 0.0,
+        retail_price REAL DEFAULT 0.0,
+        discount REAL DEFAULT 0.0,
+        PRIMARY KEY (transaction_id, item_id)
+    ) WITHOUT ROWID
+"""
+
+_INSERT_SQL = """
+    INSERT OR REPLACE INTO transaction_items (transaction_id, item_id, name, qty, unit_price, retail_price, discount)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# (item_id, name, qty, unit_price, retail_price, discount) as sold
+Line = Tuple[str, Optional[str], int, float, float, float]
+
+
+def parse_items(items: Optional[str]) -> Dict[str, int]:
+    """Quantities per item_id from a transactions.items string ("item_id:qty;item_id:qty")."""
+    quantities: Dict[str, int] = {}
+    for entry in (items or "").split(";"):
+        item_id, _, quantity = entry.partition(":")
+        try:
+            quantities[item_id] = quantities.get(item_id, 0) + int(quantity)
+        except ValueError:
+            continue
+    return quantities
+
+
+def ensure_transaction_items(conn: sqlite3.Connection) -> None:
+    """Create transaction_items, backfilling it from transactions.items the first time."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transaction_items'"
+    ).fetchone()
+    with conn:
+        conn.execute(_TABLE_SQL)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_transaction_items_item ON transaction_items(item_id)")
+        if not exists:
+            backfill_transaction_items(conn)
+            return
+        columns = [col[1] for col in conn.execute("PRAGMA table_info(transaction_items)")]
+        if 'name' not in columns:
+            conn.execute("ALTER TABLE transaction_items ADD COLUMN name TEXT")
+            conn.execute("""
+                UPDATE transaction_items
+                SET name = (SELECT name FROM inventory WHERE inventory.item_id = transaction_items.item_id)
+            """)
+
+
+def backfill_transaction_items(conn: sqlite3.Connection) -> int:
+    """Explode every transactions.items string into rows; returns the number written.
+
+    Old sales never recorded what they were sold at, so they are priced
+    from the current catalog. Call inside the caller's transaction.
+    """
+    catalog = {row[0]: row[1:] for row in conn.execute("SELECT item_id, name, unit_price, retail_price FROM inventory")}
+    rows = []
+    for transaction_id, items in conn.execute("SELECT transaction_id, items FROM transactions"):
+        for item_id, qty in parse_items(items).items():
+            name, unit_price, retail_price = catalog.get(item_id, (None, 0.0, 0.0))
+            rows.append((transaction_id, item_id, name, qty, unit_price or 0.0, retail_price or 0.0, 0.0))
+    conn.executemany(_INSERT_SQL, rows)
+    return len(rows)
+
+
+def priced_lines(conn: sqlite3.Connection, quantities: Dict[str, int],
+                 discounts: Optional[Dict[str, float]] = None) -> List[Line]:
+    """Lines for quantities at today's catalog prices (one query)."""
+    if not quantities:
+        return []
+    placeholders = ",".join("?" * len(quantities))
+    catalog = {
+        row[0]: row[1:] for row in conn.execute(
+            f"SELECT item_id, name, unit_price, retail_price FROM inventory WHERE item_id IN ({placeholders})",
+            list(quantities)
+        )
+    }
+    discounts = discounts or {}
+    lines = []
+    for item_id, qty in quantities.items():
+        name, unit_price, retail_price = catalog.get(item_id, (None, 0.0, 0.0))
+        lines.append((item_id, name, qty, unit_price or 0.0, retail_price or 0.0, discounts.get(item_id, 0.0)))
+    return lines
+
+
+def write_transaction_items(conn: sqlite3.Connection, transaction_id: str, lines: Iterable[Line]) -> None:
+    """Store a transaction's lines. Call inside the transaction that writes the sale."""
+    conn.executemany(_INSERT_SQL, [(transaction_id, *line) for line in lines])
+
+
+def set_transaction_item_quantities(conn: sqlite3.Connection, transaction_id: str,
+                                    quantities: Dict[str, int]) -> None:
+    """Change line quantities in place, keeping their stored prices; zero removes the line."""
+    conn.executemany(
+        "UPDATE transaction_items SET qty = ? WHERE transaction_id = ? AND item_id = ?",
+        [(qty, transaction_id, item_id) for item_id, qty in quantities.items() if qty > 0]
+    )
+    conn.executemany(
+        "DELETE FROM transaction_items WHERE transaction_id = ? AND item_id = ?",
+        [(transaction_id, item_id) for item_id, qty in quantities.items() if qty <= 0]
+    )
+
+
+def load_editable_items(conn: sqlite3.Connection, transaction_id: str) -> List[Tuple]:
+    """(item_id, name, retail_price, qty, in_stock) of each line, for the edit-transaction screens.
+
+    Lines whose product has since been deleted are kept, under their stored
+    name and with nothing in stock, so saving an edit never drops them.
+    """
+    return conn.execute("""
+        SELECT ti.item_id, COALESCE(ti.name, i.name, ti.item_id), ti.retail_price, ti.qty, COALESCE(i.quantity, 0)
+        FROM transaction_items ti
+        LEFT JOIN inventory i ON i.item_id = ti.item_id
+        WHERE ti.transaction_id = ?
+        ORDER BY ti.item_id
+    """, (transaction_id,)).fetchall()
+
+
+def delete_transaction_items(conn: sqlite3.Connection, transaction_id: str) -> None:
+    conn.execute("DELETE FROM transaction_items WHERE transaction_id = ?", (transaction_id,))
+
+
+def load_transaction_items(conn: sqlite3.Connection, transaction_id: str) -> List[Tuple]:
+    """Lines of one transaction exactly as sold; never consults the current catalog."""
+    return conn.execute("""
+        SELECT item_id, name, qty, unit_price, retail_price, discount
+        FROM transaction_items
+        WHERE transaction_id = ?
+        ORDER BY item_id
+    """, (transaction_id,)).fetchall()
@@ -0,0 +1,156 @@
+import sqlite3
+from datetime import date, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+
+PAGE_SIZE = 100
+
+# A row's position in the list: (timestamp, transaction_id), newest first
+PageKey = Tuple[str, str]
+
+
+class TransactionFilter(NamedTuple):
+    """Criteria for the transactions list; every field left empty matches everything."""
+    transaction_id: str = ""                # ID prefix, any case
+    start_date: Optional[date] = None       # inclusive
+    end_date: Optional[date] = None         # inclusive
+    status: Optional[str] = None
+    payment_method: Optional[str] = None
+    customer_id: Optional[str] = None
+    item: Optional[str] = None              # item_id, or an exact inventory name
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+
+
+def id_prefix_condition(prefix: str, column: str = "transaction_id") -> Tuple[str, List]:
+    """WHERE term matching IDs in column that start with prefix, ignoring case.
+
+    Completed sales have upper-case IDs and held ones lower-case uuids, so
+    the term is the [low, high) range of the upper-cased prefix OR'd with
+    that of the lower-cased one. Each range is a primary key seek.
+    """
+    conditions: List[str] = []
+    params: List = []
+    for variant in dict.fromkeys((prefix.upper(), prefix.lower())):
+        conditions.append(f"({column} >= ? AND {column} < ?)")
+        params.extend([variant, variant + "\U0010ffff"])
+    return "(" + " OR ".join(conditions) + ")", params
+
+
+def filter_conditions(criteria: TransactionFilter) -> Tuple[List[str], List]:
+    """WHERE terms on transactions (unaliased) for criteria, each one a range or equality on an indexed column."""
+    conditions: List[str] = []
+    params: List = []
+    if criteria.transaction_id:
+        condition, condition_params = id_prefix_condition(criteria.transaction_id)
+        conditions.append(condition)
+        params.extend(condition_params)
+    if criteria.start_date is not None:
+        conditions.append("timestamp >= ?")
+        params.append(criteria.start_date.isoformat())
+    if criteria.end_date is not None:
+        conditions.append("timestamp < ?")
+        params.append((criteria.end_date + timedelta(days=1)).isoformat())
+    if criteria.status:
+        conditions.append("status = ?")
+        params.append(criteria.status)
+    if criteria.payment_method:
+        conditions.append("payment_method = ?")
+        params.append(criteria.payment_method)
+    if criteria.customer_id:
+        conditions.append("customer_id = ?")
+        params.append(criteria.customer_id)
+    if criteria.item:
+        conditions.append("""transaction_id IN (
+            SELECT ti.transaction_id FROM transaction_items ti
+            WHERE ti.item_id = ? OR ti.item_id IN (SELECT item_id FROM inventory WHERE name = ?))""")
+        params.extend([criteria.item, criteria.item])
+    if criteria.min_amount is not None:
+        conditions.append("total_amount >= ?")
+        params.append(criteria.min_amount)
+    if criteria.max_amount is not None:
+        conditions.append("total_amount <= ?")
+        params.append(criteria.max_amount)
+    return conditions, params
+
+
+HELD_TRANSACTIONS_SQL = """
+    SELECT t.transaction_id, t.total_amount, t.timestamp,
+           GROUP_CONCAT(COALESCE(ti.name, ti.item_id) || ' (x' || ti.qty || ')', ', ')
+    FROM transactions t
+    LEFT JOIN transaction_items ti ON ti.transaction_id = t.transaction_id
+    WHERE t.status = 'Held'
+    GROUP BY t.transaction_id
+"""
+
+# (date, total_amount, cost of the lines sold) of each completed sale with start <= timestamp < end
+COMPLETED_SALES_SQL = """
+    SELECT substr(t.timestamp, 1, 10) AS date, t.total_amount,
+           COALESCE(SUM(ti.qty * ti.unit_price), 0.0) AS unit_sales
+    FROM transactions t
+    LEFT JOIN transaction_items ti ON ti.transaction_id = t.transaction_id
+    WHERE t.status = 'Completed' AND t.timestamp >= ? AND t.timestamp < ?
+    GROUP BY t.transaction_id
+"""
+
+# Cost of the lines sold by completed sales with start <= timestamp < end
+COMPLETED_COST_SQL = """
+    SELECT COALESCE(SUM(ti.qty * ti.unit_price), 0.0)
+    FROM transactions t
+    JOIN transaction_items ti ON ti.transaction_id = t.transaction_id
+    WHERE t.status = 'Completed' AND t.timestamp >= ? AND t.timestamp < ?
+"""
+
+_PAGE_SQL = """
+    SELECT t.transaction_id, t.total_amount, t.cash_paid, t.change_amount, t.timestamp,
+           t.status, t.payment_method, t.customer_id,
+           GROUP_CONCAT(COALESCE(ti.name, ti.item_id) || ' (x' || ti.qty || ')', ', ')
+    FROM (
+        SELECT * FROM transactions
+        {where}
+        ORDER BY timestamp {order}, transaction_id {order}
+        LIMIT ?
+    ) t
+    LEFT JOIN transaction_items ti ON ti.transaction_id = t.transaction_id
+    GROUP BY t.transaction_id
+    ORDER BY t.timestamp DESC, t.transaction_id DESC
+"""
+
+
+def month_bounds(year: int, month: int) -> Tuple[str, str]:
+    """[start, end) dates of a calendar month, for range predicates on timestamp or sale_date."""
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return date(year, month, 1).isoformat(), end.isoformat()
+
+
+def year_bounds(year: int) -> Tuple[str, str]:
+    return date(year, 1, 1).isoformat(), date(year + 1, 1, 1).isoformat()
+
+
+def ensure_transaction_page_index(conn: sqlite3.Connection) -> None:
+    """Index the page key so every page is a short range scan however long the history is."""
+    with conn:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_timestamp_id ON transactions(timestamp, transaction_id)")
+
+
+def fetch_transaction_page(conn: sqlite3.Connection, criteria: TransactionFilter = TransactionFilter(),
+                           older_than: Optional[PageKey] = None, newer_than: Optional[PageKey] = None,
+                           limit: int = PAGE_SIZE) -> List[Tuple]:
+    """Up to limit transactions matching criteria with their item summaries, newest first.
+
+    With older_than the page continues below that row; with newer_than it
+    is the limit rows directly above it. Rows are (transaction_id,
+    total_amount, cash_paid, change_amount, timestamp, status,
+    payment_method, customer_id, item_names).
+    """
+    conditions, params = filter_conditions(criteria)
+    order = "DESC"
+    if older_than is not None:
+        conditions.append("(timestamp, transaction_id) < (?, ?)")
+        params.extend(older_than)
+    elif newer_than is not None:
+        conditions.append("(timestamp, transaction_id) > (?, ?)")
+        params.extend(newer_than)
+        order = "ASC"
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    params.append(limit)
+    return conn.execute(_PAGE_SQL.format(where=where, order=order), params).fetchall()